@@ -383,6 +383,14 @@ function help:test {
     echo '  tests:file <file>        Run tests in specific file'
 }
 
+# Cumulative import time of the entry points, in microseconds (python -X importtime)
+function importtime {
+    echo "Measuring import times..."
+    for MODULE in app batch agent ui; do
+        poetry run python -X importtime -c "import openai_agent_sdk_tutorial.$MODULE" 2>&1 | tail -n 1
+    done
+}
+
 ######################
 # CLEANUP
 ######################
@@ -440,6 +448,7 @@ function help {
     echo "  tests:file <file>     - Run specific test file"
     echo "  coverage              - Generate coverage report"
     echo "  help:tests            - Show detailed test help"
+    echo "  importtime            - Show the import time of the entry points"
     echo ""
     echo "Cleanup:"
     echo "  clean                - Clean build artifacts"
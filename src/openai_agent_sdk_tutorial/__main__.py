@@ -7,6 +7,7 @@ Usage:
     python -m src.openai_agent_sdk_tutorial            # Normal mode
     python -m src.openai_agent_sdk_tutorial --debug    # Debug logging enabled
     python -m src.openai_agent_sdk_tutorial -l app.log # Log to file
+    python -m src.openai_agent_sdk_tutorial batch prompts.jsonl -o results.jsonl  # Batch evaluation
 """
 
 from .app import main
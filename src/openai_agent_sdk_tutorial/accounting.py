@@ -0,0 +1,366 @@
+"""Accounting module aggregating token usage and estimated cost.
+
+A single user message costs more than the main agent's model calls: the
+guardrail agents, the agents-as-tools (contact_info_agent inside the nested
+send_contact_request_agent) and the history summarizer all call the model in
+runs of their own. Every model response carries its token usage; this module
+adds it up per agent, tool and model for the request being served, and keeps
+a ledger per user and session.
+
+Usage Flow:
+----------
+```
+run_agent() ──► track_usage(user, session) ──► RequestUsage (context variable)
+                                                    ▲
+on_llm_end(agent, response) ── record_usage() ──────┘  main run, guardrails,
+                                                       agents-as-tools, summarizer
+request done ──► RequestUsage returned to the caller (AgentResult.usage)
+             └─► usage_ledger: one batched insert per request
+```
+
+Nested runs execute inside the request's context (guardrails and
+agents-as-tools are awaited by the main run), so they record into the same
+RequestUsage. The background summarizer tracks its usage on its own.
+
+Cost Estimates:
+--------------
+Costs are estimated from a price table in USD per 1M tokens (input, cached
+input, output). Override or extend it with AGENT_MODEL_PRICES, a JSON object
+such as {"gpt-5.2": [1.75, 0.175, 14.0]}. Models without a price are counted
+in tokens with a cost of 0.
+
+Configuration (environment variables):
+-------------------------------------
+- AGENT_MODEL_PRICES: JSON price table (see above)
+- AGENT_USAGE_LEDGER: Set to 0 to stop persisting usage (default 1)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import (
+    asdict,
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from agents import (
+    Agent,
+    Usage,
+)
+
+from .db import (
+    DB_PATH,
+    connect,
+)
+from .metrics import (
+    cost_total,
+    prompt_cache_hit_ratio,
+    tokens_total,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, cached input, output)
+DEFAULT_MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-5.2": (1.75, 0.175, 14.0),
+    "gpt-5": (1.25, 0.125, 10.0),
+    "gpt-5-mini": (0.25, 0.025, 2.0),
+    "gpt-4.1": (2.0, 0.5, 8.0),
+    "gpt-4.1-mini": (0.4, 0.1, 1.6),
+    "gpt-4o": (2.5, 1.25, 10.0),
+    "gpt-4o-mini": (0.15, 0.075, 0.6),
+}
+
+AGENT_USAGE_LEDGER = os.getenv("AGENT_USAGE_LEDGER", "1") != "0"
+
+
+def load_model_prices() -> Dict[str, Tuple[float, float, float]]:
+    """Return the default price table updated with AGENT_MODEL_PRICES."""
+    prices = dict(DEFAULT_MODEL_PRICES)
+    override = os.getenv("AGENT_MODEL_PRICES")
+    if override:
+        try:
+            prices.update(
+                {model: (float(p[0]), float(p[1]), float(p[2])) for model, p in json.loads(override).items()}
+            )
+        except (ValueError, TypeError, IndexError, AttributeError) as e:
+            logger.error("Ignoring invalid AGENT_MODEL_PRICES: %s", e)
+    return prices
+
+
+model_prices = load_model_prices()
+
+
+def estimate_cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    """Estimate the cost in USD of a model call.
+
+    Args:
+        model: The model name.
+        input_tokens: All input tokens, including the cached ones.
+        cached_tokens: Input tokens served from the prompt cache.
+        output_tokens: Output tokens, including reasoning tokens.
+
+    Returns:
+        float: The estimated cost, or 0 for models without a price.
+    """
+    price = model_prices.get(model)
+    if price is None:
+        return 0.0
+    uncached = max(input_tokens - cached_tokens, 0)
+    return (uncached * price[0] + cached_tokens * price[1] + output_tokens * price[2]) / 1_000_000
+
+
+def model_name(agent: Agent) -> str:
+    """Return the name of the model an agent calls ("default" if it does not name one)."""
+    if isinstance(agent.model, str):
+        return agent.model
+    return str(getattr(agent.model, "model", None) or "default")
+
+
+@dataclass
+class UsageTotals:
+    """Token usage and estimated cost summed over model calls."""
+
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    def add(self, other: "UsageTotals") -> None:
+        self.requests += other.requests
+        self.input_tokens += other.input_tokens
+        self.cached_tokens += other.cached_tokens
+        self.output_tokens += other.output_tokens
+        self.cost += other.cost
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of the input tokens served from the provider's prompt cache."""
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+@dataclass
+class RequestUsage:
+    """Usage of one request, keyed by (agent, tool, model).
+
+    Attributes:
+        user_id: The caller.
+        session_id: The caller's conversation session.
+        entries: Totals per (agent, tool, model). tool is the agent-as-tool or guarded
+                 tool the nested run served, or "" for the main run and agent guardrails.
+    """
+
+    user_id: str
+    session_id: str
+    entries: Dict[Tuple[str, str, str], UsageTotals] = field(default_factory=dict)
+
+    def record(self, agent: str, tool: str, model: str, totals: UsageTotals) -> None:
+        self.entries.setdefault((agent, tool, model), UsageTotals()).add(totals)
+
+    @property
+    def total(self) -> UsageTotals:
+        total = UsageTotals()
+        for totals in self.entries.values():
+            total.add(totals)
+        return total
+
+    def by_agent(self) -> Dict[str, UsageTotals]:
+        """Return the totals per agent, summed over tools and models."""
+        result: Dict[str, UsageTotals] = {}
+        for (agent, _, _), totals in self.entries.items():
+            result.setdefault(agent, UsageTotals()).add(totals)
+        return result
+
+
+current_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("current_request_usage", default=None)
+
+
+def record_usage(agent: Agent, usage: Usage, tool: str = "") -> None:
+    """Add the usage of a model response to the current request.
+
+    Called from the on_llm_end hooks of the main run and of nested runs.
+
+    Args:
+        agent: The agent that made the model call.
+        usage: The ModelResponse's usage.
+        tool: The tool the nested run serves, or "" for the main run.
+    """
+    model = model_name(agent)
+    cached = usage.input_tokens_details.cached_tokens or 0
+    totals = UsageTotals(
+        requests=usage.requests or 1,
+        input_tokens=usage.input_tokens,
+        cached_tokens=cached,
+        output_tokens=usage.output_tokens,
+        cost=estimate_cost(model, usage.input_tokens, cached, usage.output_tokens),
+    )
+    tokens_total.inc(agent.name, "input", amount=totals.input_tokens - cached)
+    tokens_total.inc(agent.name, "cached", amount=cached)
+    tokens_total.inc(agent.name, "output", amount=totals.output_tokens)
+    cost_total.inc(agent.name, amount=totals.cost)
+    if totals.input_tokens:
+        # Stays near 0 when the prompt prefix changes between calls (see prompt.py)
+        prompt_cache_hit_ratio.observe(cached / totals.input_tokens, agent.name)
+
+    request = current_request_usage.get()
+    if request is not None:
+        request.record(agent.name, tool, model, totals)
+
+
+# =============================================================================
+# LEDGER
+# =============================================================================
+
+
+class UsageLedger:
+    """SQLite-backed ledger of token usage, one row per request, agent, tool and model.
+
+    Methods are synchronous; callers run them with asyncio.to_thread().
+
+    Args:
+        db_path: Path to the SQLite database file.
+    """
+
+    GROUP_COLUMNS = ("user_id", "session_id", "agent", "tool", "model")
+
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = connect(self.db_path)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS usage_ledger (
+                    created_at REAL NOT NULL,
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    agent TEXT NOT NULL,
+                    tool TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    requests INTEGER NOT NULL,
+                    input_tokens INTEGER NOT NULL,
+                    cached_tokens INTEGER NOT NULL,
+                    output_tokens INTEGER NOT NULL,
+                    cost REAL NOT NULL
+                )
+            """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_ledger_user ON usage_ledger (user_id)")
+            self._conn.commit()
+        return self._conn
+
+    def record(self, usage: RequestUsage) -> None:
+        """Store the usage of a request with a single batched insert."""
+        if not usage.entries:
+            return
+        now = time.time()
+        rows = [
+            (
+                now,
+                usage.user_id,
+                usage.session_id,
+                agent,
+                tool,
+                model,
+                totals.requests,
+                totals.input_tokens,
+                totals.cached_tokens,
+                totals.output_tokens,
+                totals.cost,
+            )
+            for (agent, tool, model), totals in usage.entries.items()
+        ]
+        with self._lock:
+            conn = self._get_connection()
+            conn.executemany("INSERT INTO usage_ledger VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+
+    def totals(self, group_by: Sequence[str] = ("agent",), since: float = 0.0) -> List[Dict[str, Any]]:
+        """Aggregate the ledger.
+
+        Args:
+            group_by: Columns to group by - any of user_id, session_id, agent, tool and model.
+            since: Only include requests recorded at or after this Unix time.
+
+        Returns:
+            One dict per group with the group columns, the summed usage and the prompt cache
+            hit rate, most expensive first.
+        """
+        unknown = set(group_by) - set(self.GROUP_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot group usage by {', '.join(sorted(unknown))}")
+        columns = ", ".join(group_by)
+        select = f"{columns}, " if columns else ""
+        group = f"GROUP BY {columns}" if columns else ""
+        with self._lock:
+            cursor = self._get_connection().execute(
+                f"""
+                SELECT {select}SUM(requests), SUM(input_tokens), SUM(cached_tokens), SUM(output_tokens), SUM(cost)
+                FROM usage_ledger WHERE created_at >= ? {group} ORDER BY SUM(cost) DESC
+                """,  # nosec B608 - columns are validated against GROUP_COLUMNS
+                (since,),
+            )
+            rows = cursor.fetchall()
+        fields = list(group_by) + list(asdict(UsageTotals()))
+        totals = [dict(zip(fields, row)) for row in rows if row[len(group_by)] is not None]
+        for row in totals:
+            row["cache_hit_rate"] = (
+                round(row["cached_tokens"] / row["input_tokens"], 4) if row["input_tokens"] else 0.0
+            )
+        return totals
+
+
+usage_ledger = UsageLedger()
+
+
+async def save_usage(usage: RequestUsage) -> None:
+    """Persist the usage of a request to usage_ledger without blocking the event loop."""
+    if not AGENT_USAGE_LEDGER:
+        return
+    try:
+        await asyncio.to_thread(usage_ledger.record, usage)
+    except sqlite3.Error as e:
+        logger.error("Failed to record usage of '%s': %s", usage.session_id, e)
+
+
+@asynccontextmanager
+async def track_usage(user_id: str, session_id: str) -> AsyncIterator[RequestUsage]:
+    """Collect the usage of every model call made within the block.
+
+    The usage is persisted to usage_ledger when the block exits.
+
+    Args:
+        user_id: The caller.
+        session_id: The caller's conversation session.
+
+    Yields:
+        RequestUsage: The usage collected so far.
+    """
+    usage = RequestUsage(user_id=user_id, session_id=session_id)
+    token = current_request_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        current_request_usage.reset(token)
+        await save_usage(usage)
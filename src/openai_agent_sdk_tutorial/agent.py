@@ -6,7 +6,7 @@ Key Concepts Demonstrated:
 -------------------------
 1. Agent Configuration: Creating agents with custom instructions, tools, and guardrails
 2. Dynamic Instructions: Generating context-aware system prompts at runtime
-3. Runner Execution: Using Runner.run() to execute agent conversations
+3. Runner Execution: Using Runner.run() and Runner.run_streamed() to execute agent conversations
 4. Session Management: Persisting conversation state with SQLiteSession
 5. Tracing: Using trace() for observability and debugging
 6. Error Handling: Catching guardrail and execution exceptions
@@ -40,8 +40,19 @@ https://openai.github.io/openai-agents-python/agents/
 https://openai.github.io/openai-agents-python/multi_agent/
 """
 
+import asyncio
+import contextvars
+import dataclasses
+import functools
 import logging
+import time
 import uuid
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Optional,
+)
 
 from agents import (
     Agent,
@@ -51,20 +62,54 @@ from agents import (
     RunConfig,
     RunContextWrapper,
     Runner,
-    SQLiteSession,
+    RunResultStreaming,
+    gen_trace_id,
     trace,
 )
+from openai.types.responses import ResponseTextDeltaEvent
 
+from .accounting import (
+    RequestUsage,
+    current_request_usage,
+    save_usage,
+    track_usage,
+)
+from .cache import verdict_cache
+from .compaction import session_compactor
 from .guardrail import (
+    STREAMING_OUTPUT_GUARDRAIL,
+    StreamingOutputMonitor,
     input_guardrail_foul_language,
     output_guardrail_unprofessional,
+    streaming_output_monitor,
 )
-from .handoff import supervisor_escalation
 from .hook import (
+    MetricsRunHook,
     MyAgentHook,
-    MyRunHook,
 )
-from .tool import send_contact_request_tool
+from .metrics import (
+    metrics,
+    turn_seconds,
+)
+from .notification import push_dispatcher
+from .prompt import InstructionRenderer
+from .provider import active_model_provider
+from .routing import (
+    ASSISTANT,
+    model_router,
+)
+from .scheduler import (
+    SchedulerBusy,
+    request_scheduler,
+)
+from .session import session_manager
+from .speculation import (
+    SPECULATIVE_EXECUTION,
+    SpeculationGate,
+    reporting_guardrails,
+    speculate,
+    speculation_gate,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -89,21 +134,16 @@ logger = logging.getLogger(__name__)
 #     1. At the start of a conversation
 #     2. After each tool execution (instructions are re-evaluated)
 
-
-def generate_notification_agent_instructions(context: RunContextWrapper, agent: Agent) -> str:
-    """Generate dynamic instructions for the Helpful Notification Agent.
-
-    Args:
-        context: The run context wrapper containing runtime state. Access custom
-                 data passed to Runner.run() via `context.context`.
-        agent: The agent instance requesting instructions. Useful for accessing
-               the agent's name, model, or other configuration.
-
-    Returns:
-        str: The generated system prompt instructions that guide agent behavior.
-    """
-    # Base instructions define the agent's core behavior and personality
-    base_instructions = """
+#     Prompt Caching:
+#     --------------
+#     The system prompt is the start of every model call, and the provider only
+#     reuses its cached prompt prefix when the bytes are identical. The static
+#     instructions therefore come first, and the context is appended as canonical
+#     JSON (sorted keys): str() of a dict follows insertion order, which differs
+#     between callers. The rendered prompt is memoized per context value, so the
+#     callable costs a dictionary lookup on every model call (see prompt.py).
+
+NOTIFICATION_AGENT_INSTRUCTIONS = """
 You are a helpful financial services assistant that notifies other departments via push notifications.
 
 Your responsibilities:
@@ -117,17 +157,24 @@ Guidelines:
 - Only send notifications for important or requested information
 """
 
-    logger.debug("Running Dynamic Instructions Generation:")
-    logger.debug("Context: %s", context.context)
-    logger.debug("Agent's Name: %s", agent.name)
+notification_instructions = InstructionRenderer(NOTIFICATION_AGENT_INSTRUCTIONS)
 
-    # Append context-specific information if available
-    # The context.context attribute contains whatever was passed to Runner.run(context=...)
-    if context.context:
-        context_info = f"\n\nCurrent context: {str(context.context)}"
-        return base_instructions + context_info
 
-    return base_instructions
+def generate_notification_agent_instructions(context: RunContextWrapper, agent: Agent) -> str:
+    """Generate dynamic instructions for the Helpful Notification Agent.
+
+    Args:
+        context: The run context wrapper containing runtime state. Access custom
+                 data passed to Runner.run() via `context.context`.
+        agent: The agent instance requesting instructions. Useful for accessing
+               the agent's name, model, or other configuration.
+
+    Returns:
+        str: The generated system prompt instructions that guide agent behavior:
+             the base instructions, followed by the context if available.
+    """
+    # The context.context attribute contains whatever was passed to Runner.run(context=...)
+    return notification_instructions.render(context.context)
 
 
 # =============================================================================
@@ -141,7 +188,9 @@ Guidelines:
 # For more details, see:
 # https://openai.github.io/openai-agents-python/ref/run/#agents.run.RunConfig
 
-config = RunConfig(workflow_name="Openai Agent SDK Tutorial")
+# The model provider is shared with nested runs (guardrails, agents-as-tools), so
+# the whole agent graph can be switched to recorded responses (see provider.py).
+config = RunConfig(workflow_name="Openai Agent SDK Tutorial", model_provider=active_model_provider)
 
 # =============================================================================
 # Session
@@ -152,12 +201,15 @@ config = RunConfig(workflow_name="Openai Agent SDK Tutorial")
 # - Tool call results
 # - System context
 #
+# Each caller gets its own session (see session.py), so a turn only replays the
+# caller's own history. Sessions share a pool of WAL-mode SQLite connections.
+# Once a history exceeds its token budget, older turns are folded into a rolling
+# summary (see compaction.py).
+#
 # For more details, see:
 # https://openai.github.io/openai-agents-python/sessions/
 
-session = SQLiteSession(db_path="memory.db", session_id="shared")
-
-# Unique run identifier for tracing - useful for grouping traces by app run
+# Unique identifier of this app process - attached to every trace as metadata
 run_id = str(uuid.uuid4())  # pylint: disable=invalid-name
 
 # =============================================================================
@@ -173,6 +225,7 @@ run_id = str(uuid.uuid4())  # pylint: disable=invalid-name
 # - model: The LLM model to use (e.g., "gpt-5.2", "gpt-4o-mini")
 # - model_settings: Model-specific parameters (temperature, max_tokens, etc.)
 #   see: https://openai.github.io/openai-agents-python/ref/model_settings/
+#   The agents of this package get both from the route of their role (see routing.py)
 # - tools: List of tools the agent can use
 # - tool_use_behavior: lets you configure how tool use is handled
 #   see: https://openai.github.io/openai-agents-python/ref/agent/#agents.agent.Agent.tool_use_behavior
@@ -184,18 +237,41 @@ run_id = str(uuid.uuid4())  # pylint: disable=invalid-name
 # - output_guardrails: Validate/filter agent output before returning
 # - hooks: AgentHooks instance for lifecycle callbacks (agent-specific)
 # - handoffs: List of agents this agent can hand off to (optional)
-
-notification_agent = Agent(
-    name="Helpful Notification Agent",
-    instructions=generate_notification_agent_instructions,
-    model="gpt-5.2",
-    tools=[send_contact_request_tool],
-    handoff_description="Escalate the request if the user asks you to talk to a supervisor",
-    handoffs=[supervisor_escalation],
-    input_guardrails=[input_guardrail_foul_language],
-    output_guardrails=[output_guardrail_unprofessional],
-    hooks=MyAgentHook(),
-)
+#
+# The agent graph (the main agent, the agents-as-tools behind its tools and the
+# escalation agent behind its handoff) is built on first use, so importing this
+# module does not build it: get_notification_agent() is the factory.
+
+
+@functools.lru_cache(maxsize=None)
+def get_notification_agent() -> Agent:
+    """Return the main agent, building it and the agents behind its tools and handoff on first use."""
+    # Importing these modules builds the agents-as-tools and the escalation agent
+    from .handoff import supervisor_escalation
+    from .tool import (
+        capture_contact,
+        send_contact_request_tool,
+    )
+
+    notification_agent = Agent(
+        name="Helpful Notification Agent",
+        instructions=generate_notification_agent_instructions,
+        # Both implement send_contact_request; only the one selected by CONTACT_CAPTURE_MODE is enabled
+        tools=[send_contact_request_tool, capture_contact],
+        handoff_description="Escalate the request if the user asks you to talk to a supervisor",
+        handoffs=[supervisor_escalation],
+        input_guardrails=[input_guardrail_foul_language],
+        output_guardrails=[output_guardrail_unprofessional],
+        hooks=MyAgentHook(),
+    )
+    return model_router.route(ASSISTANT, notification_agent)
+
+
+def __getattr__(name: str) -> Any:
+    # agent.notification_agent predates the factory
+    if name == "notification_agent":
+        return get_notification_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # =============================================================================
@@ -247,44 +323,306 @@ notification_agent = Agent(
 # =============================================================================
 # trace() creates a span for observability/debugging
 # All operations within this context are grouped under this trace
-# trace_id can be used to group several runs in the tracing dashboard
+# Every request gets its own trace_id (gen_trace_id()), so concurrent requests
+# never interleave in one trace. group_id ties together the traces of one
+# conversation, and the app run id is kept as trace metadata.
 #
 # For more details, see:
 # https://openai.github.io/openai-agents-python/tracing/
 
+# =============================================================================
+# ADMISSION CONTROL
+# =============================================================================
+# Both entry points hold a request_scheduler slot for the whole run (see
+# scheduler.py): at most AGENT_MAX_CONCURRENCY runs execute at once, waiting
+# requests are served round-robin per user, and requests beyond the bounded
+# queue get BUSY_MESSAGE right away instead of piling up behind rate limits.
+
+# =============================================================================
+# METRICS
+# =============================================================================
+# MetricsRunHook times every agent, model call and tool call of a run, the
+# guardrails time themselves, and every turn is recorded in agent_turn_seconds
+# labelled with its outcome. The counters of the scheduler, the verdict cache and
+# the push outbox are exported next to them (see metrics.py and the Metrics tab
+# of the app).
+#
+# Token usage and estimated cost are collected per request with track_usage()
+# (see accounting.py): run_agent() returns them with the answer, and both entry
+# points add them to the usage ledger.
+
+# =============================================================================
+# SPECULATIVE EXECUTION
+# =============================================================================
+# The input guardrail runs in parallel with the main agent's first model call
+# (see guardrail.py). Each request opens a SpeculationGate: push notifications
+# and escalations wait for the guardrail's verdict, run_agent_streamed() holds
+# back text until it passed, and the speculative turn is cancelled when the
+# tripwire fires (see speculation.py).
 
-async def run_agent(input: str) -> str:
+metrics.register_collector("agent_scheduler", request_scheduler.snapshot)
+metrics.register_collector("agent_verdict_cache", verdict_cache.snapshot)
+metrics.register_collector("agent_push", push_dispatcher.metrics.snapshot)
+metrics.register_collector("agent_instructions", notification_instructions.snapshot)
+
+# Shown to the user whenever a run fails or a guardrail trips
+ERROR_MESSAGE = "I'm sorry, but I couldn't process your request at this time. Please try again later."
+
+# Shown to the user when the scheduler turns the request away
+BUSY_MESSAGE = "I'm handling a lot of requests right now. Please try again in a moment."
+
+
+def log_run_failure(e: Exception) -> None:
+    """Log why a run failed, including the guardrail details if a guardrail tripped."""
+    if isinstance(e, InputGuardrailTripwireTriggered):
+        logger.error("Input guardrail triggered: %s", e)
+        logger.error("Guardrail details: %s", e.guardrail_result.output.output_info)
+    elif isinstance(e, OutputGuardrailTripwireTriggered):
+        logger.error("Output guardrail triggered: %s", e)
+        logger.error("Guardrail details: %s", e.guardrail_result.output.output_info)
+    else:
+        logger.error("Max turns exceeded: %s", e)
+
+
+def run_outcome(e: Exception) -> str:
+    """Return the agent_turn_seconds outcome label of a failed run."""
+    if isinstance(e, InputGuardrailTripwireTriggered):
+        return "input_guardrail"
+    if isinstance(e, OutputGuardrailTripwireTriggered):
+        return "output_guardrail"
+    return "max_turns"
+
+
+@dataclass
+class AgentResult:
+    """The answer to a request and what it cost.
+
+    Attributes:
+        output: The agent's final response, or an error or busy message.
+        usage: Tokens and estimated cost per agent, tool and model, including the
+               guardrail agents and the nested agents-as-tools (see accounting.py).
+        outcome: How the run ended, as labelled in agent_turn_seconds: "answered", "busy",
+                 "input_guardrail", "output_guardrail" or "max_turns".
+    """
+
+    output: str
+    usage: RequestUsage
+    outcome: str = "answered"
+
+
+async def run_agent(input: str, session_id: Optional[str] = None, user_id: Optional[str] = None) -> AgentResult:
     """Execute the agent with user input and return the response.
 
     Args:
         input: The user's message to process.
+        session_id: Identifies the caller (e.g. a Gradio session hash or an API user id).
+                    Each caller has its own conversation history. Defaults to a shared session.
+        user_id: The end user, for usage accounting and fair scheduling across their
+                 sessions. Defaults to the session id, for anonymous callers.
 
     Returns:
-        str: The agent's final response, or an error message if processing failed.
+        AgentResult: The agent's final response, or an error message if processing failed,
+                     with the request's token usage.
     """
-    try:
-        with trace("OpenAI Agent SDK Tutorial", trace_id="trace_" + run_id):
-            result = await Runner.run(
-                starting_agent=notification_agent,
-                input=input,
-                context={"user_id": "user_123", "preferred_language": "en"},
-                max_turns=20,
-                hooks=MyRunHook(),
-                run_config=config,
-                session=session,
-            )
-            return result.final_output
-
-    except InputGuardrailTripwireTriggered as e:
-        logger.error("Input guardrail triggered: %s", e)
-        logger.error("Guardrail details: %s", e.guardrail_result.output.output_info)
+    session = session_manager.get(session_id)
+    user_id = user_id or session.session_id
+    started = time.perf_counter()
+    outcome = "error"
+    async with track_usage(user_id, session.session_id) as usage:
+        try:
+            async with request_scheduler.slot(user_id):
+                notification_agent = get_notification_agent()
+                with (
+                    speculate(notification_agent),
+                    trace(
+                        "OpenAI Agent SDK Tutorial",
+                        trace_id=gen_trace_id(),
+                        group_id=session.session_id,
+                        metadata={"app_run_id": run_id},
+                    ),
+                ):
+                    result = await Runner.run(
+                        starting_agent=notification_agent,
+                        input=input,
+                        context={"user_id": user_id, "preferred_language": "en"},
+                        max_turns=20,
+                        hooks=MetricsRunHook(),
+                        run_config=config,
+                        session=session,
+                    )
+                    # Fold old turns into a summary in the background once the history grows too large
+                    session_compactor.schedule(session, user_id)
+                    outcome = "answered"
+                    return AgentResult(result.final_output, usage, outcome)
+
+        except SchedulerBusy as e:
+            logger.warning("Request from '%s' turned away: %s", session.session_id, e)
+            outcome = "busy"
+            return AgentResult(BUSY_MESSAGE, usage, outcome)
+
+        except (InputGuardrailTripwireTriggered, OutputGuardrailTripwireTriggered, MaxTurnsExceeded) as e:
+            log_run_failure(e)
+            outcome = run_outcome(e)
+
+        finally:
+            turn_seconds.observe(time.perf_counter() - started, outcome)
+
+        # Return a user-friendly error message when processing fails
+        return AgentResult(ERROR_MESSAGE, usage, outcome)
 
-    except OutputGuardrailTripwireTriggered as e:
-        logger.error("Output guardrail triggered: %s", e)
-        logger.error("Guardrail details: %s", e.guardrail_result.output.output_info)
 
-    except MaxTurnsExceeded as e:
-        logger.error("Max turns exceeded: %s", e)
+# =============================================================================
+# STREAMING EXECUTION: Runner.run_streamed()
+# =============================================================================
+#     Runner.run() returns only after every agent, tool and guardrail has finished.
+#     Runner.run_streamed() returns immediately; the run happens in a background
+#     task and its events are consumed with `async for event in result.stream_events()`.
+#
+#     Stream Event Types:
+#     ------------------
+#     - raw_response_event: Raw LLM events; ResponseTextDeltaEvent carries text tokens
+#     - run_item_stream_event: A complete item (message, tool call, tool output, handoff)
+#     - agent_updated_stream_event: The current agent changed (e.g. after a handoff)
+#
+#     Guardrails While Streaming:
+#     --------------------------
+#     Input guardrails run alongside the first model call, whose text is held back
+#     until they pass. Output guardrails run on the final output, so they can trip
+#     after some text has been shown. Tripwire exceptions are raised from stream_events(); the partial
+#     answer must then be retracted, which is what StreamChunk.replace is for.
+#
+#     With STREAMING_OUTPUT_GUARDRAIL enabled (the default), the output guardrail
+#     also classifies the answer chunk by chunk while it streams and cancels the
+#     run as soon as a chunk is unprofessional (see StreamingOutputMonitor).
+#
+#     Tracing:
+#     -------
+#     The run outlives this function's frames, so the trace is configured through
+#     RunConfig (trace_id, group_id, trace_metadata) and opened and closed by the SDK, instead of with trace().
+#
+# For more details, see:
+# https://openai.github.io/openai-agents-python/streaming/
+
 
-    # Return a user-friendly error message when processing fails
-    return "I'm sorry, but I couldn't process your request at this time. Please try again later."
+@dataclass
+class StreamChunk:
+    """A piece of a streamed answer.
+
+    Attributes:
+        text: The text to show.
+        replace: If True, the text replaces everything shown so far instead of being appended.
+        outcome: Set on the chunk of a run that ended without an answer, e.g. "input_guardrail"
+                 or "busy" (see AgentResult.outcome).
+    """
+
+    text: str
+    replace: bool = False
+    outcome: Optional[str] = None
+
+
+async def run_agent_streamed(
+    input: str, session_id: Optional[str] = None, user_id: Optional[str] = None
+) -> AsyncIterator[StreamChunk]:
+    """Execute the agent with user input and stream the response as it is generated.
+
+    Args:
+        input: The user's message to process.
+        session_id: Identifies the caller (see run_agent()).
+        user_id: The end user (see run_agent()).
+
+    Yields:
+        StreamChunk: Text deltas of the answer. A chunk with replace=True retracts the
+                     partial answer, e.g. with the error message when a guardrail trips.
+    """
+    session = session_manager.get(session_id)
+    user_id = user_id or session.session_id
+    context = {"user_id": user_id, "preferred_language": "en"}
+    # Classify the answer while it streams and cancel the run on a violation (see guardrail.py)
+    monitor = StreamingOutputMonitor(context) if STREAMING_OUTPUT_GUARDRAIL else None
+    usage = RequestUsage(user_id=user_id, session_id=session.session_id)
+    # Text is held back until the input guardrails passed (see speculation.py)
+    notification_agent = get_notification_agent()
+    gate = SpeculationGate(reporting_guardrails(notification_agent)) if SPECULATIVE_EXECUTION else None
+
+    def start() -> RunResultStreaming:
+        # Runs in a copied context: the run's background task sees the monitor and
+        # the gate and records its token usage into this request, the caller does not
+        streaming_output_monitor.set(monitor)
+        speculation_gate.set(gate)
+        current_request_usage.set(usage)
+        return Runner.run_streamed(
+            starting_agent=notification_agent,
+            input=input,
+            context=context,
+            max_turns=20,
+            hooks=MetricsRunHook(),
+            run_config=dataclasses.replace(
+                config, trace_id=gen_trace_id(), group_id=session.session_id, trace_metadata={"app_run_id": run_id}
+            ),
+            session=session,
+        )
+
+    streamed = ""
+    held = ""
+    started = time.perf_counter()
+    outcome = "error"
+    result: Optional[RunResultStreaming] = None
+    try:
+        async with request_scheduler.slot(user_id):
+            result = contextvars.copy_context().run(start)
+            if monitor is not None:
+                monitor.on_violation = result.cancel
+            async for event in result.stream_events():
+                if event.type != "raw_response_event":
+                    continue
+                if event.data.type == "response.created" and monitor is not None:
+                    monitor.new_response()
+                elif isinstance(event.data, ResponseTextDeltaEvent):
+                    streamed += event.data.delta
+                    if monitor is not None:
+                        monitor.feed(event.data.delta)
+                    if gate is not None and not gate.passed:
+                        held += event.data.delta
+                        continue
+                    yield StreamChunk(held + event.data.delta)
+                    held = ""
+
+            if monitor is not None and monitor.violation is not None:
+                logger.error("Streaming output guardrail triggered: %s", monitor.violation.reasoning)
+                outcome = "streaming_guardrail"
+                yield StreamChunk(ERROR_MESSAGE, replace=True, outcome=outcome)
+                return
+
+            if held:
+                yield StreamChunk(held)
+            # Text streamed before a tool call or handoff is not part of the final answer
+            if streamed != str(result.final_output):
+                yield StreamChunk(str(result.final_output), replace=True)
+            session_compactor.schedule(session, user_id)
+            outcome = "answered"
+
+    except SchedulerBusy as e:
+        logger.warning("Request from '%s' turned away: %s", session.session_id, e)
+        outcome = "busy"
+        yield StreamChunk(BUSY_MESSAGE, replace=True, outcome=outcome)
+
+    except (InputGuardrailTripwireTriggered, OutputGuardrailTripwireTriggered, MaxTurnsExceeded) as e:
+        log_run_failure(e)
+        outcome = run_outcome(e)
+        yield StreamChunk(ERROR_MESSAGE, replace=True, outcome=outcome)
+
+    except (GeneratorExit, asyncio.CancelledError):
+        # The consumer stopped reading (e.g. the client disconnected)
+        outcome = "cancelled"
+        raise
+
+    finally:
+        # Closed while suspended at a yield, the run's background task would keep running tools
+        if result is not None and not result.is_complete:
+            result.cancel()
+        turn_seconds.observe(time.perf_counter() - started, outcome)
+        if monitor is not None:
+            monitor.close()
+        if gate is not None:
+            gate.abort()
+        await save_usage(usage)
@@ -1,23 +1,38 @@
 import argparse
 from typing import Any
 
-import gradio as gr
 from dotenv import (
     find_dotenv,
     load_dotenv,
 )
 
-from .agent import run_agent
-from .util import configure_logging
+from .metrics import metrics
+from .util import (
+    LOG_FORMAT,
+    configure_logging,
+    isolate_environment,
+    log_queue_stats,
+    run_quietly,
+)
 
 
 load_dotenv(find_dotenv(), override=True)
 
 
-# Gradio chat interface function requires 2 parameters: message and history
-# but history is managed by the OpenAI Agent SDK instead of Gradio
-async def chat(message: str, history: Any) -> str:  # pylint: disable=unused-argument
-    return await run_agent(message)
+# Only the command that runs imports what it needs: the chat UI imports Gradio
+# and the agents (see ui.py), the server imports the agents and uvicorn but not
+# Gradio (see server.py), and the batch subcommand configures the database
+# before the agent modules read it (see util.isolate_environment). Starting a
+# batch run or printing the help does not pay for importing Gradio.
+
+
+def __getattr__(name: str) -> Any:
+    # app.chat and app.build_interface predate ui.py
+    if name in ("chat", "build_interface", "metrics_view"):
+        from . import ui
+
+        return getattr(ui, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main() -> None:
@@ -37,9 +52,76 @@ def main() -> None:
         type=str,
         help="Write logs to a file instead of the console",
     )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="Write logs as JSON lines (same as LOG_FORMAT=json)",
+    )
+    commands = parser.add_subparsers(dest="command", title="commands", help="Default: launch the chat UI")
+    batch_parser = commands.add_parser(
+        "batch",
+        help="Run a JSONL file of prompts through the agent",
+        description="Run every prompt of a JSONL file through run_agent() and write one result per line.",
+    )
+    batch_parser.add_argument("input", type=str, help='JSONL file of {"id": ..., "input": ...} prompts')
+    batch_parser.add_argument("--output", "-o", type=str, required=True, help="JSONL file receiving the results")
+    batch_parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        help="Prompts running at once (default AGENT_MAX_CONCURRENCY)",
+    )
+    batch_parser.add_argument(
+        "--db",
+        type=str,
+        help="Database for sessions, usage and the push outbox (default: in memory)",
+    )
+    serve_parser = commands.add_parser(
+        "serve",
+        help="Serve the agent over HTTP (chat completions with SSE streaming)",
+        description="Run the headless ASGI server with uvicorn (see server.py).",
+    )
+    serve_parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind (default 127.0.0.1)")
+    serve_parser.add_argument("--port", "-p", type=int, default=8000, help="Port to bind (default 8000)")
     args = parser.parse_args()
-    configure_logging(level="DEBUG" if args.debug else "INFO", log_file=args.log_file)
-    gr.ChatInterface(chat).launch()
+    configure_logging(
+        level="DEBUG" if args.debug else "INFO",
+        log_file=args.log_file,
+        json_format=args.log_json or LOG_FORMAT == "json",
+    )
+    if args.command == "batch":
+        run_batch_command(args)
+        return
+    if args.command == "serve":
+        from .server import serve
+
+        serve(args.host, args.port)
+        return
+    launch_ui()
+
+
+def launch_ui() -> None:
+    from .ui import build_interface
+
+    metrics.register_collector("agent_log", log_queue_stats)
+    build_interface().launch()
+
+
+def run_batch_command(args: argparse.Namespace) -> None:
+    from .batch import (
+        SUMMARY_COLUMNS,
+        format_table,
+        run_batch,
+        summarize,
+    )
+
+    isolate_environment(args.db)
+    from .scheduler import request_scheduler
+
+    concurrency = args.concurrency or request_scheduler.max_concurrency
+    with open(args.input, encoding="utf-8") as lines, open(args.output, "w", encoding="utf-8") as output:
+        records = run_quietly(run_batch(lines, output, concurrency))
+    print(format_table(summarize(records), SUMMARY_COLUMNS))
 
 
 if __name__ == "__main__":
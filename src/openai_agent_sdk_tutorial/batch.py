@@ -0,0 +1,185 @@
+"""Batch module running a JSONL file of prompts through run_agent() concurrently.
+
+Regression runs replay thousands of recorded customer messages through the
+same entry point as the chat UI and compare the results between nights.
+Prompts are read lazily from the input file, a fixed pool of workers runs
+them through run_agent(), and each result is appended to the output file as
+soon as it finishes, so a long run can be followed with `tail -f` and an
+interrupted run keeps what it already did.
+
+Batch Flow:
+----------
+```
+prompts.jsonl ──► worker 1 ──► run_agent(session "batch-<id>-<line>") ──┐
+      │      └──► worker 2 ──► run_agent(...)                          ├──► results.jsonl (completion order)
+      │      └──► worker N ──► run_agent(...)                          ┘          │
+      └─ read one line at a time                                                 ▼
+                                                                  summary table per outcome
+```
+
+Isolation:
+---------
+Every prompt gets its own session, named after its line number rather than
+its "id" (which may repeat), so no prompt sees another one's history.
+By default the run uses an in-memory database (sessions, usage ledger, push
+outbox), push credentials are dropped and trace export is disabled, so a
+replay notifies nobody and leaves no trace in the application's database
+(see util.isolate_environment).
+
+Input and Output:
+----------------
+Each input line is a JSON object with an "input" message and an optional "id"
+(a bare JSON string is accepted too). Each output line holds the id and index
+of the prompt, the final output, the run outcome ("answered", "busy",
+"input_guardrail", "output_guardrail", "max_turns", or "error"/"invalid"
+for prompts that could not run), the number of model calls, the tokens and
+estimated cost of all agents involved, and the latency in milliseconds.
+
+Usage:
+-----
+    openai_agent_sdk_tutorial batch prompts.jsonl --output results.jsonl --concurrency 8
+
+The concurrency defaults to AGENT_MAX_CONCURRENCY: higher values only queue
+in the request scheduler, and beyond its queue they come back "busy".
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from .benchmark import percentiles
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = ["outcome", "items", "p50_ms", "p95_ms", "model_calls", "input_tokens", "output_tokens", "cost"]
+
+
+def read_prompts(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """Yield (index, prompt) for every non-blank line, parsed as JSON.
+
+    Lines that are not valid JSON are yielded as the raw text, to be reported as invalid.
+    """
+    for index, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line)
+        except json.JSONDecodeError:
+            yield index, line
+
+
+async def run_prompt(index: int, prompt: Any, batch_id: str) -> Dict[str, Any]:
+    """Run one prompt in its own session and return its output record."""
+    from .agent import run_agent
+
+    item_id = str(prompt.get("id", index)) if isinstance(prompt, dict) else str(index)
+    message = prompt.get("input") if isinstance(prompt, dict) else prompt
+    record: Dict[str, Any] = {"id": item_id, "index": index, "input": message}
+    if not isinstance(message, str) or not message:
+        logger.warning("Skipping prompt %d: no input message", index)
+        return {**record, "output": None, "outcome": "invalid", "model_calls": 0, "latency_ms": 0.0}
+
+    start = time.perf_counter()
+    try:
+        result = await run_agent(message, session_id=f"batch-{batch_id}-{index}")
+    except Exception as e:
+        logger.exception("Prompt %s failed", item_id)
+        latency_ms = round((time.perf_counter() - start) * 1000, 3)
+        return {
+            **record,
+            "output": None,
+            "outcome": "error",
+            "error": str(e),
+            "model_calls": 0,
+            "latency_ms": latency_ms,
+        }
+
+    totals = result.usage.total
+    return {
+        **record,
+        "output": result.output,
+        "outcome": result.outcome,
+        "model_calls": totals.requests,
+        "input_tokens": totals.input_tokens,
+        "cached_tokens": totals.cached_tokens,
+        "output_tokens": totals.output_tokens,
+        "cost": round(totals.cost, 6),
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+async def run_batch(
+    lines: Iterable[str], output: TextIO, concurrency: int, batch_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Run every prompt with at most `concurrency` runs in flight.
+
+    Args:
+        lines: Lines of the input JSONL file, read lazily.
+        output: Receives one JSON line per prompt, flushed as each one finishes.
+        concurrency: Number of workers.
+        batch_id: Prefix of the session ids. Defaults to a random id, so reruns never share history.
+
+    Returns:
+        The output records, in completion order.
+    """
+    batch_id = batch_id or uuid.uuid4().hex[:8]
+    prompts = read_prompts(lines)
+    records: List[Dict[str, Any]] = []
+
+    async def worker() -> None:
+        # The workers share one iterator: each takes the next prompt when it is free
+        for index, prompt in prompts:
+            record = await run_prompt(index, prompt, batch_id)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            records.append(record)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return records
+
+
+def summarize(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return one row of SUMMARY_COLUMNS per outcome, followed by the total."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record["outcome"], []).append(record)
+    if records:
+        groups["total"] = records
+
+    rows = []
+    for outcome, group in groups.items():
+        latency = percentiles([record["latency_ms"] / 1000 for record in group])
+        rows.append(
+            {
+                "outcome": outcome,
+                "items": len(group),
+                "p50_ms": latency["p50"],
+                "p95_ms": latency["p95"],
+                "model_calls": round(sum(record["model_calls"] for record in group) / len(group), 2),
+                "input_tokens": sum(record.get("input_tokens", 0) for record in group),
+                "output_tokens": sum(record.get("output_tokens", 0) for record in group),
+                "cost": round(sum(record.get("cost", 0.0) for record in group), 6),
+            }
+        )
+    return rows
+
+
+def format_table(rows: List[Dict[str, Any]], columns: List[str]) -> str:
+    """Render rows as a plain-text table with right-aligned columns."""
+    cells = [columns] + [[str(row[column]) for column in columns] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells)
@@ -0,0 +1,457 @@
+"""Benchmark module measuring end-to-end latency of run_agent() offline.
+
+Drives run_agent() through representative scenarios with a scripted local
+model in place of the hosted one (see provider.py), so every run is
+deterministic and needs no network access. Each scenario runs twice:
+
+- with zero model latency: the wall time is pure in-process overhead
+  (hooks, guardrails, sessions, tools, the SDK's agent loop)
+- with simulated model latency: the wall time approximates production,
+  so the overhead can be put in proportion
+
+Scenarios:
+---------
+```
+plain_answer           user ──► agent ──► output guardrail ──► answer
+contact_request        user ──► agent ──► send_contact_request (capture_contact, local extraction) ──► answer
+contact_request_chain  user ──► agent ──► send_contact_request ──► contact_info_extractor
+                                                              └──► record_user_details ──► answer
+supervisor             user ──► agent ──► supervisor handoff ──► escalation agent ──► answer
+guardrail_trip         user ──► input guardrail agent (trips) ──► error message
+```
+
+Usage:
+-----
+    python -m openai_agent_sdk_tutorial.benchmark --iterations 50 --model-latency 0.2 --output bench.json
+
+The report is JSON: per scenario, the p50/p95/p99/mean wall time in
+milliseconds of both runs and the number of model calls per turn.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import re
+import time
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Union,
+)
+
+from agents import (
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelProvider,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Tool,
+    TResponseInputItem,
+    Usage,
+)
+from agents.items import (
+    TResponseOutputItem,
+    TResponseStreamEvent,
+)
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseUsage,
+)
+from openai.types.responses.response_prompt_param import ResponsePromptParam
+from openai.types.responses.response_usage import (
+    InputTokensDetails,
+    OutputTokensDetails,
+)
+
+from .cassette import stream_events
+from .util import (
+    isolate_environment,
+    run_quietly,
+    write_report,
+)
+
+
+# =============================================================================
+# SCRIPTED MODEL
+# =============================================================================
+# Plays every agent of the project: it recognizes the calling agent from its
+# output type, tools and handoffs, and answers the way the hosted model would
+# for the benchmark scenarios.
+
+_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_NAME = re.compile(r"\bI'?m ([A-Z][a-z]+(?: [A-Z][a-z]+)*)")
+_FOUL_WORDS = ("hell", "damn", "crap")
+
+
+def _text_of(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return ""
+
+
+def _last_user_text(input: Union[str, List[TResponseInputItem]]) -> str:
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if isinstance(item, dict) and item.get("role") == "user":
+            return _text_of(item.get("content"))
+    return ""
+
+
+def _called_tools(input: Union[str, List[TResponseInputItem]]) -> List[str]:
+    """Return the names of the tools that returned since the last user message."""
+    if isinstance(input, str):
+        return []
+    names: Dict[str, str] = {}
+    called: List[str] = []
+    for item in input:
+        if not isinstance(item, dict):
+            continue
+        if item.get("role") == "user":
+            called = []
+        elif item.get("type") == "function_call":
+            names[str(item.get("call_id"))] = str(item.get("name"))
+        elif item.get("type") == "function_call_output":
+            called.append(names.get(str(item.get("call_id")), ""))
+    return called
+
+
+def _contact(text: str) -> Dict[str, str]:
+    email = _EMAIL.search(text)
+    name = _NAME.search(text)
+    return {
+        "email": email.group() if email else "unknown@example.com",
+        "name": name.group(1) if name else "Name not provided",
+        "notes": "Asked to be contacted",
+    }
+
+
+@dataclass
+class ScriptedCalls:
+    """Counts the model calls made through a ScriptedModelProvider."""
+
+    count: int = 0
+    by_model: Dict[str, int] = field(default_factory=dict)
+
+
+class ScriptedModel(Model):
+    """Local model answering every agent of the project deterministically.
+
+    Args:
+        name: The model name.
+        latency: Simulated seconds per model call.
+        calls: Shared call counter.
+    """
+
+    def __init__(self, name: str, latency: float, calls: ScriptedCalls) -> None:
+        self.name = name
+        self.latency = latency
+        self.calls = calls
+        self._ids = 0
+
+    def _next_id(self, prefix: str) -> str:
+        self._ids += 1
+        return f"{prefix}_{id(self):x}_{self._ids}"
+
+    def _message(self, text: str) -> ResponseOutputMessage:
+        return ResponseOutputMessage(
+            id=self._next_id("msg"),
+            content=[ResponseOutputText(annotations=[], text=text, type="output_text")],
+            role="assistant",
+            status="completed",
+            type="message",
+        )
+
+    def _tool_call(self, name: str, arguments: Dict[str, Any]) -> ResponseFunctionToolCall:
+        return ResponseFunctionToolCall(
+            arguments=json.dumps(arguments),
+            call_id=self._next_id("call"),
+            name=name,
+            type="function_call",
+            id=self._next_id("fc"),
+            status="completed",
+        )
+
+    def respond(
+        self,
+        input: Union[str, List[TResponseInputItem]],
+        tools: List[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: List[Handoff],
+    ) -> TResponseOutputItem:
+        """Return the output item the hosted model would produce for this request."""
+        text = _last_user_text(input)
+        called = _called_tools(input)
+        tool_names = {getattr(tool, "name", "") for tool in tools}
+        schema = output_schema.name() if output_schema is not None and not output_schema.is_plain_text() else None
+
+        # Guardrail agents and the contact extractor (structured output)
+        if schema == "InputClassification":
+            offense = next((word for word in _FOUL_WORDS if word in text.lower()), "")
+            labels = {
+                "is_foul_language": bool(offense),
+                "offense": offense,
+                "contains_confidential": False,
+                "confidential_details": "",
+                "is_prompt_injection": False,
+                "is_off_topic": False,
+            }
+            return self._message(json.dumps(labels))
+        if schema == "UnprofessionalResponse":
+            return self._message(json.dumps({"is_not_professional": False, "reasoning": ""}))
+        if schema == "ContactRequest":
+            return self._message(json.dumps(_contact(text)))
+
+        # Send Contact Request Agent: extract, then record
+        if "contact_info_extractor" in tool_names:
+            if "contact_info_extractor" not in called:
+                return self._tool_call("contact_info_extractor", {"input": text})
+            if "record_user_details" not in called:
+                return self._tool_call("record_user_details", _contact(text))
+            return self._message("The contact request has been recorded.")
+
+        # Notification agent (has the handoff) and escalation agent
+        if "send_contact_request" in tool_names:
+            if "send_contact_request" in called:
+                return self._message("Thanks! Someone from our team will get in touch with you soon.")
+            if handoffs and "supervisor" in text.lower():
+                return self._tool_call(handoffs[0].tool_name, {"reason": "The user asked for a supervisor"})
+            if _EMAIL.search(text):
+                return self._tool_call("send_contact_request", {"input": text})
+            if not handoffs:
+                return self._message("Diga. ¿Qué quiere?")
+            return self._message("Our branches are open Monday to Friday, 9am to 5pm.")
+
+        # Summarizer and any other plain-text agent
+        return self._message("Summary of the conversation so far.")
+
+    def _usage(self, input: Union[str, List[TResponseInputItem]], output: TResponseOutputItem) -> ResponseUsage:
+        input_tokens = len(json.dumps(input, default=str)) // 4
+        output_tokens = len(output.model_dump_json()) // 4
+        return ResponseUsage(
+            input_tokens=input_tokens,
+            input_tokens_details=InputTokensDetails(cached_tokens=0),
+            output_tokens=output_tokens,
+            output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+            total_tokens=input_tokens + output_tokens,
+        )
+
+    def _count(self) -> None:
+        self.calls.count += 1
+        self.calls.by_model[self.name] = self.calls.by_model.get(self.name, 0) + 1
+
+    async def get_response(
+        self,
+        system_instructions: Optional[str],
+        input: Union[str, List[TResponseInputItem]],
+        model_settings: ModelSettings,
+        tools: List[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: List[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: Optional[str],
+        conversation_id: Optional[str],
+        prompt: Optional[ResponsePromptParam],
+    ) -> ModelResponse:
+        self._count()
+        await asyncio.sleep(self.latency)
+        output = self.respond(input, tools, output_schema, handoffs)
+        usage = self._usage(input, output)
+        return ModelResponse(
+            output=[output],
+            usage=Usage(
+                requests=1,
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                total_tokens=usage.total_tokens,
+            ),
+            response_id=None,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: Optional[str],
+        input: Union[str, List[TResponseInputItem]],
+        model_settings: ModelSettings,
+        tools: List[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: List[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: Optional[str],
+        conversation_id: Optional[str],
+        prompt: Optional[ResponsePromptParam],
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        self._count()
+        output = self.respond(input, tools, output_schema, handoffs)
+        async for event in stream_events(
+            self.name,
+            [output],
+            self._usage(input, output),
+            first_token_delay=self.latency / 2,
+            total_delay=self.latency,
+            response_id=self._next_id("resp"),
+        ):
+            yield event
+
+
+class ScriptedModelProvider(ModelProvider):
+    """Provider of ScriptedModels sharing one call counter.
+
+    Args:
+        latency: Simulated seconds per model call.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls = ScriptedCalls()
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return ScriptedModel(model_name or "default", self.latency, self.calls)
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+
+@dataclass
+class Scenario:
+    """A benchmark scenario: one user message and a check of the answer."""
+
+    name: str
+    message: str
+    check: Callable[[str], bool]
+    # Contact capture implementation to use ("direct" or "chain"), None for the configured one
+    contact_capture: Optional[str] = None
+
+
+def scenarios() -> List[Scenario]:
+    from .agent import ERROR_MESSAGE
+
+    return [
+        Scenario("plain_answer", "What are your opening hours?", lambda answer: "9am" in answer),
+        Scenario(
+            "contact_request",
+            "Please get in touch, I'm Jane Doe and my email is jane.doe@example.com",
+            lambda answer: "get in touch" in answer,
+            contact_capture="direct",
+        ),
+        Scenario(
+            "contact_request_chain",
+            "Please get in touch, I'm Jane Doe and my email is jane.doe@example.com",
+            lambda answer: "get in touch" in answer,
+            contact_capture="chain",
+        ),
+        Scenario("supervisor", "I want to talk to a supervisor", lambda answer: answer.startswith("Diga")),
+        Scenario("guardrail_trip", "What the hell happened to my transfer?", lambda answer: answer == ERROR_MESSAGE),
+    ]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Return nearest-rank p50/p95/p99 and the mean of samples, in milliseconds."""
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))] * 1000
+
+    return {
+        "p50": round(rank(50), 3),
+        "p95": round(rank(95), 3),
+        "p99": round(rank(99), 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+async def run_scenario(scenario: Scenario, iterations: int, latency: float) -> Dict[str, Any]:
+    """Run a scenario repeatedly with a scripted model of the given latency.
+
+    Every iteration uses a fresh session and a cold guardrail verdict cache,
+    so all iterations do the same work.
+    """
+    from .agent import run_agent
+    from .cache import verdict_cache
+    from .provider import use_model_provider
+    from .tool import (
+        contact_capture_mode,
+        use_contact_capture,
+    )
+
+    provider = ScriptedModelProvider(latency)
+    wall: List[float] = []
+    calls: List[int] = []
+    failures = 0
+    with use_model_provider(provider), use_contact_capture(scenario.contact_capture or contact_capture_mode()):
+        for iteration in range(iterations):
+            verdict_cache.clear()
+            before = provider.calls.count
+            start = time.perf_counter()
+            result = await run_agent(scenario.message, session_id=f"bench-{scenario.name}-{latency}-{iteration}")
+            wall.append(time.perf_counter() - start)
+            calls.append(provider.calls.count - before)
+            failures += not scenario.check(result.output)
+    return {
+        "wall_ms": percentiles(wall),
+        "model_calls_per_turn": sum(calls) / len(calls),
+        "failed_checks": failures,
+    }
+
+
+async def run_benchmark(iterations: int, model_latency: float) -> Dict[str, Any]:
+    """Run every scenario without and with simulated model latency.
+
+    Returns:
+        The JSON-serializable report.
+    """
+    report: Dict[str, Any] = {
+        "config": {
+            "iterations": iterations,
+            "model_latency_ms": model_latency * 1000,
+            "python": platform.python_version(),
+        },
+        "scenarios": {},
+    }
+    for scenario in scenarios():
+        overhead = await run_scenario(scenario, iterations, 0.0)
+        simulated = await run_scenario(scenario, iterations, model_latency)
+        report["scenarios"][scenario.name] = {
+            "model_calls_per_turn": overhead["model_calls_per_turn"],
+            "overhead_ms": overhead["wall_ms"],
+            "wall_ms": simulated["wall_ms"],
+            "failed_checks": overhead["failed_checks"] + simulated["failed_checks"],
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark of run_agent() with a scripted model")
+    parser.add_argument("--iterations", "-n", type=int, default=20, help="Turns per scenario and latency setting")
+    parser.add_argument(
+        "--model-latency", type=float, default=0.2, help="Simulated seconds per model call (default 0.2)"
+    )
+    parser.add_argument("--output", "-o", type=str, help="Write the JSON report to a file instead of stdout")
+    args = parser.parse_args()
+
+    isolate_environment()
+    report = run_quietly(run_benchmark(args.iterations, args.model_latency))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
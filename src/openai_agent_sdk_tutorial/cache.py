@@ -0,0 +1,274 @@
+"""Cache module storing guardrail verdicts by content address.
+
+Guardrail agents are deterministic classifiers in practice: the same text,
+checked by the same instructions and model, gets the same verdict. Caching
+verdicts lets repeated traffic ("hi", "thanks", ...) skip the classifier's
+model round-trip entirely.
+
+Lookup Flow:
+-----------
+```
+key = sha256(normalized text + guardrail instructions + model + output type)
+        │
+        ▼
+memory tier (LRU + TTL) ──hit──► verdict
+        │ miss
+        ▼
+disk tier (SQLite, optional) ──hit──► promote to memory ──► verdict
+        │ miss
+        ▼
+compute (Runner.run on the guardrail agent) ──► store in both tiers ──► verdict
+```
+
+Concurrent lookups of the same missing key share a single computation. If
+the task computing it is cancelled (e.g. its run was cancelled), the others
+are not: one of them computes the value instead.
+
+Configuration (environment variables):
+-------------------------------------
+- GUARDRAIL_CACHE_SIZE: Maximum entries in the memory tier (default 4096, 0 disables the cache)
+- GUARDRAIL_CACHE_TTL: Seconds a verdict stays valid (default 86400)
+- GUARDRAIL_CACHE_DB: Path of a SQLite file for the disk tier (default: disabled)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import (
+    asdict,
+    dataclass,
+)
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from agents import Agent
+
+from .db import connect
+
+
+logger = logging.getLogger(__name__)
+
+GUARDRAIL_CACHE_SIZE = int(os.getenv("GUARDRAIL_CACHE_SIZE", "4096"))
+GUARDRAIL_CACHE_TTL = float(os.getenv("GUARDRAIL_CACHE_TTL", "86400"))
+GUARDRAIL_CACHE_DB = os.getenv("GUARDRAIL_CACHE_DB") or None
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def verdict_key(text: str, agent: Agent) -> str:
+    """Build the content address of a guardrail verdict.
+
+    Args:
+        text: The text being classified.
+        agent: The guardrail agent. Its instructions, model and output type are part
+               of the key, so changing any of them invalidates previous verdicts.
+
+    Returns:
+        str: A hex digest identifying the verdict.
+    """
+    instructions = agent.instructions if isinstance(agent.instructions, str) else repr(agent.instructions)
+    output_type = getattr(agent.output_type, "__qualname__", repr(agent.output_type))
+    payload = json.dumps(
+        [normalize_text(text), instructions, str(agent.model), output_type],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class VerdictCache:
+    """Two-tier LRU + TTL cache of serialized guardrail verdicts.
+
+    Args:
+        max_entries: Maximum number of entries in the memory tier. 0 disables caching.
+        ttl: Seconds an entry stays valid in both tiers.
+        db_path: Optional SQLite file for the persistent disk tier.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = GUARDRAIL_CACHE_SIZE,
+        ttl: float = GUARDRAIL_CACHE_TTL,
+        db_path: Optional[str] = GUARDRAIL_CACHE_DB,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future[str]"] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Memory tier
+    # -------------------------------------------------------------------------
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    # -------------------------------------------------------------------------
+    # Disk tier
+    # -------------------------------------------------------------------------
+
+    def _get_connection(self) -> sqlite3.Connection:
+        assert self.db_path is not None
+        if self._conn is None:
+            self._conn = connect(self.db_path)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS guardrail_verdicts (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _get_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute("SELECT expires_at, value FROM guardrail_verdicts WHERE key = ?", (key,))
+                .fetchone()
+            )
+        if row is None or row[0] < time.time():
+            return None
+        return float(row[0]), str(row[1])
+
+    def _set_disk(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO guardrail_verdicts (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            conn.execute("DELETE FROM guardrail_verdicts WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: The content address (see verdict_key()).
+            compute: Coroutine factory producing the serialized verdict on a miss.
+
+        Returns:
+            str: The serialized verdict.
+        """
+        if self.max_entries <= 0:
+            return await compute()
+
+        while True:
+            value = self._get_memory(key)
+            if value is not None:
+                self.stats.hits += 1
+                return value
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            # Unlike awaiting the future, wait() only raises if this task is cancelled
+            await asyncio.wait((in_flight,))
+            if not in_flight.cancelled():
+                self.stats.hits += 1
+                return in_flight.result()
+            # The task computing the value was cancelled, not this one: the first joiner takes over
+
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            if self.db_path is not None:
+                disk_entry = await asyncio.to_thread(self._get_disk, key)
+                if disk_entry is not None:
+                    self.stats.disk_hits += 1
+                    self._set_memory(key, disk_entry[1], disk_entry[0])
+                    future.set_result(disk_entry[1])
+                    return disk_entry[1]
+
+            self.stats.misses += 1
+            value = await compute()
+            expires_at = time.time() + self.ttl
+            self._set_memory(key, value, expires_at)
+            if self.db_path is not None:
+                await asyncio.to_thread(self._set_disk, key, value, expires_at)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting on it
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the hit/miss counters and the memory tier size."""
+        return {**self.stats.snapshot(), "size": len(self._entries)}
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.db_path is not None:
+            with self._lock:
+                conn = self._get_connection()
+                conn.execute("DELETE FROM guardrail_verdicts")
+                conn.commit()
+
+
+verdict_cache = VerdictCache()
@@ -0,0 +1,478 @@
+"""Cassette module providing a record/replay model provider.
+
+Every agent in this project calls a hosted model, so nothing can be exercised
+or timed without network access, and no two runs are alike. A cassette
+records each model request and its response once, keyed by a canonical hash
+of the request, and replays them from disk afterwards: the whole agent graph
+(main agent, guardrails, agents-as-tools, handoffs) then runs offline and
+deterministically.
+
+Record/Replay Flow:
+------------------
+```
+                              ┌─ replay: cassettes/<key>.json ──► ModelResponse (+ simulated latency)
+Model.get_response(request) ──┤
+                              └─ record: inner model ──► ModelResponse ──► cassettes/<key>.json
+
+key = sha256(model + instructions + input + settings + tools + output schema + handoffs)
+```
+
+Modes:
+-----
+- record: Always call the real model and store the response
+- replay: Only serve stored responses; a missing one raises CassetteMissError
+- auto: Replay when a response is stored, record it otherwise
+
+Identical requests recorded several times are replayed in the recorded order
+(repeating the last one). Requests include the run context rendered into
+dynamic instructions, so replays need the same session ids and an equivalent
+session history.
+
+Configuration (environment variables):
+-------------------------------------
+- AGENT_CASSETTE_MODE: record, replay or auto (default: cassettes disabled)
+- AGENT_CASSETTE_DIR: Directory of the cassette files (default "cassettes")
+- AGENT_CASSETTE_LATENCY_SCALE: Multiplier of the recorded latency applied on replay
+  (default 0: replay as fast as possible, 1: replay at recorded speed)
+
+For more details, see:
+https://openai.github.io/openai-agents-python/models/
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Union,
+)
+
+from pydantic import (
+    BaseModel,
+    TypeAdapter,
+)
+
+from agents import (
+    AgentOutputSchemaBase,
+    FunctionTool,
+    Handoff,
+    Model,
+    ModelProvider,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Tool,
+    TResponseInputItem,
+    Usage,
+)
+from agents.items import (
+    TResponseOutputItem,
+    TResponseStreamEvent,
+)
+from agents.usage import (
+    InputTokensDetails,
+    OutputTokensDetails,
+)
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseCreatedEvent,
+    ResponseOutputItemDoneEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_prompt_param import ResponsePromptParam
+
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+AUTO = "auto"
+
+AGENT_CASSETTE_MODE = os.getenv("AGENT_CASSETTE_MODE") or None
+AGENT_CASSETTE_DIR = os.getenv("AGENT_CASSETTE_DIR", "cassettes")
+AGENT_CASSETTE_LATENCY_SCALE = float(os.getenv("AGENT_CASSETTE_LATENCY_SCALE", "0"))
+
+_OUTPUT_ITEM: TypeAdapter[TResponseOutputItem] = TypeAdapter(TResponseOutputItem)
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no response was recorded for a request."""
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_unset=True)
+    return repr(value)
+
+
+def _tool_signature(tool: Tool) -> Dict[str, Any]:
+    if isinstance(tool, FunctionTool):
+        return {"name": tool.name, "parameters": tool.params_json_schema, "strict": tool.strict_json_schema}
+    return {"name": getattr(tool, "name", type(tool).__name__)}
+
+
+def request_key(
+    model: str,
+    system_instructions: Optional[str],
+    input: Union[str, List[TResponseInputItem]],
+    model_settings: ModelSettings,
+    tools: List[Tool],
+    output_schema: Optional[AgentOutputSchemaBase],
+    handoffs: List[Handoff],
+    previous_response_id: Optional[str] = None,
+    conversation_id: Optional[str] = None,
+) -> str:
+    """Return the canonical hash identifying a model request.
+
+    Everything that can change the model's answer is part of the key; tracing
+    settings and prompt ids, which cannot, are not.
+    """
+    payload = {
+        "model": model,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict(),
+        "tools": [_tool_signature(tool) for tool in tools],
+        "output_schema": output_schema.json_schema() if output_schema and not output_schema.is_plain_text() else None,
+        "handoffs": [{"name": handoff.tool_name, "parameters": handoff.input_json_schema} for handoff in handoffs],
+        "previous_response_id": previous_response_id,
+        "conversation_id": conversation_id,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Directory of recorded responses, one JSON file per request key.
+
+    Args:
+        directory: Where the cassette files live (created on first record).
+    """
+
+    def __init__(self, directory: Union[str, Path] = AGENT_CASSETTE_DIR) -> None:
+        self.directory = Path(directory)
+        self._replayed: Dict[str, int] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load(self, key: str) -> List[Dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return []
+        entries: List[Dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))["responses"]
+        return entries
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def next_entry(self, key: str) -> Dict[str, Any]:
+        """Return the next recorded response for key, repeating the last one when exhausted."""
+        entries = self._load(key)
+        if not entries:
+            raise CassetteMissError(f"No recorded response for request {key} in {self.directory}")
+        index = self._replayed.get(key, 0)
+        self._replayed[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    def record(self, key: str, model: str, entry: Dict[str, Any]) -> None:
+        """Append a response to the recording of key."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = self._load(key)
+        entries.append(entry)
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"model": model, "responses": entries}, indent=2), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def _entry(
+    output: List[TResponseOutputItem], usage: Dict[str, Any], latency: float, ttft: Optional[float]
+) -> Dict[str, Any]:
+    return {
+        "output": [item.model_dump(mode="json", exclude_unset=True) for item in output],
+        "usage": usage,
+        "latency": latency,
+        "first_token_latency": ttft,
+    }
+
+
+def _usage_dict(usage: Usage) -> Dict[str, Any]:
+    return {
+        "input_tokens": usage.input_tokens,
+        "input_tokens_details": {"cached_tokens": usage.input_tokens_details.cached_tokens},
+        "output_tokens": usage.output_tokens,
+        "output_tokens_details": {"reasoning_tokens": usage.output_tokens_details.reasoning_tokens},
+        "total_tokens": usage.total_tokens,
+    }
+
+
+async def stream_events(
+    model: str,
+    output: List[TResponseOutputItem],
+    usage: Optional[ResponseUsage],
+    first_token_delay: float = 0.0,
+    total_delay: float = 0.0,
+    response_id: str = "resp_local",
+) -> AsyncIterator[TResponseStreamEvent]:
+    """Synthesize the Responses API event stream of a complete response.
+
+    Emits response.created, one text delta per output text part, one
+    output_item.done per item and response.completed - the events the SDK's
+    streamed runs consume - optionally spread over the given delays.
+
+    Args:
+        model: The model name reported in the response.
+        output: The response's output items.
+        usage: The response's token usage.
+        first_token_delay: Seconds before the first output event.
+        total_delay: Seconds before response.completed, counted from the start.
+        response_id: The response id.
+    """
+    response = Response(
+        id=response_id,
+        created_at=time.time(),
+        model=model,
+        object="response",
+        output=[],
+        parallel_tool_calls=False,
+        tool_choice="auto",
+        tools=[],
+    )
+    sequence = 0
+    yield ResponseCreatedEvent(response=response, sequence_number=sequence, type="response.created")
+
+    await asyncio.sleep(first_token_delay)
+    for index, item in enumerate(output):
+        if isinstance(item, ResponseOutputMessage):
+            for content_index, part in enumerate(item.content):
+                if isinstance(part, ResponseOutputText):
+                    sequence += 1
+                    yield ResponseTextDeltaEvent(
+                        content_index=content_index,
+                        delta=part.text,
+                        item_id=item.id,
+                        logprobs=[],
+                        output_index=index,
+                        sequence_number=sequence,
+                        type="response.output_text.delta",
+                    )
+        sequence += 1
+        yield ResponseOutputItemDoneEvent(
+            item=item, output_index=index, sequence_number=sequence, type="response.output_item.done"
+        )
+
+    await asyncio.sleep(max(total_delay - first_token_delay, 0.0))
+    sequence += 1
+    completed = response.model_copy(update={"output": output, "usage": usage})
+    yield ResponseCompletedEvent(response=completed, sequence_number=sequence, type="response.completed")
+
+
+class CassetteModel(Model):
+    """Model that records responses of an inner model or replays them from a cassette.
+
+    Args:
+        model: The model name (part of the request key).
+        cassette: Where responses are stored.
+        mode: record, replay or auto.
+        inner: The real model, required unless mode is replay.
+        latency_scale: Multiplier of the recorded latency applied on replay.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        cassette: Cassette,
+        mode: str,
+        inner: Optional[Model] = None,
+        latency_scale: float = AGENT_CASSETTE_LATENCY_SCALE,
+    ) -> None:
+        self.model = model
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = inner
+        self.latency_scale = latency_scale
+
+    def _replays(self, key: str) -> bool:
+        return self.mode == REPLAY or (self.mode == AUTO and key in self.cassette)
+
+    def _inner(self) -> Model:
+        if self.inner is None:
+            raise CassetteMissError(f"Cannot record model '{self.model}' without an inner model")
+        return self.inner
+
+    async def get_response(
+        self,
+        system_instructions: Optional[str],
+        input: Union[str, List[TResponseInputItem]],
+        model_settings: ModelSettings,
+        tools: List[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: List[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: Optional[str],
+        conversation_id: Optional[str],
+        prompt: Optional[ResponsePromptParam],
+    ) -> ModelResponse:
+        key = request_key(
+            self.model,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            previous_response_id,
+            conversation_id,
+        )
+        if self._replays(key):
+            entry = self.cassette.next_entry(key)
+            await asyncio.sleep(entry["latency"] * self.latency_scale)
+            logger.debug("Replayed model response %s", key)
+            return ModelResponse(
+                output=[_OUTPUT_ITEM.validate_python(item) for item in entry["output"]],
+                usage=Usage(
+                    requests=1,
+                    input_tokens=entry["usage"]["input_tokens"],
+                    input_tokens_details=InputTokensDetails(**entry["usage"]["input_tokens_details"]),
+                    output_tokens=entry["usage"]["output_tokens"],
+                    output_tokens_details=OutputTokensDetails(**entry["usage"]["output_tokens_details"]),
+                    total_tokens=entry["usage"]["total_tokens"],
+                ),
+                response_id=None,
+            )
+
+        started = time.perf_counter()
+        response = await self._inner().get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        )
+        latency = time.perf_counter() - started
+        self.cassette.record(key, self.model, _entry(response.output, _usage_dict(response.usage), latency, None))
+        logger.debug("Recorded model response %s", key)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: Optional[str],
+        input: Union[str, List[TResponseInputItem]],
+        model_settings: ModelSettings,
+        tools: List[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: List[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: Optional[str],
+        conversation_id: Optional[str],
+        prompt: Optional[ResponsePromptParam],
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        key = request_key(
+            self.model,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            previous_response_id,
+            conversation_id,
+        )
+        if self._replays(key):
+            async for event in self._replay_stream(key):
+                yield event
+            return
+
+        started = time.perf_counter()
+        first_token: Optional[float] = None
+        async for event in self._inner().stream_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        ):
+            if first_token is None and isinstance(event, ResponseTextDeltaEvent):
+                first_token = time.perf_counter() - started
+            if isinstance(event, ResponseCompletedEvent):
+                usage = event.response.usage.model_dump(mode="json") if event.response.usage else None
+                entry = _entry(event.response.output, usage or {}, time.perf_counter() - started, first_token)
+                self.cassette.record(key, self.model, entry)
+                logger.debug("Recorded streamed model response %s", key)
+            yield event
+
+    async def _replay_stream(self, key: str) -> AsyncIterator[TResponseStreamEvent]:
+        entry = self.cassette.next_entry(key)
+        latency = entry["latency"] * self.latency_scale
+        first_token = (entry["first_token_latency"] or entry["latency"]) * self.latency_scale
+        async for event in stream_events(
+            self.model,
+            [_OUTPUT_ITEM.validate_python(item) for item in entry["output"]],
+            ResponseUsage(**entry["usage"]) if entry["usage"] else None,
+            first_token_delay=first_token,
+            total_delay=latency,
+            response_id=f"resp_{key[:24]}",
+        ):
+            yield event
+        logger.debug("Replayed streamed model response %s", key)
+
+
+class CassetteModelProvider(ModelProvider):
+    """Model provider wrapping every model in a CassetteModel.
+
+    Args:
+        mode: record, replay or auto.
+        directory: Where the cassette files live.
+        inner: Provider of the real models, used to record. Not needed to replay.
+        latency_scale: Multiplier of the recorded latency applied on replay.
+
+    Examples:
+    ::
+
+        >>> provider = CassetteModelProvider(REPLAY, "tests/cassettes")
+        >>> await Runner.run(agent, "Hello", run_config=RunConfig(model_provider=provider))
+    """
+
+    def __init__(
+        self,
+        mode: str = AUTO,
+        directory: Union[str, Path] = AGENT_CASSETTE_DIR,
+        inner: Optional[ModelProvider] = None,
+        latency_scale: float = AGENT_CASSETTE_LATENCY_SCALE,
+    ) -> None:
+        if mode not in (RECORD, REPLAY, AUTO):
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of: {RECORD}, {REPLAY}, {AUTO}")
+        self.mode = mode
+        self.cassette = Cassette(directory)
+        self.inner = inner
+        self.latency_scale = latency_scale
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        name = model_name or "default"
+        inner = self.inner.get_model(model_name) if self.inner is not None and self.mode != REPLAY else None
+        return CassetteModel(name, self.cassette, self.mode, inner=inner, latency_scale=self.latency_scale)
@@ -0,0 +1,240 @@
+"""Compaction module keeping session history within a token budget.
+
+Every Runner.run() replays the whole session history, so without compaction
+token count and latency grow linearly with the length of the conversation.
+Once a session exceeds its token budget, older turns are folded into a single
+rolling summary item that is written back to the session, so the
+summarization cost is paid once and not on every turn.
+
+Compaction Flow:
+---------------
+```
+history:  [summary] [turn 1] [turn 2] ... [turn K-N] | [turn K-N+1] ... [turn K]
+          └──────────── folded into new summary ─────┘ └──── last N turns kept raw ──┘
+
+result:   [new summary] [tool items still referenced] [turn K-N+1] ... [turn K]
+```
+
+Key Concepts:
+------------
+- Turn: A user message and every item generated in response to it
+- Token budget: Estimated from the stored JSON size (~4 characters per token)
+- Referenced tool items: A function call and its output are never separated,
+  so a pair that straddles the boundary is kept raw instead of being folded
+- Background execution: run_agent() schedules compaction after answering, so
+  the summarization call never delays a response; its token usage is recorded
+  in the usage ledger as a request of its own (see accounting.py)
+
+Configuration (environment variables):
+-------------------------------------
+- SESSION_TOKEN_BUDGET: Estimated tokens above which a session is compacted (default 4000)
+- SESSION_KEEP_TURNS: Number of most recent turns kept raw (default 4)
+"""
+
+import asyncio
+import logging
+import os
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
+
+from agents import (
+    Agent,
+    Runner,
+    TResponseInputItem,
+)
+
+from .accounting import track_usage
+from .hook import usage_hook
+from .provider import nested_run_config
+from .routing import (
+    SUMMARIZER,
+    model_router,
+)
+from .session import PooledSQLiteSession
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_TOKEN_BUDGET = int(os.getenv("SESSION_TOKEN_BUDGET", "4000"))
+SESSION_KEEP_TURNS = int(os.getenv("SESSION_KEEP_TURNS", "4"))
+
+# Rough but cheap: English text averages about four characters per token
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+Row = Tuple[int, TResponseInputItem]
+
+
+summarizer_agent = Agent(
+    name="Conversation Summarizer",
+    instructions="""Summarize the conversation transcript you receive so that an assistant
+    can continue the conversation without the original messages.
+    Keep names, email addresses, requests, decisions and open questions.
+    Fold in any previous summary included in the transcript.
+    Be concise and write plain text only.""",
+)
+model_router.route(SUMMARIZER, summarizer_agent)
+
+
+def _item_dict(item: TResponseInputItem) -> Dict[str, Any]:
+    return cast(Dict[str, Any], item) if isinstance(item, dict) else {}
+
+
+def is_user_message(item: TResponseInputItem) -> bool:
+    data = _item_dict(item)
+    return data.get("role") == "user" and data.get("type", "message") == "message"
+
+
+def is_summary(item: TResponseInputItem) -> bool:
+    data = _item_dict(item)
+    return data.get("role") == "developer" and str(data.get("content", "")).startswith(SUMMARY_PREFIX)
+
+
+def summary_item(text: str) -> TResponseInputItem:
+    item: TResponseInputItem = {"role": "developer", "content": f"{SUMMARY_PREFIX}\n{text}"}
+    return item
+
+
+def split_turns(rows: List[Row]) -> List[List[Row]]:
+    """Split history rows into turns, each starting at a user message.
+
+    Rows before the first user message (e.g. a previous summary) form their own turn.
+    """
+    turns: List[List[Row]] = []
+    for row in rows:
+        if not turns or is_user_message(row[1]):
+            turns.append([])
+        turns[-1].append(row)
+    return turns
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def render_transcript(items: List[TResponseInputItem]) -> str:
+    """Render history items as a plain-text transcript for the summarizer."""
+    lines = []
+    for item in items:
+        data = _item_dict(item)
+        item_type = data.get("type", "message")
+        if is_summary(item):
+            lines.append(f"Previous summary: {_message_text(data['content'])[len(SUMMARY_PREFIX):].strip()}")
+        elif item_type == "message":
+            lines.append(f"{data.get('role', 'unknown')}: {_message_text(data.get('content', ''))}")
+        elif item_type == "function_call":
+            lines.append(f"tool call: {data.get('name')}({data.get('arguments')})")
+        elif item_type == "function_call_output":
+            lines.append(f"tool result: {data.get('output')}")
+    return "\n".join(lines)
+
+
+class SessionCompactor:
+    """Fold older turns of a session into a rolling summary.
+
+    Args:
+        token_budget: Estimated tokens above which a session is compacted.
+        keep_turns: Number of most recent turns kept raw.
+        summarizer: Agent that turns a transcript into a summary.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = SESSION_TOKEN_BUDGET,
+        keep_turns: int = SESSION_KEEP_TURNS,
+        summarizer: Agent = summarizer_agent,
+    ) -> None:
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summarizer = summarizer
+        self._in_flight: Set[str] = set()
+        self._tasks: Set["asyncio.Task[bool]"] = set()
+
+    def select_rows_to_fold(self, rows: List[Row]) -> List[Row]:
+        """Return the rows to fold into the summary.
+
+        Rows of the last `keep_turns` turns are kept, as are function calls and
+        outputs whose call_id also appears in a kept row (together with the
+        reasoning item that produced the call).
+        """
+        turns = split_turns(rows)
+        if len(turns) <= self.keep_turns:
+            return []
+        old = [row for turn in turns[: -self.keep_turns] for row in turn]
+        kept = [row for turn in turns[-self.keep_turns :] for row in turn]
+        referenced = {_item_dict(item).get("call_id") for _, item in kept} - {None}
+
+        retained: Set[int] = set()
+        for index, (row_id, item) in enumerate(old):
+            if _item_dict(item).get("call_id") in referenced:
+                retained.add(row_id)
+                previous = _item_dict(old[index - 1][1]) if index > 0 else {}
+                if previous.get("type") == "reasoning":
+                    retained.add(old[index - 1][0])
+        return [row for row in old if row[0] not in retained]
+
+    async def compact(self, session: PooledSQLiteSession, user_id: Optional[str] = None) -> bool:
+        """Compact the session if it exceeds the token budget.
+
+        Args:
+            session: The session to compact.
+            user_id: The user the summarizer's usage is accounted to. Defaults to the session id.
+
+        Returns:
+            bool: True if older turns were folded into a summary.
+        """
+        if await session.history_size() // CHARS_PER_TOKEN <= self.token_budget:
+            return False
+        folded = self.select_rows_to_fold(await session.get_rows())
+        if not folded:
+            return False
+
+        transcript = render_transcript([item for _, item in folded])
+        async with track_usage(user_id or session.session_id, session.session_id):
+            result = await Runner.run(self.summarizer, transcript, run_config=nested_run_config, hooks=usage_hook)
+        await session.replace_rows([row_id for row_id, _ in folded], summary_item(str(result.final_output)))
+        logger.debug("Compacted session '%s': folded %d items into a summary", session.session_id, len(folded))
+        return True
+
+    def schedule(self, session: PooledSQLiteSession, user_id: Optional[str] = None) -> Optional["asyncio.Task[bool]"]:
+        """Compact the session in the background, at most once at a time per session.
+
+        Args:
+            session: The session to compact.
+            user_id: The user the summarizer's usage is accounted to (see compact()).
+
+        Returns:
+            The background task, or None if a compaction of this session is already running.
+        """
+        if session.session_id in self._in_flight:
+            return None
+        self._in_flight.add(session.session_id)
+
+        async def _run() -> bool:
+            try:
+                return await self.compact(session, user_id)
+            except Exception as e:
+                logger.error("Failed to compact session '%s': %s", session.session_id, e)
+                return False
+            finally:
+                self._in_flight.discard(session.session_id)
+
+        task = asyncio.get_running_loop().create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+session_compactor = SessionCompactor()
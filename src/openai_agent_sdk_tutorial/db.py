@@ -0,0 +1,97 @@
+"""Shared SQLite helpers for the application's local database.
+
+Conversation sessions and the push-notification outbox live in the same
+SQLite file (``memory.db`` by default). Set the ``AGENT_DB_PATH`` environment
+variable to store it somewhere else.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import (
+    Iterator,
+    List,
+)
+
+
+DB_PATH = os.getenv("AGENT_DB_PATH", "memory.db")
+
+
+def connect(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """Open a connection configured for concurrent access.
+
+    WAL mode lets readers proceed while a writer is active, and busy_timeout
+    makes competing writers wait instead of failing with "database is locked".
+
+    Args:
+        db_path: Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: A connection usable from any thread.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class ConnectionPool:
+    """A small, thread-safe pool of reusable SQLite connections.
+
+    Connections are opened lazily up to `max_size` and returned to the pool after
+    use, so concurrent operations reuse warm connections instead of opening a
+    new one per call. An in-memory database only exists per connection, so the
+    pool is limited to a single connection for ":memory:".
+
+    Args:
+        db_path: Path to the SQLite database file.
+        max_size: Maximum number of open connections.
+
+    Examples:
+    ::
+
+        >>> pool = ConnectionPool("memory.db")
+        >>> with pool.connection() as conn:
+        ...     conn.execute("SELECT 1")
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_size: int = 8) -> None:
+        self.db_path = db_path
+        self.max_size = 1 if db_path == ":memory:" else max_size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, waiting for one to be returned if the pool is exhausted."""
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.max_size:
+                conn = connect(self.db_path)
+                self._all.append(conn)
+                return conn
+        return self._idle.get()
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+            self._idle = queue.LifoQueue()
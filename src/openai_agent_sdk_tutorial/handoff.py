@@ -40,7 +40,13 @@ For more details, see:
 https://openai.github.io/openai-agents-python/handoffs/
 """
 
+import json
 import logging
+import os
+from typing import (
+    List,
+    Sequence,
+)
 
 from pydantic import (
     BaseModel,
@@ -49,13 +55,30 @@ from pydantic import (
 
 from agents import (
     Agent,
+    HandoffCallItem,
     HandoffInputData,
     RunContextWrapper,
+    TResponseInputItem,
     handoff,
 )
 
+from .compaction import (
+    CHARS_PER_TOKEN,
+    is_summary,
+    is_user_message,
+    render_transcript,
+    split_turns,
+)
 from .hook import MyAgentHook
-from .tool import send_contact_request_tool
+from .routing import (
+    ASSISTANT,
+    model_router,
+)
+from .speculation import input_guardrails_passed
+from .tool import (
+    capture_contact,
+    send_contact_request_tool,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -106,8 +129,14 @@ async def on_escalation(context: RunContextWrapper, input_data: EscalationData)
                  Runner.run(context=...). Access custom data via context.context.
         input_data: The structured escalation data populated by the LLM,
                     validated against the EscalationData model.
+
+    Raises:
+        SpeculationAborted: If an input guardrail of the run tripped while the
+                            escalation was decided speculatively (see speculation.py).
     """
     logger.debug("Handoff executed. Context: %s", context.context)
+    # Nobody is notified about an escalation for input the guardrail rejects
+    await input_guardrails_passed()
     # In production, this might:
     # - Send a Slack notification to supervisors
     # - Create a ticket in a support system
@@ -129,47 +158,147 @@ async def on_escalation(context: RunContextWrapper, input_data: EscalationData)
 # The filter receives HandoffInputData and must return HandoffInputData.
 # Modifying input_items affects what the target agent sees, while new_items
 # is preserved for session history.
+#
+# Token-Budgeted History:
+# ----------------------
+# Without a filter the escalation agent receives the entire conversation,
+# including every tool call and tool output of the notification agent, and
+# pays for it on every model call it makes. HandoffHistoryFilter hands over
+# only what a supervisor needs:
+#
+# ```
+# history + pre_handoff_items + new_items
+#     │
+#     ├─► tool calls, tool outputs, reasoning ──────────► dropped (counted in the note)
+#     ├─► turns before the last HANDOFF_KEEP_TURNS ──────► cut (excerpts in the note)
+#     └─► last turns, oldest dropped while over HANDOFF_TOKEN_BUDGET
+#
+# result: [note: handoff reason + what was cut] [kept user/assistant turns]
+# ```
+#
+# The note is built locally, without a model call, so the handoff does not get
+# slower. The latest turn is always kept. The session keeps the full history.
+
+HANDOFF_KEEP_TURNS = int(os.getenv("HANDOFF_KEEP_TURNS", "3"))
+HANDOFF_TOKEN_BUDGET = int(os.getenv("HANDOFF_TOKEN_BUDGET", "1000"))
+
 
+def estimate_tokens(items: Sequence[TResponseInputItem]) -> int:
+    """Estimate the tokens of input items from their JSON size (see compaction.py)."""
+    return sum(len(json.dumps(item, default=str)) for item in items) // CHARS_PER_TOKEN
 
-def handoff_input_filter(handoff_input_data: HandoffInputData) -> HandoffInputData:
-    """Filter and transform conversation history before handoff.
 
-    This function is called before the target agent receives the conversation.
-    It can modify what history the new agent sees while preserving the full
-    history for session records.
+def _excerpt(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[: max_chars - 3] + "..."
+
+
+class HandoffHistoryFilter:
+    """Input filter handing the target agent the recent conversation within a token budget.
 
     Args:
-        handoff_input_data: Contains all conversation history components:
-            - input_history: Input history before `Runner.run()` was called
-            - pre_handoff_items: Items generated before the agent turn where the handoff was invoked
-            - new_items: New items generated during the current agent turn, including the item that
-                    triggered the handoff
-            - input_items: Items to include in the next agent's input. When set, these items are used
-                    instead of new_items for building the input to the next agent.
-            - run_context: Current execution context
-
-    Returns:
-        HandoffInputData: Modified handoff data. The input_items field
-        determines what the target agent receives.
+        keep_turns: Maximum number of most recent user/assistant turns handed over.
+        token_budget: Estimated tokens of the turns handed over; older turns are
+                      cut until they fit, but the latest turn is always kept.
+        excerpts: Maximum number of cut user messages quoted in the note.
+        excerpt_chars: Maximum length of each quote.
     """
-    input_history = handoff_input_data.input_history
-    pre_handoff_items = handoff_input_data.pre_handoff_items
-    new_items = handoff_input_data.new_items
-    input_items = handoff_input_data.input_items
-
-    # Currently passing through unchanged - customize as needed
-    filtered_input_history = input_history
-    filtered_pre_handoff_items = pre_handoff_items
-    filtered_new_items = new_items
-    filtered_input_items = input_items
-
-    return HandoffInputData(
-        input_history=filtered_input_history,
-        pre_handoff_items=filtered_pre_handoff_items,
-        new_items=filtered_new_items,
-        input_items=filtered_input_items,
-        run_context=handoff_input_data.run_context,
-    )
+
+    def __init__(
+        self,
+        keep_turns: int = HANDOFF_KEEP_TURNS,
+        token_budget: int = HANDOFF_TOKEN_BUDGET,
+        excerpts: int = 3,
+        excerpt_chars: int = 120,
+    ) -> None:
+        self.keep_turns = max(keep_turns, 1)
+        self.token_budget = token_budget
+        self.excerpts = excerpts
+        self.excerpt_chars = excerpt_chars
+
+    def __call__(self, handoff_input_data: HandoffInputData) -> HandoffInputData:
+        """Filter and transform conversation history before handoff.
+
+        This function is called before the target agent receives the conversation.
+        It can modify what history the new agent sees while preserving the full
+        history for session records.
+
+        Args:
+            handoff_input_data: Contains all conversation history components:
+                - input_history: Input history before `Runner.run()` was called
+                - pre_handoff_items: Items generated before the agent turn where the handoff was invoked
+                - new_items: New items generated during the current agent turn, including the item that
+                        triggered the handoff
+                - input_items: Items to include in the next agent's input. When set, these items are used
+                        instead of new_items for building the input to the next agent.
+                - run_context: Current execution context
+
+        Returns:
+            HandoffInputData: Modified handoff data. The trimmed conversation is returned
+            as input_history; input_items is emptied so nothing else is appended, and
+            new_items is left unchanged for the session.
+        """
+        history = handoff_input_data.input_history
+        generated = handoff_input_data.input_items
+        if generated is None:
+            generated = handoff_input_data.new_items
+        items: List[TResponseInputItem] = (
+            [{"role": "user", "content": history}] if isinstance(history, str) else list(history)
+        )
+        items += [item.to_input_item() for item in handoff_input_data.pre_handoff_items + generated]
+
+        messages = [item for item in items if _item_type(item) == "message"]
+        turns = [[item for _, item in turn] for turn in split_turns(list(enumerate(messages)))]
+        kept = turns[-self.keep_turns :]
+        while len(kept) > 1 and estimate_tokens([item for turn in kept for item in turn]) > self.token_budget:
+            kept.pop(0)
+        cut = [item for turn in turns[: len(turns) - len(kept)] for item in turn]
+
+        note = self.note(self.handoff_reason(handoff_input_data), cut, len(items) - len(messages))
+        filtered = [note] + [item for turn in kept for item in turn]
+        logger.debug(
+            "Handoff history: kept %d of %d turns (~%d tokens), dropped %d tool items",
+            len(kept),
+            len(turns),
+            estimate_tokens(filtered),
+            len(items) - len(messages),
+        )
+        return handoff_input_data.clone(input_history=tuple(filtered), pre_handoff_items=(), input_items=())
+
+    @staticmethod
+    def handoff_reason(handoff_input_data: HandoffInputData) -> str:
+        """Return the reason the calling agent gave for the handoff (see EscalationData)."""
+        for item in reversed(handoff_input_data.new_items):
+            if isinstance(item, HandoffCallItem):
+                try:
+                    arguments = json.loads(item.raw_item.arguments or "{}")
+                except json.JSONDecodeError:
+                    return item.raw_item.arguments
+                return str(arguments.get("reason", "")) if isinstance(arguments, dict) else ""
+        return ""
+
+    def note(self, reason: str, cut: List[TResponseInputItem], tool_items: int) -> TResponseInputItem:
+        """Compact summary of the handoff for the target agent: its reason and what was left out."""
+        lines = ["The conversation was handed over to you by another agent."]
+        if reason:
+            lines.append(f"Reason for the handoff: {reason}")
+        turns = sum(1 for item in cut if is_user_message(item))
+        if turns or tool_items:
+            lines.append(f"Left out to save tokens: {turns} earlier turns and {tool_items} tool calls and outputs.")
+        for item in cut:
+            if is_summary(item):
+                lines.append(f"Earlier summary: {_excerpt(render_transcript([item]), 4 * self.excerpt_chars)}")
+        quotes = [render_transcript([item]) for item in cut if is_user_message(item)][-self.excerpts :]
+        lines.extend(f"Earlier {_excerpt(quote, self.excerpt_chars)}" for quote in quotes)
+        message: TResponseInputItem = {"role": "developer", "content": "\n".join(lines)}
+        return message
+
+
+def _item_type(item: TResponseInputItem) -> str:
+    return str(item.get("type", "message")) if isinstance(item, dict) else ""
+
+
+handoff_input_filter = HandoffHistoryFilter()
 
 
 # =============================================================================
@@ -196,13 +325,14 @@ Guidelines:
 - Do not engage in small talk or pleasantries
 - Always replay in Spanish
 """,
-    model="gpt-5.2",
-    tools=[send_contact_request_tool],
+    # Both implement send_contact_request; only the one selected by CONTACT_CAPTURE_MODE is enabled
+    tools=[send_contact_request_tool, capture_contact],
     # handoff_description helps the CALLING agent decide when to use this handoff.
     # It's shown to the LLM as part of the tool description.
     handoff_description="Escalate the request if the user asks you to talk to a supervisor",
     hooks=MyAgentHook(),
 )
+model_router.route(ASSISTANT, escalation_agent)
 
 
 # =============================================================================
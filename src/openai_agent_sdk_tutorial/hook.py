@@ -54,10 +54,13 @@ Implementation Notes:
 """
 
 import logging
+import time
 from typing import (
     Any,
+    Dict,
     List,
     Optional,
+    Tuple,
 )
 
 from agents import (
@@ -70,6 +73,16 @@ from agents import (
     TResponseInputItem,
 )
 
+from .accounting import record_usage
+from .metrics import (
+    agent_active_seconds,
+    handoffs_total,
+    llm_call_seconds,
+    tool_call_seconds,
+)
+from .routing import model_router
+from .speculation import track_speculative_task
+
 
 logger = logging.getLogger(__name__)
 
@@ -289,3 +302,124 @@ class MyAgentHook(AgentHooks):
             response: The ModelResponse from the LLM
         """
         logger.debug("AgentHook: LLM call completed for agent '%s'", agent.name)
+
+
+# =============================================================================
+# METRICS HOOK
+# =============================================================================
+# Hooks see the start and end of every agent, model call and tool call, which is
+# exactly what is needed to time them. MetricsRunHook keeps the logging of
+# MyRunHook and records the durations into the histograms of metrics.py.
+#
+# A RunHooks instance is passed to a single Runner.run() call, so the pending
+# start times live on the instance. A RunHook is enough: it sees the events of
+# every agent in the run, while an AgentHook would have to be attached to each
+# agent. Agents-as-tools run nested, so their whole run is timed as one tool call.
+#
+# on_llm_end also receives the token usage of every model call, which is added
+# to the request's usage (see accounting.py).
+
+
+class MetricsRunHook(MyRunHook):
+    """Run hooks recording agent, LLM call and tool call durations.
+
+    They also register a speculative first turn with the request's
+    SpeculationGate, so that it can be cancelled (see speculation.py).
+
+    Use a new instance for every run:
+
+        await Runner.run(agent, input, hooks=MetricsRunHook())
+    """
+
+    def __init__(self) -> None:
+        self._agent_started: Dict[str, float] = {}
+        self._llm_started: Dict[str, List[float]] = {}
+        self._tool_started: Dict[Tuple[str, str], List[float]] = {}
+
+    async def on_agent_start(self, context: RunContextWrapper, agent: Agent) -> None:
+        await super().on_agent_start(context, agent)
+        self._agent_started.setdefault(agent.name, time.perf_counter())
+
+    async def on_agent_end(self, context: RunContextWrapper, agent: Agent, output: Any) -> None:
+        await super().on_agent_end(context, agent, output)
+        self._observe_agent(agent)
+
+    async def on_handoff(self, context: RunContextWrapper, from_agent: Agent, to_agent: Agent) -> None:
+        await super().on_handoff(context, from_agent, to_agent)
+        handoffs_total.inc(from_agent.name, to_agent.name)
+        self._observe_agent(from_agent)
+
+    async def on_tool_start(self, context: RunContextWrapper, agent: Agent, tool: Tool) -> None:
+        await super().on_tool_start(context, agent, tool)
+        self._tool_started.setdefault((agent.name, tool.name), []).append(time.perf_counter())
+
+    async def on_tool_end(self, context: RunContextWrapper, agent: Agent, tool: Tool, result: str) -> None:
+        await super().on_tool_end(context, agent, tool, result)
+        started = self._tool_started.get((agent.name, tool.name))
+        if started:
+            tool_call_seconds.observe(time.perf_counter() - started.pop(0), agent.name, tool.name)
+
+    async def on_llm_start(
+        self,
+        context: RunContextWrapper,
+        agent: Agent,
+        system_prompt: Optional[str],
+        input_items: List[TResponseInputItem],
+    ) -> None:
+        await super().on_llm_start(context, agent, system_prompt, input_items)
+        self._llm_started.setdefault(agent.name, []).append(time.perf_counter())
+        # A first turn started before the input guardrails passed is cancelled if they trip
+        track_speculative_task()
+
+    async def on_llm_end(self, context: RunContextWrapper, agent: Agent, response: ModelResponse) -> None:
+        await super().on_llm_end(context, agent, response)
+        started = self._llm_started.get(agent.name)
+        if started:
+            seconds = time.perf_counter() - started.pop(0)
+            llm_call_seconds.observe(seconds, agent.name)
+            model_router.observe(agent, seconds)
+        record_usage(agent, response.usage)
+
+    def _observe_agent(self, agent: Agent) -> None:
+        started = self._agent_started.pop(agent.name, None)
+        if started is not None:
+            agent_active_seconds.observe(time.perf_counter() - started, agent.name)
+
+
+class UsageRunHook(RunHooks):
+    """Run hooks adding the token usage and model call durations of a nested run to the metrics.
+
+    Guardrail agents, agents-as-tools and the history summarizer run in their own
+    Runner.run() calls, which do not inherit the main run's hooks. Calls in flight
+    are keyed by their run's context, so a single instance can be shared by
+    concurrent runs:
+
+        agent.as_tool(tool_name="my_tool", tool_description="...", hooks=UsageRunHook(tool="my_tool"))
+
+    Args:
+        tool: The tool the nested run serves, used to attribute its usage.
+    """
+
+    def __init__(self, tool: str = "") -> None:
+        self.tool = tool
+        self._llm_started: Dict[Tuple[int, str], float] = {}
+
+    async def on_llm_start(
+        self,
+        context: RunContextWrapper,
+        agent: Agent,
+        system_prompt: Optional[str],
+        input_items: List[TResponseInputItem],
+    ) -> None:
+        self._llm_started[(id(context), agent.name)] = time.perf_counter()
+
+    async def on_llm_end(self, context: RunContextWrapper, agent: Agent, response: ModelResponse) -> None:
+        started = self._llm_started.pop((id(context), agent.name), None)
+        if started is not None:
+            seconds = time.perf_counter() - started
+            llm_call_seconds.observe(seconds, agent.name)
+            model_router.observe(agent, seconds)
+        record_usage(agent, response.usage, tool=self.tool)
+
+
+usage_hook = UsageRunHook()
@@ -0,0 +1,273 @@
+"""Lexicon module providing a deterministic foul-language screen.
+
+Most user messages are plainly clean, and a few are plainly offensive; neither
+needs an LLM to decide whether it is foul language. This module screens text
+against a configurable lexicon in a single pass: plainly foul messages trip
+the input guardrail without a model call, and only messages in the ambiguous
+band leave the foul-language decision to the input classifier (which still
+labels every message for the other policies, see guardrail.py).
+
+Screening Flow:
+--------------
+```
+text ──► normalize ──► Aho-Corasick scan ──┬─► "block" term found        ──► foul       (trip, no LLM call)
+         (case, accents,                   ├─► "review" term or masked   ──► ambiguous  (classifier decides)
+          leetspeak, repeats)              └─► nothing found             ──► clean      (not foul language)
+```
+
+A "block" term only trips the guardrail when it is confirmed: found with the
+word's double letters intact, as the whole word or followed by a common
+inflection ("fucking", "bitches"). Other hits ("shiitake" only matches once
+"ii" is collapsed, "Shitty Creek" only as a prefix) are reviewed instead.
+
+Normalization:
+-------------
+- Lowercase and strip accents ("Ŝhït" → "shit")
+- Map leetspeak characters inside words ("sh1t", "$h!t" → "shit")
+- Collapse runs of three or more characters ("shiiiit" → "shit"); a second scan
+  also collapses double letters ("shiit" → "shit"), and its hits are only reviewed
+- Punctuation becomes a word separator, except masking characters ("f*ck")
+
+Lexicon Format:
+--------------
+One entry per line, `#` starts a comment. A trailing `*` matches any word that
+starts with the term; otherwise the whole word (or phrase) must match. An
+optional second column sets the category (`block` by default, or `review`):
+
+    fuck*           block
+    hell            review
+    screw you       review
+
+Configuration (environment variables):
+-------------------------------------
+- FOUL_LANGUAGE_LEXICON: Path of a lexicon file replacing the built-in one
+"""
+
+import os
+import re
+import unicodedata
+from collections import deque
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+
+FOUL_LANGUAGE_LEXICON = os.getenv("FOUL_LANGUAGE_LEXICON") or None
+
+DEFAULT_LEXICON = """
+# Clear-cut profanity and slurs: decided locally
+fuck*           block
+motherfuck*     block
+shit*           block
+bullshit*       block
+bitch*          block
+bastard*        block
+asshole*        block
+cunt*           block
+dickhead*       block
+wanker*         block
+prick           block
+# Context-dependent words: escalate to the guardrail agent
+damn*           review
+hell            review
+crap*           review
+piss*           review
+dick            review
+suck*           review
+screw you       review
+idiot*          review
+moron*          review
+stupid          review
+"""
+
+BLOCK = "block"
+REVIEW = "review"
+
+FOUL = "foul"
+AMBIGUOUS = "ambiguous"
+CLEAN = "clean"
+
+_LEET = {"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s", "!": "i", "+": "t"}
+# Only substitute inside words, so "hell!" keeps its punctuation but "sh!t" does not
+_LEET_IN_WORD = re.compile(r"[013457@$!+](?=[a-z0-9@$!+])")
+_SEPARATORS = re.compile(r"[^a-z0-9*# ]+")
+_REPEATS = re.compile(r"(.)\1+")
+_RUNS = re.compile(r"(.)\1{2,}")
+# Word endings after a prefix term that still confirm a "block" hit ("fuck" + "ing")
+_INFLECTIONS = frozenset(["", "s", "es", "ed", "er", "ers", "in", "ing", "ings"])
+_MASKED_WORD = re.compile(r"[a-z][*#]+[a-z]")
+
+
+def normalize(text: str, keep_doubles: bool = False) -> str:
+    """Normalize text for lexicon matching.
+
+    Args:
+        text: The raw text.
+        keep_doubles: Only collapse runs of three or more characters, so "shiitake" stays intact.
+
+    Returns:
+        str: Lowercase ASCII words separated by single spaces.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    mapped = _LEET_IN_WORD.sub(lambda m: _LEET[m.group()], stripped.lower())
+    words = _SEPARATORS.sub(" ", mapped)
+    return " ".join((_RUNS if keep_doubles else _REPEATS).sub(r"\1", words).split())
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher finding all patterns in one pass over the text.
+
+    Args:
+        patterns: Mapping of pattern to an arbitrary payload returned with each match.
+    """
+
+    def __init__(self, patterns: Dict[str, str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self._payload = dict(patterns)
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str, str]]:
+        """Yield (start index, pattern, payload) for every occurrence of every pattern."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern in self._output[state]:
+                yield index - len(pattern) + 1, pattern, self._payload[pattern]
+
+
+@dataclass
+class LexiconResult:
+    """Outcome of screening a text against the lexicon."""
+
+    verdict: str
+    blocked: List[str] = field(default_factory=list)
+    review: List[str] = field(default_factory=list)
+    masked: bool = False
+
+
+class Lexicon:
+    """Foul-language lexicon compiled into an Aho-Corasick automaton.
+
+    Word boundaries are encoded in the patterns themselves: the normalized text
+    is padded with spaces, whole-word terms become " term " and prefix terms
+    become " term", so matching needs no separate boundary checks.
+
+    Args:
+        entries: (term, category) pairs; terms ending in "*" match word prefixes.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]) -> None:
+        entries = list(entries)
+        self._matcher, self._terms = self._compile(entries, keep_doubles=True)
+        self._loose_matcher, self._loose_terms = self._compile(entries, keep_doubles=False)
+
+    @staticmethod
+    def _compile(entries: List[Tuple[str, str]], keep_doubles: bool) -> Tuple[AhoCorasick, Dict[str, str]]:
+        patterns: Dict[str, str] = {}
+        terms: Dict[str, str] = {}
+        for term, category in entries:
+            prefix = term.endswith("*")
+            normalized = normalize(term.rstrip("*"), keep_doubles)
+            if not normalized:
+                continue
+            pattern = f" {normalized}" if prefix else f" {normalized} "
+            patterns[pattern] = category
+            terms[pattern] = term
+        return AhoCorasick(patterns), terms
+
+    @classmethod
+    def parse(cls, text: str) -> "Lexicon":
+        """Build a lexicon from its text format (see module docstring)."""
+        entries = []
+        for line in text.splitlines():
+            words = line.split("#", 1)[0].split()
+            if not words:
+                continue
+            category = BLOCK
+            if len(words) > 1 and words[-1] in (BLOCK, REVIEW):
+                category = words.pop()
+            entries.append((" ".join(words), category))
+        return cls(entries)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "Lexicon":
+        """Load the lexicon from a file, or the built-in lexicon if no path is given."""
+        if path is None:
+            return cls.parse(DEFAULT_LEXICON)
+        with open(path, encoding="utf-8") as f:
+            return cls.parse(f.read())
+
+    def screen(self, text: str) -> LexiconResult:
+        """Classify text as foul, ambiguous or clean.
+
+        Args:
+            text: The text to screen.
+
+        Returns:
+            LexiconResult: The verdict and the lexicon terms that matched.
+        """
+        normalized = f" {normalize(text, keep_doubles=True)} "
+        loose = f" {normalize(text)} "
+        result = LexiconResult(verdict=CLEAN, masked=bool(_MASKED_WORD.search(loose)))
+        for start, pattern, category in self._matcher.iter_matches(normalized):
+            term = self._terms[pattern]
+            end = start + len(pattern)
+            ending = "" if pattern.endswith(" ") else normalized[end : normalized.index(" ", end)]
+            confirmed = category == BLOCK and ending in _INFLECTIONS
+            matches = result.blocked if confirmed else result.review
+            if term not in matches:
+                matches.append(term)
+        # Hits that need the double letters collapsed are never confirmed
+        for _, pattern, _ in self._loose_matcher.iter_matches(loose):
+            term = self._loose_terms[pattern]
+            if term not in result.blocked and term not in result.review:
+                result.review.append(term)
+        if result.blocked:
+            result.verdict = FOUL
+        elif result.review or result.masked:
+            result.verdict = AMBIGUOUS
+        return result
+
+
+foul_language_lexicon = Lexicon.load(FOUL_LANGUAGE_LEXICON)
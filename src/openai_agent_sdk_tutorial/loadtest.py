@@ -0,0 +1,279 @@
+"""Load test module driving the chat UI's chat() from many simulated users at once.
+
+The benchmark (see benchmark.py) measures one turn at a time; this module
+finds out how many concurrent users one process sustains. Simulated users
+call chat(), the function behind the Gradio chat UI, each with its own
+session, against the scripted local model with injected latency, so the only
+limits are the process itself: the event loop, the request scheduler, the
+SQLite sessions and the hooks.
+
+Load Models:
+-----------
+```
+closed loop   user 1 ──► chat ──► answer ──► think ──► chat ──► ...       throughput follows latency
+              user N ──► chat ──► answer ──► think ──► chat ──► ...
+
+open loop     arrivals at --rate per second (Poisson) ──► chat from the next user
+                                                         whether or not earlier turns have finished
+```
+
+A closed loop shows the latency of a fixed population; an open loop keeps
+sending at the offered rate, so past the saturation point queueing delay and
+busy answers grow instead of the throughput. Running the open loop at
+increasing rates locates that point.
+
+Report:
+------
+JSON with the answered, busy, refused and failed turns, the throughput, the p50/p95/p99
+latency of the first chunk and of the whole answer, the scheduler queueing
+delay (agent_scheduler_wait_seconds) and the event-loop lag: how late a
+periodic timer fires, i.e. how long the loop was blocked by synchronous work.
+
+Usage:
+-----
+    python -m openai_agent_sdk_tutorial.loadtest --mode closed --users 50 --duration 30
+    python -m openai_agent_sdk_tutorial.loadtest --mode open --rate 40 --duration 30 --model-latency 0.5
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import platform
+import random
+import time
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+import gradio as gr
+
+from .benchmark import (
+    ScriptedModelProvider,
+    percentiles,
+)
+from .util import (
+    isolate_environment,
+    run_quietly,
+    write_report,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Interval of the event-loop lag probe, in seconds
+LAG_PROBE_INTERVAL = 0.01
+
+Chat = Callable[..., AsyncIterator[str]]
+
+
+@dataclass
+class LoadResults:
+    """Samples collected during a load test, in seconds."""
+
+    latency: List[float] = field(default_factory=list)
+    first_chunk: List[float] = field(default_factory=list)
+    loop_lag: List[float] = field(default_factory=list)
+    answered: int = 0
+    busy: int = 0
+    # ERROR_MESSAGE answers: a guardrail tripped (some scripted messages are meant to) or the run failed
+    error_messages: int = 0
+    failed: int = 0
+
+
+def messages() -> List[str]:
+    """Return the user messages of the benchmark scenarios, cycled through by the simulated users."""
+    from .benchmark import scenarios
+
+    return [scenario.message for scenario in scenarios()]
+
+
+async def probe_loop_lag(results: LoadResults, stop: asyncio.Event) -> None:
+    """Record how late a periodic timer fires until stop is set."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        results.loop_lag.append(max(0.0, time.perf_counter() - start - LAG_PROBE_INTERVAL))
+
+
+async def chat_turn(chat: Chat, user: int, turn: int, message: str, results: LoadResults) -> None:
+    """Send one message through chat() as a user and record the outcome."""
+    from .agent import (
+        BUSY_MESSAGE,
+        ERROR_MESSAGE,
+    )
+
+    # Unique text per turn: the guardrail verdict cache must not turn the load into cache hits
+    text = f"{message} (turn {turn})"
+    request = gr.Request(session_hash=f"load-{user}")
+    start = time.perf_counter()
+    first_chunk: Optional[float] = None
+    answer = ""
+    try:
+        async for answer in chat(text, [], request):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+    except Exception as e:
+        logger.error("Turn %d of user %d failed: %s", turn, user, e)
+        results.failed += 1
+        return
+    results.latency.append(time.perf_counter() - start)
+    if answer == BUSY_MESSAGE:
+        results.busy += 1
+    elif answer == ERROR_MESSAGE:
+        results.error_messages += 1
+    else:
+        results.answered += 1
+        if first_chunk is not None:
+            results.first_chunk.append(first_chunk)
+
+
+async def closed_loop(chat: Chat, users: int, duration: float, think_time: float, results: LoadResults) -> None:
+    """Run a fixed population of users, each sending its next message after the previous answer."""
+    texts = messages()
+    deadline = time.perf_counter() + duration
+
+    async def user_loop(user: int) -> None:
+        for turn in itertools.count():
+            if time.perf_counter() >= deadline:
+                return
+            await chat_turn(chat, user, turn, texts[(user + turn) % len(texts)], results)
+            if think_time:
+                await asyncio.sleep(random.expovariate(1 / think_time))
+
+    await asyncio.gather(*(user_loop(user) for user in range(users)))
+
+
+async def open_loop(chat: Chat, users: int, rate: float, duration: float, results: LoadResults) -> None:
+    """Send messages at a Poisson arrival rate from a pool of users, regardless of earlier answers."""
+    texts = messages()
+    tasks: Set["asyncio.Task[None]"] = set()
+    start = time.perf_counter()
+    arrival = 0.0
+    for turn in itertools.count():
+        arrival += random.expovariate(rate)
+        if arrival >= duration:
+            break
+        await asyncio.sleep(max(0.0, start + arrival - time.perf_counter()))
+        task = asyncio.create_task(chat_turn(chat, turn % users, turn, texts[turn % len(texts)], results))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+
+
+async def run_load_test(
+    mode: str,
+    users: int,
+    duration: float,
+    model_latency: float,
+    rate: float = 10.0,
+    think_time: float = 0.0,
+) -> Dict[str, Any]:
+    """Drive chat() under load with a scripted model and return the JSON-serializable report.
+
+    Args:
+        mode: "closed" (users wait for each answer) or "open" (arrivals at a fixed rate).
+        users: Simulated users; in open-loop mode, the pool the arrivals are spread over.
+        duration: Seconds during which new messages are sent. Turns in flight are then awaited.
+        model_latency: Simulated seconds per model call.
+        rate: Open-loop arrivals per second.
+        think_time: Closed-loop mean pause between an answer and the next message, in seconds.
+    """
+    # Importing the UI and its agents blocks the loop for a while: done before the clock starts
+    from .metrics import scheduler_wait_seconds
+    from .provider import use_model_provider
+    from .scheduler import request_scheduler
+    from .ui import chat
+
+    provider = ScriptedModelProvider(model_latency)
+    results = LoadResults()
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(results, stop))
+    start = time.perf_counter()
+    with use_model_provider(provider):
+        if mode == "open":
+            await open_loop(chat, users, rate, duration, results)
+        else:
+            await closed_loop(chat, users, duration, think_time, results)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    turns = results.answered + results.busy + results.error_messages + results.failed
+
+    def quantiles(samples: List[float]) -> Optional[Dict[str, float]]:
+        return percentiles(samples) if samples else None
+
+    def wait_ms(q: float) -> Optional[float]:
+        value = scheduler_wait_seconds.quantile(q)
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "config": {
+            "mode": mode,
+            "users": users,
+            "rate": rate if mode == "open" else None,
+            "think_time_s": think_time if mode == "closed" else None,
+            "duration_s": duration,
+            "model_latency_ms": model_latency * 1000,
+            "max_concurrency": request_scheduler.max_concurrency,
+            "max_queue": request_scheduler.max_queue,
+            "python": platform.python_version(),
+        },
+        "turns": turns,
+        "answered": results.answered,
+        "busy": results.busy,
+        "error_messages": results.error_messages,
+        "failed": results.failed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(results.answered / elapsed, 3) if elapsed else 0.0,
+        "model_calls_per_turn": round(provider.calls.count / turns, 2) if turns else 0.0,
+        "latency_ms": quantiles(results.latency),
+        "first_chunk_ms": quantiles(results.first_chunk),
+        # Estimated from the histogram buckets; the histogram covers the whole process
+        "queue_wait_ms": {"p50": wait_ms(0.5), "p99": wait_ms(0.99)},
+        "event_loop_lag_ms": (
+            {**percentiles(results.loop_lag), "max": round(max(results.loop_lag) * 1000, 3)}
+            if results.loop_lag
+            else None
+        ),
+        "scheduler": request_scheduler.snapshot(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load test of the chat UI's chat() with simulated users and a scripted model"
+    )
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed", help="Load model (default closed)")
+    parser.add_argument("--users", "-u", type=int, default=20, help="Simulated users (default 20)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Open loop: arrivals per second (default 10)")
+    parser.add_argument(
+        "--think-time", type=float, default=0.0, help="Closed loop: mean seconds between turns (default 0)"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load (default 10)")
+    parser.add_argument(
+        "--model-latency", type=float, default=0.2, help="Simulated seconds per model call (default 0.2)"
+    )
+    parser.add_argument("--output", "-o", type=str, help="Write the JSON report to a file instead of stdout")
+    args = parser.parse_args()
+
+    isolate_environment()
+    report = run_quietly(
+        run_load_test(args.mode, args.users, args.duration, args.model_latency, args.rate, args.think_time)
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
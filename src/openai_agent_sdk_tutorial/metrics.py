@@ -0,0 +1,296 @@
+"""Metrics module recording stage latencies into histograms.
+
+Hooks see every LLM call, tool call and handoff, and guardrails know how long
+they take; this module turns those observations into fixed-bucket histograms
+cheap enough to record on every event, and renders them in the Prometheus
+text exposition format, so it is visible which stage dominates turn latency.
+
+Recorded Metrics:
+----------------
+```
+agent_turn_seconds{outcome}             Whole run_agent() turn (answered, input_guardrail, busy, ...)
+agent_scheduler_wait_seconds            Time an admitted request waited for a scheduler slot
+agent_active_seconds{agent}             Agent start until its final output or handoff
+agent_llm_call_seconds{agent}           One model call
+agent_route_llm_call_seconds{route,model}  One model call, by model route (see routing.py)
+agent_tool_call_seconds{agent,tool}     One tool call (agents-as-tools include their whole run)
+agent_guardrail_seconds{guardrail,decided_by}
+agent_handoffs_total{from_agent,to_agent}
+agent_tokens_total{agent,kind}          Tokens by kind (input, cached, output), see accounting.py
+agent_prompt_cache_hit_ratio{agent}     Share of one model call's input tokens read from the prompt cache
+agent_cost_usd_total{agent}             Estimated cost
+```
+
+Guardrail functions are timed with the @timed_guardrail decorator, which
+labels each check with the "decided_by" entry of its output_info (lexicon,
+detector, agent, ...), so fast-path decisions and model round-trips are kept apart.
+
+Component counters (scheduler, verdict cache, push outbox) are exported as
+gauges through collectors registered with register_collector().
+
+For the exposition format, see:
+https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+
+# Seconds; model calls dominate, so the buckets reach well into the tens of seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Ratios; the first bucket counts the calls that missed the cache entirely
+RATIO_BUCKETS = (0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """Fixed-bucket histogram with one series per label combination.
+
+    Args:
+        name: Metric name.
+        help: One-line description.
+        labelnames: Names of the labels, in order.
+        buckets: Upper bounds of the buckets, ascending.
+    """
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per series: [count per bucket (+Inf last)], sum
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket."""
+        series = self._series.get(labels)
+        if not series or not sum(series[0]):
+            return None
+        counts = series[0]
+        target = q * sum(counts)
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= target:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (target - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def summary(self) -> List[Dict[str, object]]:
+        """Return count, mean, p50 and p95 (rounded, in the metric's unit) per series, for dashboards."""
+        rows: List[Dict[str, object]] = []
+        for labels, (counts, total) in sorted(self._series.items()):
+            count = sum(counts)
+            p50, p95 = self.quantile(0.5, *labels), self.quantile(0.95, *labels)
+            rows.append(
+                {
+                    "metric": self.name,
+                    "labels": ", ".join(f"{k}={v}" for k, v in zip(self.labelnames, labels)),
+                    "count": count,
+                    "mean": round(total[0] / count, 4) if count else 0.0,
+                    "p50": round(p50, 4) if p50 is not None else None,
+                    "p95": round(p95, 4) if p95 is not None else None,
+                }
+            )
+        return rows
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per label combination."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._series[labels] = self._series.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._series.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the metrics of the process and renders them for scraping."""
+
+    def __init__(self) -> None:
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Counter] = {}
+        self._collectors: Dict[str, Callable[[], Mapping[str, float]]] = {}
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help, labelnames, buckets)
+        return self.histograms[name]
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        if name not in self.counters:
+            self.counters[name] = Counter(name, help, labelnames)
+        return self.counters[name]
+
+    def register_collector(self, prefix: str, collect: Callable[[], Mapping[str, float]]) -> None:
+        """Export the values returned by collect() as gauges named <prefix>_<key>.
+
+        Args:
+            prefix: Metric name prefix, e.g. "agent_scheduler".
+            collect: Returns the current values, e.g. RequestScheduler.snapshot.
+        """
+        self._collectors[prefix] = collect
+
+    def summary(self) -> List[Dict[str, object]]:
+        return [row for histogram in self.histograms.values() for row in histogram.summary()]
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for histogram in self.histograms.values():
+            lines.extend(histogram.render())
+        for counter in self.counters.values():
+            lines.extend(counter.render())
+        for prefix, collect in self._collectors.items():
+            for key, value in collect().items():
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+turn_seconds = metrics.histogram("agent_turn_seconds", "Duration of a whole agent turn.", ["outcome"])
+scheduler_wait_seconds = metrics.histogram(
+    "agent_scheduler_wait_seconds", "Time an admitted request waited for a scheduler slot."
+)
+agent_active_seconds = metrics.histogram(
+    "agent_active_seconds", "Time from agent start to its final output or handoff.", ["agent"]
+)
+llm_call_seconds = metrics.histogram("agent_llm_call_seconds", "Duration of one model call.", ["agent"])
+route_llm_call_seconds = metrics.histogram(
+    "agent_route_llm_call_seconds", "Duration of one model call by model route.", ["route", "model"]
+)
+tool_call_seconds = metrics.histogram("agent_tool_call_seconds", "Duration of one tool call.", ["agent", "tool"])
+guardrail_seconds = metrics.histogram(
+    "agent_guardrail_seconds", "Duration of one guardrail check.", ["guardrail", "decided_by"]
+)
+handoffs_total = metrics.counter("agent_handoffs_total", "Handoffs between agents.", ["from_agent", "to_agent"])
+tokens_total = metrics.counter(
+    "agent_tokens_total", "Model tokens by kind (input, cached, output).", ["agent", "kind"]
+)
+cost_total = metrics.counter("agent_cost_usd_total", "Estimated model cost in USD.", ["agent"])
+prompt_cache_hit_ratio = metrics.histogram(
+    "agent_prompt_cache_hit_ratio",
+    "Share of a model call's input tokens served from the provider's prompt cache.",
+    ["agent"],
+    buckets=RATIO_BUCKETS,
+)
+
+
+TGuardrailFunction = TypeVar("TGuardrailFunction", bound=Callable[..., Awaitable[Any]])
+
+
+def timed_guardrail(func: TGuardrailFunction) -> TGuardrailFunction:
+    """Record the duration of a guardrail function in agent_guardrail_seconds.
+
+    Apply below the SDK decorator, so the guardrail keeps the function's name:
+
+        @input_guardrail
+        @timed_guardrail
+        async def my_guardrail(context, agent, input): ...
+
+    Args:
+        func: An async guardrail function returning GuardrailFunctionOutput or
+              ToolGuardrailFunctionOutput.
+
+    Returns:
+        The wrapped function.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        decided_by = "error"
+        try:
+            output = await func(*args, **kwargs)
+            info = getattr(output, "output_info", None)
+            decided_by = str(info.get("decided_by", "agent")) if isinstance(info, dict) else "agent"
+            return output
+        finally:
+            guardrail_seconds.observe(time.perf_counter() - start, func.__name__, decided_by)
+
+    return cast(TGuardrailFunction, wrapper)
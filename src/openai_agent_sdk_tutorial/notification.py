@@ -0,0 +1,576 @@
+"""Notification module providing durable, non-blocking push delivery.
+
+Function tools run on the event loop thread, so a blocking HTTP call inside a
+tool stalls every other conversation served by the process. This module moves
+push delivery off the agent's critical path and makes it survive failures of
+the third-party service.
+
+Delivery Pipeline:
+-----------------
+```
+record_user_details ──► push() ──► PushOutbox.enqueue()     (SQLite, next to memory.db)
+                                        │   coalesces pending messages with the same key
+                                        ▼
+                                 push_outbox table
+                                        │
+                         ┌──────────────┼──────────────┐
+                         ▼              ▼              ▼
+                      worker 1       worker 2  ...  worker N   (bounded concurrency)
+                         │   claim a batch of due messages, join them into one request
+                         └──────────────┼──────────────┘
+                                        ▼
+                     PushClient (shared httpx.AsyncClient, keep-alive pool)
+                                        │
+                          success ──► delete rows
+                          failure ──► retry with exponential backoff, then mark dead
+```
+
+Several processes (e.g. server workers) can share one outbox: a claim is a
+lease, and only a claim that outlived it (its process died mid-delivery) is
+handed out again.
+
+Key Components:
+--------------
+- PushClient: Async Pushover client reusing pooled keep-alive connections
+- PushOutbox: SQLite-backed queue with coalescing, batching and retry bookkeeping
+- PushDispatcher: Background workers that drain the outbox
+- PushMetrics: Delivery counters, latency summary and queue depth
+
+Note: Requires PUSHOVER_TOKEN and PUSHOVER_USER environment variables. Without
+them, messages stay in the outbox until the process is restarted with credentials.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import httpx
+
+from .db import (
+    DB_PATH,
+    connect,
+)
+
+
+logger = logging.getLogger(__name__)
+
+PUSHOVER_URL = "https://api.pushover.net/1/messages.json"
+
+# Pushover rejects messages longer than 1024 characters
+PUSHOVER_MAX_MESSAGE_LENGTH = 1024
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+
+@dataclass
+class PushMetrics:
+    """Delivery metrics for the push dispatcher.
+
+    `notifications_*` count individual outbox entries while `requests_*` count
+    HTTP calls, so the ratio shows how much batching and coalescing save.
+    Latencies are kept in a bounded window so percentiles reflect recent traffic.
+    """
+
+    enqueued: int = 0
+    coalesced: int = 0
+    notifications_sent: int = 0
+    requests_sent: int = 0
+    requests_failed: int = 0
+    dead: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def record_latency(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+
+    def record_queue_depth(self, depth: int) -> None:
+        self.queue_depth = depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def percentile(self, pct: float) -> float:
+        """Return the given percentile (0-100) of recent delivery latencies in seconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return a flat copy of the metrics, suitable for logging or export."""
+        return {
+            "enqueued": self.enqueued,
+            "coalesced": self.coalesced,
+            "notifications_sent": self.notifications_sent,
+            "requests_sent": self.requests_sent,
+            "requests_failed": self.requests_failed,
+            "dead": self.dead,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_p50": self.percentile(50),
+            "latency_p95": self.percentile(95),
+            "latency_max": max(self.latencies, default=0.0),
+        }
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+
+class PushClient:
+    """Async Pushover client sharing one keep-alive connection pool.
+
+    The underlying httpx.AsyncClient is created lazily inside the running event
+    loop and re-created if the loop changes (e.g. between asyncio.run() calls).
+
+    Args:
+        url: The Pushover messages endpoint.
+        timeout: Per-request timeout in seconds.
+        max_connections: Maximum number of pooled connections.
+        max_keepalive_connections: Maximum number of idle connections kept open.
+    """
+
+    def __init__(
+        self,
+        url: str = PUSHOVER_URL,
+        timeout: float = 5.0,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+    ) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def configured(self) -> bool:
+        """True if Pushover credentials are available in the environment."""
+        return bool(os.getenv("PUSHOVER_TOKEN") and os.getenv("PUSHOVER_USER"))
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._loop = loop
+        return self._client
+
+    async def send(self, text: str) -> None:
+        """Send a single push notification.
+
+        Args:
+            text: The message text to send.
+
+        Raises:
+            httpx.HTTPError: If the request fails or Pushover rejects it.
+        """
+        response = await self._get_client().post(
+            self.url,
+            data={
+                "token": os.getenv("PUSHOVER_TOKEN"),
+                "user": os.getenv("PUSHOVER_USER"),
+                "message": text[:PUSHOVER_MAX_MESSAGE_LENGTH],
+            },
+        )
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+# =============================================================================
+# OUTBOX
+# =============================================================================
+
+
+class PushOutbox:
+    """SQLite-backed outbox of pending push notifications.
+
+    Methods are synchronous; the dispatcher runs them with asyncio.to_thread().
+
+    Coalescing: enqueueing a message with the same dedupe key as a still-pending
+    message created within `coalesce_window` seconds replaces that message
+    instead of adding a new row.
+
+    Batching: claim_batch() hands out several due messages at once, limited so
+    that their joined text fits in a single Pushover message.
+
+    Retries: failed messages are rescheduled with exponential backoff and jitter
+    and marked 'dead' after `max_attempts` failures.
+
+    Leases: claimed messages are 'inflight' from `claimed_at` on. Another claim
+    only takes them over once `lease` seconds have passed, so a process that
+    starts up never re-sends the batches another process is delivering.
+
+    Args:
+        db_path: Path to the SQLite database file.
+        coalesce_window: Seconds during which same-key messages are merged.
+        linger: Seconds a new message waits before it is due, giving duplicates
+                and other messages a chance to join the same batch.
+        max_attempts: Delivery attempts before a message is marked dead.
+        backoff_base: Delay in seconds before the first retry.
+        backoff_max: Upper bound for the retry delay in seconds.
+        lease: Seconds after which an unfinished claim is considered abandoned.
+               Must be longer than a delivery attempt (see PushClient.timeout).
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        coalesce_window: float = 60.0,
+        linger: float = 2.0,
+        max_attempts: int = 8,
+        backoff_base: float = 5.0,
+        backoff_max: float = 900.0,
+        lease: float = 120.0,
+    ) -> None:
+        self.db_path = db_path
+        self.coalesce_window = coalesce_window
+        self.linger = linger
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = connect(self.db_path)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS push_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dedupe_key TEXT,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL,
+                    claimed_at REAL,
+                    last_error TEXT
+                )
+            """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(push_outbox)")}
+            if "claimed_at" not in columns:
+                # Outboxes created before leases: their inflight rows have no claim time and count as expired
+                self._conn.execute("ALTER TABLE push_outbox ADD COLUMN claimed_at REAL")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_push_outbox_due ON push_outbox (status, next_attempt_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def enqueue(self, message: str, dedupe_key: Optional[str] = None) -> bool:
+        """Store a message for delivery.
+
+        Args:
+            message: The notification text.
+            dedupe_key: Optional key (e.g. the user's email) used for coalescing.
+
+        Returns:
+            bool: True if the message was merged into an existing pending entry.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._get_connection()
+            if dedupe_key is not None:
+                cursor = conn.execute(
+                    """
+                    UPDATE push_outbox SET message = ?
+                    WHERE id = (
+                        SELECT id FROM push_outbox
+                        WHERE dedupe_key = ? AND status = 'pending' AND created_at >= ?
+                        ORDER BY id DESC LIMIT 1
+                    )
+                    """,
+                    (message, dedupe_key, now - self.coalesce_window),
+                )
+                if cursor.rowcount:
+                    conn.commit()
+                    return True
+            conn.execute(
+                """
+                INSERT INTO push_outbox (dedupe_key, message, created_at, next_attempt_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (dedupe_key, message, now, now + self.linger),
+            )
+            conn.commit()
+            return False
+
+    def claim_batch(self, max_items: int, max_chars: int = PUSHOVER_MAX_MESSAGE_LENGTH) -> List[Tuple[int, str]]:
+        """Claim due messages whose joined text fits in a single notification.
+
+        Due messages are pending ones whose next attempt has come, and inflight
+        ones whose lease expired. The claim is atomic across processes.
+
+        Args:
+            max_items: Maximum number of messages to claim.
+            max_chars: Maximum length of the joined text.
+
+        Returns:
+            List of (id, message) tuples, oldest first. Empty if nothing is due.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._get_connection()
+            # Take the write lock before reading, so no other process claims the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    """
+                    SELECT id, message FROM push_outbox
+                    WHERE (status = 'pending' AND next_attempt_at <= ?)
+                       OR (status = 'inflight' AND (claimed_at IS NULL OR claimed_at <= ?))
+                    ORDER BY id ASC LIMIT ?
+                    """,
+                    (now, now - self.lease, max_items),
+                ).fetchall()
+                batch: List[Tuple[int, str]] = []
+                length = 0
+                for row_id, message in rows:
+                    length += len(message) + (1 if batch else 0)
+                    if batch and length > max_chars:
+                        break
+                    batch.append((row_id, message))
+                conn.executemany(
+                    "UPDATE push_outbox SET status = 'inflight', claimed_at = ? WHERE id = ?",
+                    [(now, row_id) for row_id, _ in batch],
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            return batch
+
+    def mark_sent(self, ids: List[int]) -> None:
+        with self._lock:
+            conn = self._get_connection()
+            conn.executemany("DELETE FROM push_outbox WHERE id = ?", [(row_id,) for row_id in ids])
+            conn.commit()
+
+    def mark_failed(self, ids: List[int], error: str) -> int:
+        """Reschedule failed messages with backoff.
+
+        Args:
+            ids: The ids of the messages that failed.
+            error: Description of the failure, stored for inspection.
+
+        Returns:
+            int: Number of messages that exhausted their attempts and are now dead.
+        """
+        now = time.time()
+        dead = 0
+        with self._lock:
+            conn = self._get_connection()
+            for row_id in ids:
+                row = conn.execute("SELECT attempts FROM push_outbox WHERE id = ?", (row_id,)).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                if attempts >= self.max_attempts:
+                    status, next_attempt_at = "dead", now
+                    dead += 1
+                else:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+                    status, next_attempt_at = "pending", now + delay * random.uniform(0.8, 1.2)
+                conn.execute(
+                    "UPDATE push_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (status, attempts, next_attempt_at, error, row_id),
+                )
+            conn.commit()
+        return dead
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = (
+                self._get_connection().execute("SELECT COUNT(*) FROM push_outbox WHERE status = 'pending'").fetchone()
+            )
+            return int(row[0])
+
+    def next_due_in(self) -> Optional[float]:
+        """Return seconds until the next message is due (or lease expires), or None if there is none."""
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    """
+                    SELECT MIN(CASE WHEN status = 'pending' THEN next_attempt_at ELSE COALESCE(claimed_at, 0) + ? END)
+                    FROM push_outbox WHERE status IN ('pending', 'inflight')
+                    """,
+                    (self.lease,),
+                )
+                .fetchone()
+            )
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+
+# =============================================================================
+# DISPATCHER
+# =============================================================================
+
+
+class PushDispatcher:
+    """Drain the push outbox from background workers.
+
+    submit() only writes the message to the outbox, so callers never wait for
+    Pushover. A fixed number of worker tasks bound the number of concurrent
+    deliveries; each one claims a batch of due messages and sends them as a
+    single notification.
+
+    Args:
+        client: The PushClient used for delivery.
+        outbox: The PushOutbox holding pending messages.
+        max_concurrency: Number of worker tasks delivering in parallel.
+        max_batch: Maximum number of outbox messages joined into one notification.
+        poll_interval: Maximum seconds an idle worker sleeps before checking the outbox.
+    """
+
+    def __init__(
+        self,
+        client: PushClient,
+        outbox: PushOutbox,
+        max_concurrency: int = 4,
+        max_batch: int = 20,
+        poll_interval: float = 30.0,
+    ) -> None:
+        self.client = client
+        self.outbox = outbox
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self.poll_interval = poll_interval
+        self.metrics = PushMetrics()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._warned_unconfigured = False
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if not self.client.configured:
+            if not self._warned_unconfigured:
+                logger.warning("Pushover credentials not set; notifications stay in the outbox")
+                self._warned_unconfigured = True
+            return
+        self._wakeup = asyncio.Event()
+        self._loop = loop
+        self._workers = [
+            loop.create_task(self._worker(), name=f"push-worker-{i}") for i in range(self.max_concurrency)
+        ]
+
+    async def submit(self, text: str, dedupe_key: Optional[str] = None) -> None:
+        """Store a message in the outbox and wake the workers.
+
+        Must be called from a running event loop.
+
+        Args:
+            text: The message text to send.
+            dedupe_key: Optional key used to coalesce repeated messages (e.g. an email).
+        """
+        self._ensure_started()
+        merged = await asyncio.to_thread(self.outbox.enqueue, text, dedupe_key)
+        self.metrics.enqueued += 1
+        if merged:
+            self.metrics.coalesced += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait_for_work(self) -> None:
+        assert self._wakeup is not None
+        self._wakeup.clear()
+        try:
+            next_due = await asyncio.to_thread(self.outbox.next_due_in)
+        except sqlite3.Error as e:
+            logger.error("Failed to read push outbox: %s", e)
+            next_due = None
+        timeout = self.poll_interval if next_due is None else min(next_due, self.poll_interval)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self) -> None:
+        # Outbox errors (e.g. "database is locked") are logged and never end the worker:
+        # a batch whose result could not be recorded is claimed again once its lease expires
+        while True:
+            try:
+                batch = await asyncio.to_thread(self.outbox.claim_batch, self.max_batch)
+                if not batch:
+                    self.metrics.record_queue_depth(await asyncio.to_thread(self.outbox.pending_count))
+            except sqlite3.Error as e:
+                logger.error("Failed to read push outbox: %s", e)
+                batch = []
+            if not batch:
+                await self._wait_for_work()
+                continue
+
+            ids = [row_id for row_id, _ in batch]
+            start = time.perf_counter()
+            error: Optional[Exception] = None
+            try:
+                await self.client.send("\n".join(message for _, message in batch))
+            except Exception as e:
+                error = e
+            finally:
+                self.metrics.record_latency(time.perf_counter() - start)
+
+            try:
+                if error is not None:
+                    self.metrics.requests_failed += 1
+                    dead = await asyncio.to_thread(self.outbox.mark_failed, ids, str(error))
+                    self.metrics.dead += dead
+                    logger.error("Failed to send push notification (%d messages, %d dead): %s", len(ids), dead, error)
+                else:
+                    self.metrics.requests_sent += 1
+                    self.metrics.notifications_sent += len(ids)
+                    await asyncio.to_thread(self.outbox.mark_sent, ids)
+            except sqlite3.Error as e:
+                logger.error("Failed to update push outbox (%d messages, retried after the lease): %s", len(ids), e)
+
+    async def aclose(self) -> None:
+        """Stop the workers and close the client's connection pool.
+
+        Undelivered messages stay in the outbox and are sent by the next process.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wakeup = None
+        self._loop = None
+        await self.client.aclose()
+
+
+push_dispatcher = PushDispatcher(PushClient(), PushOutbox())
@@ -0,0 +1,182 @@
+"""PII module providing a deterministic confidential-data detector.
+
+The confidential-information tool guardrail used to ask an LLM about every
+set of tool arguments. Most arguments are either plainly harmless (a name,
+an email address, a short note) or contain data with a recognizable,
+checksummed shape (a card number, an IBAN). This module decides those cases
+locally, so only the uncertain band escalates to the guardrail agent.
+
+Detection Flow:
+--------------
+```
+tool arguments ──► mask email addresses ──┬─► validated identifier found   ──► confidential (reject, no LLM call)
+                                          ├─► suspicious but unverified    ──► uncertain    (ask the guardrail agent)
+                                          └─► nothing found                ──► clean        (allow, no LLM call)
+```
+
+What Counts as Confidential:
+---------------------------
+- Social security numbers written as 123-45-6789 (valid area/group/serial)
+- Card and account numbers of 12-19 digits that pass the Luhn checksum
+- Account numbers introduced by a keyword ("account no. 12345678")
+- IBANs that pass the ISO 13616 mod-97 checksum
+- Passwords, PINs and secrets introduced by a keyword, when the value has a
+  digit or a symbol ("password: hunter2", "PIN is 4821")
+- API keys with well-known prefixes (sk-..., ghp_..., AKIA...)
+
+What Is Uncertain:
+-----------------
+- Unformatted 9-digit numbers, long digit runs failing the checksums
+- Keywords such as "SSN" or "credit card" without a recognizable value
+- Secret keywords followed by a plain word ("password is not working",
+  "token: expired"): the value is usually not a secret, the classifier decides
+- Long tokens mixing letters, digits and symbols
+
+Names, addresses, email addresses and phone numbers are not confidential.
+Findings never include the matched value, so they are safe to log.
+"""
+
+import json
+import re
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    List,
+    Tuple,
+)
+
+
+CONFIDENTIAL = "confidential"
+UNCERTAIN = "uncertain"
+CLEAN = "clean"
+
+_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_SSN = re.compile(r"(?<![\d-])(?!000|666|9\d\d)\d{3}[- ](?!00)\d{2}[- ](?!0000)\d{4}(?![\d-])")
+_NINE_DIGITS = re.compile(r"(?<!\d)\d{9}(?!\d)")
+# Digit runs, allowing single spaces or dashes between groups ("4111 1111-1111 1111")
+_DIGIT_RUN = re.compile(r"(?<![\d+])\d(?:[ -]?\d){11,18}(?!\d)")
+_IBAN = re.compile(r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]){11,30}\b")
+_ACCOUNT = re.compile(
+    r"\b(?:account|acct|a/c|routing|sort code|bsb)\b\s*(?:number|no\.?|num|#)?\s*(?:is|:|=)?\s*\d[\d -]{4,}\d",
+    re.IGNORECASE,
+)
+_SECRET = re.compile(
+    r"\b(?:password|passwd|pwd|passcode|passphrase|pin|cvv|cvc|secret|api[ _-]?key|token)\b"
+    r"\s*(?:is|:|=)\s*[\"']?(?P<value>[^\s\"']{3,})",
+    re.IGNORECASE,
+)
+_KEY_PREFIX = re.compile(
+    r"\b(?:sk-[A-Za-z0-9_-]{16,}|gh[pousr]_[A-Za-z0-9]{20,}|AKIA[0-9A-Z]{16}|xox[abpr]-[\w-]{10,})"
+)
+_KEYWORD = re.compile(
+    r"\b(?:ssn|social security|credit card|debit card|card number|cvv|iban|bank account|password|passcode|pin)\b",
+    re.IGNORECASE,
+)
+_MIXED_TOKEN = re.compile(r"(?<!\S)(?=\S*[A-Za-z])(?=\S*\d)(?=\S*[^\sA-Za-z0-9])\S{12,}(?!\S)")
+
+
+def looks_like_secret(value: str) -> bool:
+    """Return True if a value given after a secret keyword has a digit or a symbol.
+
+    Plain words ("not", "required", "expired", "Hunter") are more often the rest
+    of a sentence than a password, so they are left to the classifier.
+    """
+    value = value.rstrip(".,;:!?)")
+    return len(value) >= 3 and not value.isalpha()
+
+
+def luhn_valid(digits: str) -> bool:
+    """Return True if the digit string passes the Luhn checksum."""
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        value = int(char)
+        if index % 2 == 1:
+            value = value * 2 - 9 if value > 4 else value * 2
+        total += value
+    return total % 10 == 0
+
+
+def iban_valid(iban: str) -> bool:
+    """Return True if the IBAN passes the ISO 13616 mod-97 checksum."""
+    compact = iban.replace(" ", "").upper()
+    rearranged = compact[4:] + compact[:4]
+    return int("".join(str(int(char, 36)) for char in rearranged)) % 97 == 1
+
+
+@dataclass
+class PiiResult:
+    """Outcome of scanning a text for confidential data."""
+
+    verdict: str
+    confidential: List[str] = field(default_factory=list)
+    uncertain: List[str] = field(default_factory=list)
+
+
+def argument_text(arguments: str) -> str:
+    """Join the string values of a tool's JSON arguments, so JSON syntax is not scanned.
+
+    Falls back to the raw arguments if they are not a JSON object.
+    """
+    try:
+        parsed = json.loads(arguments)
+    except json.JSONDecodeError:
+        return arguments
+    if not isinstance(parsed, dict):
+        return arguments
+    return "\n".join(str(value) for value in parsed.values())
+
+
+def _scan_digit_runs(text: str) -> Tuple[List[str], List[str]]:
+    # Phone numbers (up to 11 digits, or 15 with a "+" prefix) never reach 12 digits here
+    confidential, uncertain = [], []
+    for match in _DIGIT_RUN.finditer(text):
+        digits = re.sub(r"\D", "", match.group())
+        if luhn_valid(digits):
+            confidential.append("card or account number")
+        else:
+            uncertain.append("long number")
+    return confidential, uncertain
+
+
+def detect_confidential(text: str) -> PiiResult:
+    """Classify text as confidential, uncertain or clean.
+
+    Args:
+        text: The text to scan, e.g. the output of argument_text().
+
+    Returns:
+        PiiResult: The verdict and the kinds of data found (never the values themselves).
+    """
+    text = _EMAIL.sub(" ", text)
+    result = PiiResult(verdict=CLEAN)
+
+    if _SSN.search(text):
+        result.confidential.append("social security number")
+    if any(iban_valid(match.group()) for match in _IBAN.finditer(text)):
+        result.confidential.append("IBAN")
+    if _ACCOUNT.search(text):
+        result.confidential.append("account number")
+    for match in _SECRET.finditer(text):
+        if looks_like_secret(match.group("value")):
+            result.confidential.append("password or secret")
+        else:
+            result.uncertain.append("secret keyword")
+    if _KEY_PREFIX.search(text):
+        result.confidential.append("API key")
+    confidential, uncertain = _scan_digit_runs(text)
+    result.confidential.extend(confidential)
+    result.uncertain.extend(uncertain)
+
+    if _NINE_DIGITS.search(text):
+        result.uncertain.append("9-digit number")
+    result.uncertain.extend(f"mentions {match.group().lower()}" for match in _KEYWORD.finditer(text))
+    if _MIXED_TOKEN.search(text):
+        result.uncertain.append("password-like token")
+
+    if result.confidential:
+        result.verdict = CONFIDENTIAL
+    elif result.uncertain:
+        result.verdict = UNCERTAIN
+    return result
@@ -0,0 +1,87 @@
+"""Prompt module rendering agent instructions for provider-side prompt caching.
+
+Providers cache the longest prefix of a prompt they have seen recently and
+bill those input tokens at a fraction of the price (reported as
+usage.input_tokens_details.cached_tokens). The cache only hits when the
+prefix is byte-for-byte identical, and the system prompt comes first in every
+model call, so a single varying byte near its start invalidates the whole
+prompt: tools, handoffs and the conversation history included.
+
+Instruction Layout:
+------------------
+```
+┌────────────────────────────────────────────┐
+│ static instructions (identical for all)    │ ◄── shared prefix, cached across users
+├────────────────────────────────────────────┤
+│ Current context: {"preferred_language":... │ ◄── canonical JSON, stable per user
+└────────────────────────────────────────────┘
+  conversation history ...                     ◄── grows at the end, cached per user
+```
+
+InstructionRenderer keeps the static part fixed, serializes the dynamic
+context canonically (sorted keys, fixed separators) at the tail only, and
+memoizes the rendered prompt per context value, so dynamic instructions are
+no longer rebuilt and logged on every model call.
+
+Whether the cache actually hits is visible in agent_prompt_cache_hit_ratio
+(see accounting.py and metrics.py).
+
+For more details, see:
+https://platform.openai.com/docs/guides/prompt-caching
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_HEADER = "\n\nCurrent context: "
+
+
+def canonical_json(value: Any) -> str:
+    """Serialize a value so that equal values always produce the same bytes."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class InstructionRenderer:
+    """Render static instructions followed by a canonically serialized context.
+
+    Args:
+        static: Instructions shared by every caller. They always form the prefix of the prompt.
+        max_entries: Rendered prompts kept in memory (least recently used ones are evicted).
+    """
+
+    def __init__(self, static: str, max_entries: int = 1024) -> None:
+        self.static = static
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._rendered: "OrderedDict[str, str]" = OrderedDict()
+
+    def render(self, context: Any) -> str:
+        """Return the instructions for a run context (the value passed to Runner.run(context=...))."""
+        if not context:
+            return self.static
+        key = canonical_json(context)
+        prompt = self._rendered.get(key)
+        if prompt is not None:
+            self.hits += 1
+            self._rendered.move_to_end(key)
+            return prompt
+        self.misses += 1
+        prompt = self.static + CONTEXT_HEADER + key
+        self._rendered[key] = prompt
+        if len(self._rendered) > self.max_entries:
+            self._rendered.popitem(last=False)
+        logger.debug("Rendered instructions for context %s", key)
+        return prompt
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the memo counters, e.g. for metrics.register_collector()."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._rendered)}
@@ -0,0 +1,95 @@
+"""Provider module selecting the model provider shared by every agent run.
+
+Agents only name their model ("gpt-5.2"); the model provider in the RunConfig
+turns that name into a Model. Guardrail agents, agents-as-tools and the
+history summarizer are separate Runner.run() calls that do not inherit the
+caller's RunConfig, so they pass nested_run_config, whose provider delegates
+to the same active provider as the main run.
+
+Provider Selection:
+------------------
+```
+RunConfig(model_provider=active_model_provider)
+        │
+        ▼
+use_model_provider(...) override? ──yes──► that provider (tests, benchmarks)
+        │ no
+        ▼
+AGENT_CASSETTE_MODE set? ──yes──► CassetteModelProvider (see cassette.py)
+        │ no
+        ▼
+MultiProvider (OpenAI)
+```
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Iterator,
+    Optional,
+)
+
+from agents import (
+    Model,
+    ModelProvider,
+    MultiProvider,
+    RunConfig,
+)
+
+from .cassette import (
+    AGENT_CASSETTE_DIR,
+    AGENT_CASSETTE_MODE,
+    CassetteModelProvider,
+)
+
+
+def default_model_provider() -> ModelProvider:
+    """Return the provider configured by the environment: cassettes if enabled, else OpenAI."""
+    if AGENT_CASSETTE_MODE is not None:
+        return CassetteModelProvider(AGENT_CASSETTE_MODE, AGENT_CASSETTE_DIR, inner=MultiProvider())
+    return MultiProvider()
+
+
+_override: ContextVar[Optional[ModelProvider]] = ContextVar("model_provider_override", default=None)
+
+
+class ActiveModelProvider(ModelProvider):
+    """Model provider delegating to the override of the current context, or the default provider."""
+
+    def __init__(self) -> None:
+        self._default: Optional[ModelProvider] = None
+
+    @property
+    def current(self) -> ModelProvider:
+        override = _override.get()
+        if override is not None:
+            return override
+        if self._default is None:
+            self._default = default_model_provider()
+        return self._default
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return self.current.get_model(model_name)
+
+
+@contextmanager
+def use_model_provider(provider: ModelProvider) -> Iterator[None]:
+    """Route every run started in this context (including nested runs) to provider.
+
+    Examples:
+    ::
+
+        >>> with use_model_provider(CassetteModelProvider("replay", "tests/cassettes")):
+        ...     await run_agent("Hello")
+    """
+    token = _override.set(provider)
+    try:
+        yield
+    finally:
+        _override.reset(token)
+
+
+active_model_provider = ActiveModelProvider()
+
+# RunConfig for runs started from inside another run (guardrails, agents-as-tools, ...)
+nested_run_config = RunConfig(model_provider=active_model_provider)
@@ -0,0 +1,166 @@
+"""Routing module assigning each agent a model and model settings by role.
+
+Agents in this package play a few distinct roles. The assistants hold the
+conversation and call tools; the classifiers (guardrail agents) and the
+extractor answer a single structured question; the summarizer condenses
+history. Classifiers run on almost every turn and only return a few fields,
+so they are the first candidates for a smaller, faster model, but their
+model was hard-coded next to the assistants'.
+
+A route names the model and ModelSettings of a role. Each agent is routed
+by its role right after its definition, and the routes can be overridden per
+role without touching the agent definitions:
+
+```
+model_router.route(CLASSIFIER, output_guardrail_agent)
+        │
+        ▼
+DEFAULT_ROUTES["classifier"] ◄── AGENT_ROUTES (JSON or JSON file) ◄── AGENT_MODEL_CLASSIFIER
+        │
+        ▼
+agent.model, agent.model_settings
+```
+
+Every model call is timed per route in agent_route_llm_call_seconds{route,model}
+(see hook.py), so moving a role to another model shows its latency next to
+the previous one.
+
+Configuration (environment variables):
+-------------------------------------
+- AGENT_ROUTES: JSON object, or path to a JSON file, of per-role overrides, e.g.
+  {"classifier": {"model": "gpt-5-mini", "model_settings": {"max_tokens": 256}}}
+- AGENT_MODEL_<ROLE>: Model of one role, e.g. AGENT_MODEL_CLASSIFIER=gpt-5-mini
+
+For the available model settings, see:
+https://openai.github.io/openai-agents-python/models/
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Dict,
+    Mapping,
+    Optional,
+)
+
+from agents import (
+    Agent,
+    ModelSettings,
+)
+
+from .metrics import route_llm_call_seconds
+
+
+logger = logging.getLogger(__name__)
+
+ASSISTANT = "assistant"
+CLASSIFIER = "classifier"
+EXTRACTOR = "extractor"
+SUMMARIZER = "summarizer"
+
+
+@dataclass(frozen=True)
+class Route:
+    """Model and model settings of a role."""
+
+    model: str
+    settings: ModelSettings
+
+
+DEFAULT_ROUTES: Dict[str, Route] = {
+    # Conversations and tool use: keep the provider's defaults
+    ASSISTANT: Route("gpt-5.2", ModelSettings()),
+    # A handful of JSON fields: cap the answer, a runaway generation only adds latency
+    CLASSIFIER: Route("gpt-5.2", ModelSettings(max_tokens=1024)),
+    EXTRACTOR: Route("gpt-5.2", ModelSettings(max_tokens=1024)),
+    SUMMARIZER: Route("gpt-5.2", ModelSettings()),
+}
+
+
+def _load_overrides(spec: Optional[str]) -> Dict[str, Any]:
+    """Parse AGENT_ROUTES, given inline or as the path of a JSON file."""
+    if not spec:
+        return {}
+    try:
+        if not spec.lstrip().startswith("{"):
+            with open(spec, encoding="utf-8") as f:
+                spec = f.read()
+        overrides = json.loads(spec)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Ignoring invalid AGENT_ROUTES: %s", e)
+        return {}
+    return overrides if isinstance(overrides, dict) else {}
+
+
+class ModelRouter:
+    """Resolve the route of each role and remember which agent follows which route.
+
+    Args:
+        routes: Default routes per role.
+        overrides: Per-role {"model": ..., "model_settings": {...}}. Settings are merged
+                   into the default settings of the role.
+        environ: Environment holding AGENT_MODEL_<ROLE> overrides.
+    """
+
+    def __init__(
+        self,
+        routes: Mapping[str, Route] = DEFAULT_ROUTES,
+        overrides: Optional[Mapping[str, Any]] = None,
+        environ: Mapping[str, str] = os.environ,
+    ) -> None:
+        self.routes: Dict[str, Route] = {}
+        overrides = overrides or {}
+        for role in set(routes) | set(overrides):
+            default = routes.get(role, routes[ASSISTANT])
+            override = overrides.get(role) or {}
+            try:
+                settings = default.settings.resolve(ModelSettings(**override.get("model_settings", {})))
+            except (TypeError, ValueError) as e:
+                logger.warning("Ignoring invalid model settings of route '%s': %s", role, e)
+                settings = default.settings
+            model = environ.get(f"AGENT_MODEL_{role.upper()}") or override.get("model") or default.model
+            self.routes[role] = Route(model, settings)
+        self._roles: Dict[str, str] = {}
+
+    def route(self, role: str, agent: Agent) -> Agent:
+        """Give an agent the model and settings of its role.
+
+        Args:
+            role: One of the routes, e.g. CLASSIFIER.
+            agent: The agent to configure.
+
+        Returns:
+            The same agent.
+
+        Raises:
+            KeyError: If the role has no route.
+        """
+        route = self.routes[role]
+        agent.model = route.model
+        agent.model_settings = route.settings
+        self._roles[agent.name] = role
+        return agent
+
+    def role_of(self, agent: Agent) -> str:
+        """Return the role of an agent, or "unrouted" for agents defined elsewhere."""
+        return self._roles.get(agent.name, "unrouted")
+
+    def observe(self, agent: Agent, seconds: float) -> None:
+        """Record the duration of one model call of an agent under its route."""
+        route_llm_call_seconds.observe(seconds, self.role_of(agent), str(agent.model))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the model and the settings set on every route, e.g. for logging."""
+        return {
+            role: {
+                "model": route.model,
+                "model_settings": {k: v for k, v in route.settings.to_json_dict().items() if v is not None},
+            }
+            for role, route in sorted(self.routes.items())
+        }
+
+
+model_router = ModelRouter(overrides=_load_overrides(os.getenv("AGENT_ROUTES")))
@@ -0,0 +1,189 @@
+"""Scheduler module providing admission control for agent runs.
+
+Each agent run fans out into several model calls (main agent, guardrails,
+agents-as-tools). Without a bound, a burst of requests starts all of them at
+once and piles up behind the model provider's rate limits, so every request
+gets slow together. The scheduler caps the number of concurrent runs, queues
+a bounded number of waiting requests and turns the rest away immediately.
+
+Admission Flow:
+--------------
+```
+request(user) ──► slot free? ──yes──► run
+                      │ no
+                      ▼
+              queue full? ──yes──► SchedulerBusy (fast "busy" answer)
+                      │ no
+                      ▼
+              wait in the user's queue ──timeout──► SchedulerBusy
+                      │ a slot is released
+                      ▼
+                     run
+```
+
+Fairness:
+--------
+Waiting requests are queued per user and slots are handed out round-robin
+across users, so one user sending many messages cannot starve the others.
+
+Configuration (environment variables):
+-------------------------------------
+- AGENT_MAX_CONCURRENCY: Maximum number of concurrent agent runs (default 8)
+- AGENT_MAX_QUEUE: Maximum number of waiting requests (default 64)
+- AGENT_QUEUE_TIMEOUT: Seconds a request may wait for a slot (default 30)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import (
+    OrderedDict,
+    deque,
+)
+from contextlib import asynccontextmanager
+from dataclasses import (
+    asdict,
+    dataclass,
+)
+from typing import (
+    AsyncIterator,
+    Deque,
+    Dict,
+)
+
+from .metrics import scheduler_wait_seconds
+
+
+logger = logging.getLogger(__name__)
+
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "8"))
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "64"))
+AGENT_QUEUE_TIMEOUT = float(os.getenv("AGENT_QUEUE_TIMEOUT", "30"))
+
+
+class SchedulerBusy(Exception):
+    """Raised when a request cannot be admitted (queue full or wait timed out)."""
+
+
+@dataclass
+class SchedulerStats:
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+
+
+class RequestScheduler:
+    """Concurrency cap with a bounded, per-user round-robin wait queue.
+
+    Args:
+        max_concurrency: Maximum number of requests holding a slot at once.
+        max_queue: Maximum number of requests waiting for a slot.
+        queue_timeout: Seconds a request may wait before it is turned away.
+
+    Examples:
+    ::
+
+        >>> scheduler = RequestScheduler(max_concurrency=4)
+        >>> async with scheduler.slot("user-1"):
+        ...     await Runner.run(agent, "Hello")
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = AGENT_MAX_CONCURRENCY,
+        max_queue: int = AGENT_MAX_QUEUE,
+        queue_timeout: float = AGENT_QUEUE_TIMEOUT,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.stats = SchedulerStats()
+        self._active = 0
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future[None]]]" = OrderedDict()
+        self._queue_depth = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue_depth
+
+    @asynccontextmanager
+    async def slot(self, user_id: str) -> AsyncIterator[None]:
+        """Hold one of the concurrency slots for the duration of the block.
+
+        Args:
+            user_id: The caller, used to share slots fairly between users.
+
+        Raises:
+            SchedulerBusy: If the wait queue is full or no slot was free in time.
+        """
+        await self._acquire(user_id)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, user_id: str) -> None:
+        if self._active < self.max_concurrency and not self._queue_depth:
+            self._active += 1
+            self.stats.admitted += 1
+            scheduler_wait_seconds.observe(0.0)
+            return
+        if self._queue_depth >= self.max_queue:
+            self.stats.rejected += 1
+            raise SchedulerBusy(f"{self._queue_depth} requests already waiting")
+
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(user_id, deque()).append(future)
+        self._queue_depth += 1
+        self.stats.queued += 1
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait ended: pass it on
+                self._release()
+            else:
+                self._forget(user_id, future)
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats.timed_out += 1
+                raise SchedulerBusy(f"no slot free after {self.queue_timeout:g}s") from e
+            raise
+        self.stats.admitted += 1
+        scheduler_wait_seconds.observe(time.perf_counter() - queued_at)
+
+    def _forget(self, user_id: str, future: "asyncio.Future[None]") -> None:
+        queue = self._waiting.get(user_id)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            self._queue_depth -= 1
+            if not queue:
+                del self._waiting[user_id]
+
+    def _release(self) -> None:
+        # Hand the slot directly to the next user in round-robin order
+        while self._waiting:
+            user_id, queue = next(iter(self._waiting.items()))
+            future = queue.popleft()
+            self._queue_depth -= 1
+            if queue:
+                self._waiting.move_to_end(user_id)
+            else:
+                del self._waiting[user_id]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the admission counters with the current number of active and waiting requests."""
+        return {**asdict(self.stats), "active": self._active, "waiting": self._queue_depth}
+
+
+request_scheduler = RequestScheduler()
@@ -0,0 +1,481 @@
+"""Server module exposing the agent over HTTP as a headless ASGI application.
+
+The Gradio UI (see ui.py) is one way to talk to the agent; a custom frontend
+only needs an HTTP endpoint. This module is a plain ASGI application, with no
+web framework, that any ASGI server can run. It serves chat-completion-style
+requests, streams the answer as Server-Sent Events, and drains gracefully so
+that it can run as one of many workers behind a load balancer.
+
+Endpoints:
+---------
+```
+POST /v1/chat/completions   {"messages": [...], "stream": true|false, "user": "..."}
+                            ──► JSON chat.completion, or SSE chat.completion.chunk events + [DONE]
+GET  /healthz               200 while the process is up (liveness)
+GET  /readyz                200, or 503 once draining (readiness: the load balancer stops routing)
+GET  /metrics               Prometheus text (see metrics.py)
+```
+
+Sessions:
+--------
+The agent keeps the conversation history (see session.py), so only the last
+user message of a request is processed. The X-Session-Id header (or the "user"
+field) selects the caller's session; without one, a new session is started
+and its id is returned in the X-Session-Id response header. The "user" field
+identifies the end user in the usage ledger and for fair scheduling across
+their sessions. The usage of a response counts every model call of the
+request, guardrail agents included.
+
+Streaming:
+---------
+Every chunk is a chat.completion.chunk event. When the agent retracts the
+partial answer (a guardrail tripped while streaming, see StreamChunk), the
+chunk carries "replace": true and its content replaces everything received so
+far; the last event then has finish_reason "content_filter", as in the
+non-streaming response. A request the scheduler turns away gets 503 with Retry-After, before any
+event is sent, so a client or load balancer can retry on another worker.
+Disconnected clients cancel their agent run.
+
+Graceful Drain:
+--------------
+```
+SIGTERM ──► readyz 503, new chats 503 + Connection: close   (load balancer moves traffic away)
+        ──► SERVER_DRAIN_DELAY seconds later, stop accepting connections
+        ──► wait up to SERVER_DRAIN_TIMEOUT for the runs in flight ──► flush and exit
+```
+
+Under another ASGI server (e.g. `uvicorn openai_agent_sdk_tutorial.server:app
+--workers 4`), the drain starts with the lifespan shutdown, after the server
+stopped accepting connections.
+
+Configuration (environment variables):
+-------------------------------------
+- SERVER_DRAIN_DELAY: Seconds between the drain signal and closing the listener (default 5)
+- SERVER_DRAIN_TIMEOUT: Seconds to wait for the runs in flight (default 30)
+
+Requires the optional `server` dependencies (uvicorn) only to run the server
+from the command line.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from types import FrameType
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
+
+from .agent import (
+    StreamChunk,
+    get_notification_agent,
+    run_agent,
+    run_agent_streamed,
+)
+from .metrics import metrics
+from .notification import push_dispatcher
+
+
+logger = logging.getLogger(__name__)
+
+SERVER_DRAIN_DELAY = float(os.getenv("SERVER_DRAIN_DELAY", "5"))
+SERVER_DRAIN_TIMEOUT = float(os.getenv("SERVER_DRAIN_TIMEOUT", "30"))
+
+# Request bodies larger than this are rejected with 413
+MAX_BODY_BYTES = 1024 * 1024
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+Headers = List[Tuple[bytes, bytes]]
+
+
+class RequestError(Exception):
+    """Raised for a request that cannot be served, with its HTTP status."""
+
+    def __init__(self, status: int, message: str, type: str = "invalid_request_error") -> None:
+        super().__init__(message)
+        self.status = status
+        self.type = type
+
+
+# =============================================================================
+# HTTP HELPERS
+# =============================================================================
+
+
+def header(scope: Scope, name: str) -> Optional[str]:
+    """Return the value of a request header (name in lower case), if present."""
+    key = name.encode("latin-1")
+    for header_name, value in scope.get("headers", []):
+        if header_name.lower() == key:
+            return value.decode("latin-1")
+    return None
+
+
+async def read_body(receive: Receive) -> bytes:
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise RequestError(400, "client disconnected")
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise RequestError(413, "request body too large")
+        more_body = message.get("more_body", False)
+    return body
+
+
+async def send_response(
+    send: Send, status: int, body: bytes, content_type: str, headers: Optional[Headers] = None
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                *(headers or []),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send: Send, status: int, payload: Any, headers: Optional[Headers] = None) -> None:
+    await send_response(send, status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+
+async def send_error(send: Send, error: RequestError, headers: Optional[Headers] = None) -> None:
+    await send_json(send, error.status, {"error": {"message": str(error), "type": error.type}}, headers)
+
+
+def sse_event(payload: Any) -> bytes:
+    data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+    return f"data: {data}\n\n".encode("utf-8")
+
+
+# =============================================================================
+# CHAT COMPLETIONS
+# =============================================================================
+
+
+def last_user_message(request: Dict[str, Any]) -> str:
+    """Return the text of the last user message of a chat-completion request."""
+    messages = request.get("messages")
+    if not isinstance(messages, list):
+        raise RequestError(400, "'messages' must be a list")
+    for message in reversed(messages):
+        if not isinstance(message, dict) or message.get("role") != "user":
+            continue
+        content = message.get("content")
+        if isinstance(content, list):
+            content = "".join(
+                str(part.get("text", "")) for part in content if isinstance(part, dict) and part.get("type") == "text"
+            )
+        if isinstance(content, str) and content.strip():
+            return content
+    raise RequestError(400, "no user message with text content")
+
+
+# Run outcomes reported as a content filter, the way the Chat Completions API reports moderation
+CONTENT_FILTER_OUTCOMES = ("input_guardrail", "output_guardrail", "streaming_guardrail")
+
+
+class ChatServer:
+    """ASGI application serving the agent, with readiness and graceful drain.
+
+    Args:
+        drain_timeout: Seconds the lifespan shutdown waits for the runs in flight.
+    """
+
+    def __init__(self, drain_timeout: float = SERVER_DRAIN_TIMEOUT) -> None:
+        self.drain_timeout = drain_timeout
+        self.draining = False
+        self.in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the request counters, e.g. for metrics.register_collector()."""
+        return {
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "draining": int(self.draining),
+        }
+
+    def start_drain(self) -> None:
+        """Report not ready and turn new chats away; the runs in flight continue."""
+        if not self.draining:
+            logger.info("Draining: %d runs in flight", self.in_flight)
+        self.draining = True
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Start draining and wait for the runs in flight.
+
+        Returns:
+            True if every run finished within the timeout.
+        """
+        self.start_drain()
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.drain_timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Drain timed out with %d runs in flight", self.in_flight)
+            return False
+        return True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        route = (scope["method"], scope["path"])
+        if route == ("GET", "/healthz"):
+            await send_json(send, 200, {"status": "ok"})
+        elif route == ("GET", "/readyz"):
+            await send_json(send, 503 if self.draining else 200, {"ready": not self.draining})
+        elif route == ("GET", "/metrics"):
+            await send_response(send, 200, metrics.render().encode("utf-8"), "text/plain; version=0.0.4")
+        elif route == ("POST", "/v1/chat/completions"):
+            await self.chat_completions(scope, receive, send)
+        elif scope["path"] in ("/healthz", "/readyz", "/metrics", "/v1/chat/completions"):
+            await send_error(send, RequestError(405, "method not allowed"))
+        else:
+            await send_error(send, RequestError(404, "not found"))
+
+    async def lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    # Build the agent graph now rather than in the first request
+                    get_notification_agent()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.drain()
+                await push_dispatcher.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def chat_completions(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.draining:
+            self.rejected += 1
+            error = RequestError(503, "server is draining", "server_busy")
+            await send_error(send, error, [(b"retry-after", b"1"), (b"connection", b"close")])
+            return
+        self.requests += 1
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            try:
+                request = json.loads(await read_body(receive) or b"{}")
+                if not isinstance(request, dict):
+                    raise RequestError(400, "request body must be a JSON object")
+                message = last_user_message(request)
+            except json.JSONDecodeError as e:
+                await send_error(send, RequestError(400, f"invalid JSON: {e}"))
+                return
+            except RequestError as e:
+                await send_error(send, e)
+                return
+            user_id = str(request["user"]) if request.get("user") else None
+            session_id = header(scope, "x-session-id") or user_id or f"api-{uuid.uuid4().hex}"
+            completion = Completion(session_id, str(get_notification_agent().model), user_id)
+            if request.get("stream"):
+                await completion.stream(message, receive, send)
+            else:
+                await completion.respond(message, send)
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+
+class Completion:
+    """One chat-completion response for a session."""
+
+    def __init__(self, session_id: str, model: str, user_id: Optional[str] = None) -> None:
+        self.session_id = session_id
+        self.user_id = user_id
+        self.model = model
+        self.id = f"chatcmpl-{uuid.uuid4().hex}"
+        self.created = int(time.time())
+        self.headers: Headers = [(b"x-session-id", session_id.encode("latin-1", "replace"))]
+
+    async def respond(self, message: str, send: Send) -> None:
+        result = await run_agent(message, session_id=self.session_id, user_id=self.user_id)
+        if result.outcome == "busy":
+            await send_error(send, RequestError(503, result.output, "server_busy"), [(b"retry-after", b"1")])
+            return
+        usage = result.usage.total
+        await send_json(
+            send,
+            200,
+            {
+                "id": self.id,
+                "object": "chat.completion",
+                "created": self.created,
+                "model": self.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": result.output},
+                        "finish_reason": "content_filter" if result.outcome in CONTENT_FILTER_OUTCOMES else "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": usage.input_tokens,
+                    "completion_tokens": usage.output_tokens,
+                    "total_tokens": usage.input_tokens + usage.output_tokens,
+                },
+            },
+            self.headers,
+        )
+
+    def chunk(self, delta: Dict[str, Any], finish_reason: Optional[str] = None, replace: bool = False) -> Any:
+        choice: Dict[str, Any] = {"index": 0, "delta": delta, "finish_reason": finish_reason}
+        if replace:
+            choice["replace"] = True
+        return {
+            "id": self.id,
+            "object": "chat.completion.chunk",
+            "created": self.created,
+            "model": self.model,
+            "choices": [choice],
+        }
+
+    async def stream(self, message: str, receive: Receive, send: Send) -> None:
+        producer = asyncio.create_task(self._produce(message, send))
+        disconnected = False
+
+        async def watch_disconnect() -> None:
+            nonlocal disconnected
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            if not producer.done():
+                logger.info("Client of session '%s' disconnected, cancelling its run", self.session_id)
+                disconnected = True
+                producer.cancel()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await producer
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+        finally:
+            watcher.cancel()
+
+    async def _start_stream(self, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                    *self.headers,
+                ],
+            }
+        )
+
+    async def _produce(self, message: str, send: Send) -> None:
+        started = False
+        outcome: Optional[str] = None
+        # An async generator: closed explicitly, so an early return also ends the run
+        chunks = cast(
+            AsyncGenerator[StreamChunk, None],
+            run_agent_streamed(message, session_id=self.session_id, user_id=self.user_id),
+        )
+        try:
+            async for chunk in chunks:
+                outcome = chunk.outcome or outcome
+                if not started:
+                    # Headers wait for the first chunk, so a busy answer can still be a 503
+                    if chunk.outcome == "busy":
+                        error = RequestError(503, chunk.text, "server_busy")
+                        await send_error(send, error, [(b"retry-after", b"1")])
+                        return
+                    await self._start_stream(send)
+                    started = True
+                    delta = {"role": "assistant", "content": chunk.text}
+                else:
+                    delta = {"content": chunk.text}
+                event = sse_event(self.chunk(delta, replace=chunk.replace))
+                await send({"type": "http.response.body", "body": event, "more_body": True})
+        finally:
+            await chunks.aclose()
+        if not started:
+            await self._start_stream(send)
+        finish_reason = "content_filter" if outcome in CONTENT_FILTER_OUTCOMES else "stop"
+        body = sse_event(self.chunk({}, finish_reason)) + sse_event("[DONE]")
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+app = ChatServer()
+metrics.register_collector("agent_server", app.snapshot)
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, drain_delay: float = SERVER_DRAIN_DELAY) -> None:
+    """Run the server with uvicorn until SIGTERM or SIGINT, then drain.
+
+    Args:
+        host: Interface to bind.
+        port: Port to bind.
+        drain_delay: Seconds between the signal and closing the listener, while readyz reports 503.
+
+    Raises:
+        ImportError: If uvicorn is not installed (pip install 'openai-agent-sdk-tutorial[server]').
+    """
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ImportError("The server needs uvicorn: pip install 'openai-agent-sdk-tutorial[server]'") from e
+
+    class DrainingServer(uvicorn.Server):
+        """Reports not ready and keeps serving for drain_delay seconds before shutting down."""
+
+        def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+            if app.draining or not drain_delay:
+                super().handle_exit(sig, frame)
+                return
+            app.start_drain()
+            # Signal handlers run on the loop's thread, between two of its callbacks
+            loop = asyncio.get_running_loop()
+            loop.call_soon_threadsafe(loop.call_later, drain_delay, super().handle_exit, sig, frame)
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        timeout_graceful_shutdown=int(SERVER_DRAIN_TIMEOUT),
+        log_config=None,
+    )
+    logger.info("Serving on http://%s:%d (drain delay %gs)", host, port, drain_delay)
+    DrainingServer(config).run()
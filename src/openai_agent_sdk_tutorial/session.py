@@ -0,0 +1,340 @@
+"""Session module providing one conversation history per caller.
+
+A single shared SQLiteSession makes every user read and append to the same,
+ever-growing history: each turn pays for everyone's messages in tokens and in
+SQLite reads, and all writers contend on the same rows. This module maps each
+caller (a Gradio session hash, an API user id, ...) to its own session.
+
+Architecture:
+------------
+```
+run_agent(input, session_id)
+        │
+        ▼
+SessionManager.get(session_id)  ──►  PooledSQLiteSession (one per caller, LRU-cached)
+                                             │
+                                             ▼
+                              ConnectionPool (shared, WAL mode)
+                                             │
+                                             ▼
+                                         memory.db
+```
+
+The tables are the ones used by the SDK's SQLiteSession, so existing
+databases keep working and can still be opened with SQLiteSession.
+
+For more details, see:
+https://openai.github.io/openai-agents-python/sessions/
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+
+from agents import TResponseInputItem
+from agents.memory import SessionABC
+
+from .db import (
+    DB_PATH,
+    ConnectionPool,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Session used when the caller does not identify itself (e.g. local CLI use)
+DEFAULT_SESSION_ID = "shared"
+
+
+class PooledSQLiteSession(SessionABC):
+    """SQLite session storage that borrows connections from a shared pool.
+
+    Behaves like the SDK's SQLiteSession but does not own any connection, so
+    thousands of sessions can share a handful of open connections.
+
+    Args:
+        session_id: Unique identifier for the conversation session.
+        pool: The connection pool to borrow connections from.
+        sessions_table: Name of the table storing session metadata.
+        messages_table: Name of the table storing message data.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        pool: ConnectionPool,
+        sessions_table: str = "agent_sessions",
+        messages_table: str = "agent_messages",
+    ) -> None:
+        self.session_id = session_id
+        self.pool = pool
+        self.sessions_table = sessions_table
+        self.messages_table = messages_table
+
+    async def get_items(self, limit: Optional[int] = None) -> List[TResponseInputItem]:
+        """Retrieve the conversation history for this session.
+
+        Args:
+            limit: Maximum number of items to retrieve. If None, retrieves all items.
+                   When specified, returns the latest N items in chronological order.
+
+        Returns:
+            List of input items representing the conversation history.
+        """
+
+        def _get_items_sync() -> List[TResponseInputItem]:
+            with self.pool.connection() as conn:
+                if limit is None:
+                    rows = conn.execute(
+                        f"SELECT message_data FROM {self.messages_table} WHERE session_id = ? ORDER BY id ASC",
+                        (self.session_id,),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        f"SELECT message_data FROM {self.messages_table} WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                        (self.session_id, limit),
+                    ).fetchall()
+                    rows.reverse()
+            items = []
+            for (message_data,) in rows:
+                try:
+                    items.append(json.loads(message_data))
+                except json.JSONDecodeError:
+                    continue
+            return items
+
+        return await asyncio.to_thread(_get_items_sync)
+
+    async def add_items(self, items: List[TResponseInputItem]) -> None:
+        """Add new items to the conversation history.
+
+        Args:
+            items: List of input items to add to the history.
+        """
+        if not items:
+            return
+
+        def _add_items_sync() -> None:
+            with self.pool.connection() as conn:
+                conn.execute(
+                    f"INSERT OR IGNORE INTO {self.sessions_table} (session_id) VALUES (?)",
+                    (self.session_id,),
+                )
+                conn.executemany(
+                    f"INSERT INTO {self.messages_table} (session_id, message_data) VALUES (?, ?)",
+                    [(self.session_id, json.dumps(item)) for item in items],
+                )
+                conn.execute(
+                    f"UPDATE {self.sessions_table} SET updated_at = CURRENT_TIMESTAMP WHERE session_id = ?",
+                    (self.session_id,),
+                )
+                conn.commit()
+
+        await asyncio.to_thread(_add_items_sync)
+
+    async def pop_item(self) -> Optional[TResponseInputItem]:
+        """Remove and return the most recent item from the session.
+
+        Returns:
+            The most recent item if it exists, None if the session is empty.
+        """
+
+        def _pop_item_sync() -> Optional[TResponseInputItem]:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    f"""
+                    DELETE FROM {self.messages_table}
+                    WHERE id = (
+                        SELECT id FROM {self.messages_table} WHERE session_id = ? ORDER BY id DESC LIMIT 1
+                    )
+                    RETURNING message_data
+                    """,
+                    (self.session_id,),
+                ).fetchone()
+                conn.commit()
+            if row is None:
+                return None
+            try:
+                item: TResponseInputItem = json.loads(row[0])
+                return item
+            except json.JSONDecodeError:
+                return None
+
+        return await asyncio.to_thread(_pop_item_sync)
+
+    async def clear_session(self) -> None:
+        """Clear all items for this session."""
+
+        def _clear_session_sync() -> None:
+            with self.pool.connection() as conn:
+                conn.execute(f"DELETE FROM {self.messages_table} WHERE session_id = ?", (self.session_id,))
+                conn.execute(f"DELETE FROM {self.sessions_table} WHERE session_id = ?", (self.session_id,))
+                conn.commit()
+
+        await asyncio.to_thread(_clear_session_sync)
+
+    # -------------------------------------------------------------------------
+    # Row-level access used by history compaction (see compaction.py)
+    # -------------------------------------------------------------------------
+
+    async def history_size(self) -> int:
+        """Return the total size in characters of the stored history, without loading it."""
+
+        def _history_size_sync() -> int:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(message_data)), 0) FROM {self.messages_table} WHERE session_id = ?",
+                    (self.session_id,),
+                ).fetchone()
+            return int(row[0])
+
+        return await asyncio.to_thread(_history_size_sync)
+
+    async def get_rows(self) -> List[Tuple[int, TResponseInputItem]]:
+        """Return the history as (row id, item) pairs in chronological order."""
+
+        def _get_rows_sync() -> List[Tuple[int, TResponseInputItem]]:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    f"SELECT id, message_data FROM {self.messages_table} WHERE session_id = ? ORDER BY id ASC",
+                    (self.session_id,),
+                ).fetchall()
+            result = []
+            for row_id, message_data in rows:
+                try:
+                    result.append((row_id, json.loads(message_data)))
+                except json.JSONDecodeError:
+                    continue
+            return result
+
+        return await asyncio.to_thread(_get_rows_sync)
+
+    async def replace_rows(self, row_ids: List[int], item: TResponseInputItem) -> None:
+        """Atomically replace the given rows with a single item.
+
+        The item takes the smallest of the replaced ids, so it keeps its place in
+        the history. Rows appended concurrently always get larger ids and are not
+        affected.
+
+        Args:
+            row_ids: Ids of the rows to remove.
+            item: The item stored in their place.
+        """
+        if not row_ids:
+            return
+
+        def _replace_rows_sync() -> None:
+            with self.pool.connection() as conn:
+                conn.executemany(
+                    f"DELETE FROM {self.messages_table} WHERE id = ? AND session_id = ?",
+                    [(row_id, self.session_id) for row_id in row_ids],
+                )
+                conn.execute(
+                    f"INSERT INTO {self.messages_table} (id, session_id, message_data) VALUES (?, ?, ?)",
+                    (min(row_ids), self.session_id, json.dumps(item)),
+                )
+                conn.commit()
+
+        await asyncio.to_thread(_replace_rows_sync)
+
+
+class SessionManager:
+    """Map callers to their own conversation session.
+
+    The connection pool and the schema are created on first use. Session
+    objects are cheap, but the most recently used ones are cached so repeated
+    turns from the same caller reuse the same instance.
+
+    Args:
+        db_path: Path to the SQLite database file.
+        pool_size: Maximum number of pooled connections.
+        max_cached_sessions: Maximum number of session objects kept in memory.
+
+    Examples:
+    ::
+
+        >>> manager = SessionManager("memory.db")
+        >>> session = manager.get("gradio-session-hash")
+        >>> await Runner.run(agent, "Hello", session=session)
+    """
+
+    def __init__(self, db_path: str = DB_PATH, pool_size: int = 8, max_cached_sessions: int = 1024) -> None:
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.max_cached_sessions = max_cached_sessions
+        self._pool: Optional[ConnectionPool] = None
+        self._sessions: "OrderedDict[str, PooledSQLiteSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ConnectionPool(self.db_path, max_size=self.pool_size)
+                self._init_schema(self._pool)
+            return self._pool
+
+    @staticmethod
+    def _init_schema(pool: ConnectionPool) -> None:
+        with pool.connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agent_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agent_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    message_data TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (session_id) REFERENCES agent_sessions (session_id) ON DELETE CASCADE
+                )
+            """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_messages_session_id ON agent_messages (session_id, id)")
+            conn.commit()
+
+    def get(self, session_id: Optional[str] = None) -> PooledSQLiteSession:
+        """Return the session for a caller.
+
+        Args:
+            session_id: The caller's identifier. Defaults to DEFAULT_SESSION_ID.
+
+        Returns:
+            PooledSQLiteSession: The caller's session.
+        """
+        session_id = session_id or DEFAULT_SESSION_ID
+        pool = self.pool
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = PooledSQLiteSession(session_id, pool)
+                self._sessions[session_id] = session
+                if len(self._sessions) > self.max_cached_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def close(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+
+session_manager = SessionManager()
@@ -0,0 +1,207 @@
+"""Speculation module letting the main agent start before its input guardrails finish.
+
+Input guardrails marked run_in_parallel make the SDK start the main agent's
+first model call at the same time as the guardrails, which takes a guardrail
+round-trip off every turn. The first turn is then speculative: the main agent
+may call a tool that notifies someone, or stream text to the user, for input
+that the guardrail is about to reject. A SpeculationGate holds those effects
+back until every input guardrail has passed, and cancels the speculative
+work when one trips.
+
+Speculative Turn:
+----------------
+```
+input ──┬──► input guardrail ─────────── passed ──► gate opens ──────────────┐
+        │                                  │                                 ▼
+        └──► main agent: model call ──► tool call ──► await gate ──► side effect (push, handoff)
+                                                     streamed text ──► held until the gate opens
+
+        input guardrail trips ──► gate closes ──► speculative tasks cancelled, nothing was sent
+```
+
+Integration Points:
+------------------
+- speculate(agent) opens a gate for one request of the entry points in agent.py
+- @reports_to_gate on each parallel input guardrail reports its verdict
+- await input_guardrails_passed() before every side effect
+- track_speculative_task() from on_llm_start registers the work to cancel
+- SpeculationGate.passed tells the streaming entry point when text may be shown
+
+Configuration (environment variables):
+-------------------------------------
+- SPECULATIVE_EXECUTION: Set to 0 to run input guardrails before the main agent (default 1)
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    Optional,
+    Set,
+    TypeVar,
+    cast,
+)
+
+from agents import Agent
+
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_EXECUTION = os.getenv("SPECULATIVE_EXECUTION", "1") != "0"
+
+
+class SpeculationAborted(Exception):
+    """Raised by input_guardrails_passed() when an input guardrail tripped."""
+
+
+class SpeculationGate:
+    """Holds back the side effects of a run until its input guardrails have passed.
+
+    Args:
+        expected: Number of input guardrails reporting to the gate.
+    """
+
+    def __init__(self, expected: int) -> None:
+        self.expected = expected
+        self.tripped = False
+        self._reported = 0
+        self._decided = asyncio.Event()
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+        if expected <= 0:
+            self._decided.set()
+
+    @property
+    def passed(self) -> bool:
+        return self._decided.is_set() and not self.tripped
+
+    @property
+    def decided(self) -> bool:
+        return self._decided.is_set()
+
+    def report(self, tripwire_triggered: bool) -> None:
+        """Record the verdict of one input guardrail."""
+        if self._decided.is_set():
+            return
+        self._reported += 1
+        if tripwire_triggered:
+            self.tripped = True
+            self._decided.set()
+        elif self._reported >= self.expected:
+            self._decided.set()
+
+    async def wait(self) -> bool:
+        """Wait until the input guardrails are decided. Returns True if they passed."""
+        await self._decided.wait()
+        return not self.tripped
+
+    def track(self, task: Optional["asyncio.Task[Any]"]) -> None:
+        """Register a task doing speculative work, to be cancelled if a guardrail trips."""
+        if task is not None and not self._decided.is_set():
+            self._tasks.add(task)
+
+    def abort(self) -> None:
+        """Close the gate and cancel the speculative work still running."""
+        if not self._decided.is_set():
+            self.tripped = True
+            self._decided.set()
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if task is not current and not task.done():
+                task.cancel()
+        self._tasks.clear()
+
+
+speculation_gate: ContextVar[Optional[SpeculationGate]] = ContextVar("speculation_gate", default=None)
+
+
+async def input_guardrails_passed() -> None:
+    """Wait until side effects are allowed.
+
+    Returns immediately outside a speculative run.
+
+    Raises:
+        SpeculationAborted: If an input guardrail tripped.
+    """
+    gate = speculation_gate.get()
+    if gate is not None and not gate.passed and not await gate.wait():
+        raise SpeculationAborted("input guardrail tripped; side effect skipped")
+
+
+def track_speculative_task() -> None:
+    """Register the current task with the gate while the input guardrails are undecided."""
+    gate = speculation_gate.get()
+    if gate is not None and not gate.decided:
+        gate.track(asyncio.current_task())
+
+
+_REPORTS_TO_GATE = "_reports_to_gate"
+
+TInputGuardrailFunction = TypeVar("TInputGuardrailFunction", bound=Callable[..., Awaitable[Any]])
+
+
+def reports_to_gate(func: TInputGuardrailFunction) -> TInputGuardrailFunction:
+    """Report the verdict of an input guardrail function to the run's gate.
+
+    Apply below the SDK decorator. A guardrail that fails counts as tripped.
+
+    Args:
+        func: An async input guardrail function returning GuardrailFunctionOutput.
+
+    Returns:
+        The wrapped function.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        gate = speculation_gate.get()
+        try:
+            output = await func(*args, **kwargs)
+        except Exception:
+            if gate is not None:
+                gate.report(True)
+            raise
+        if gate is not None:
+            gate.report(bool(output.tripwire_triggered))
+        return output
+
+    setattr(wrapper, _REPORTS_TO_GATE, True)
+    return cast(TInputGuardrailFunction, wrapper)
+
+
+def reporting_guardrails(agent: Agent) -> int:
+    """Return the number of input guardrails of an agent that report to the gate."""
+    return sum(
+        1 for guardrail in agent.input_guardrails if getattr(guardrail.guardrail_function, _REPORTS_TO_GATE, False)
+    )
+
+
+@contextmanager
+def speculate(agent: Agent) -> Iterator[Optional[SpeculationGate]]:
+    """Open a gate for one run of an agent whose input guardrails run in parallel.
+
+    Speculative work still running on exit (e.g. the first turn of a run whose
+    input guardrail tripped) is cancelled.
+
+    Args:
+        agent: The starting agent of the run.
+
+    Yields:
+        The gate, or None when SPECULATIVE_EXECUTION is off.
+    """
+    if not SPECULATIVE_EXECUTION:
+        yield None
+        return
+    gate = SpeculationGate(reporting_guardrails(agent))
+    token = speculation_gate.set(gate)
+    try:
+        yield gate
+    finally:
+        speculation_gate.reset(token)
+        gate.abort()
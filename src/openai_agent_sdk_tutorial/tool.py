@@ -36,6 +36,9 @@ Three Tool Patterns:
 2. Tool Guardrails: Validation layer protecting tool inputs and outputs
 3. Agent-as-Tool: Convert agents into callable tools for composition
 
+The contact request is implemented both ways: as a chain of agents-as-tools and
+as a single function tool (see CONTACT CAPTURE below).
+
 For other types of tools and detailed docs, see:
 https://openai.github.io/openai-agents-python/tools/
 """
@@ -43,20 +46,22 @@ https://openai.github.io/openai-agents-python/tools/
 import logging
 import os
 import re
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import (
+    Any,
     Dict,
+    Iterator,
+    Optional,
     cast,
 )
 
-import requests
-from pydantic import (
-    BaseModel,
-    Field,
-)
+from pydantic import BaseModel
 
 from agents import (
     Agent,
     FunctionTool,
+    RunContextWrapper,
     Runner,
     ToolGuardrailFunctionOutput,
     ToolInputGuardrail,
@@ -68,6 +73,24 @@ from agents import (
     tool_output_guardrail,
 )
 
+from .guardrail import classify_input
+from .hook import UsageRunHook
+from .metrics import timed_guardrail
+from .notification import push_dispatcher
+from .pii import (
+    CLEAN,
+    CONFIDENTIAL,
+    argument_text,
+    detect_confidential,
+)
+from .provider import nested_run_config
+from .routing import (
+    ASSISTANT,
+    EXTRACTOR,
+    model_router,
+)
+from .speculation import input_guardrails_passed
+
 
 logger = logging.getLogger(__name__)
 
@@ -109,32 +132,25 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 
 
-class ConfidentialInformation(BaseModel):
-    """Structured output model for confidential information detection."""
-
-    is_confidential: bool = Field(..., description="True if confidential information was detected, False otherwise.")
-    details: str = Field(
-        ..., description="Description of the detected confidential information, or empty if none found."
-    )
+# Uncertain arguments are labelled by the input classifier shared with the agent
+# input guardrail (see guardrail.py). The argument text of a contact request is
+# usually the user's message itself, so its classification is a cache hit, or
+# joins the classification the input guardrail has in flight.
 
-
-tool_input_guardrail_agent = Agent(
-    name="Confidential Information check",
-    instructions="""Check if the response contains any confidential information that should not be shared.
-        Confidential information include social security numbers, account numbers, passwords,
-        and other sensitive data.
-        Names, addresses, and phone numbers are not considered confidential.""",
-    output_type=ConfidentialInformation,
-    model="gpt-5.2",
-)
+# Local detector fast path (see pii.py): validated identifiers are rejected and
+# plainly harmless arguments are allowed without calling the input classifier.
+# Set CONFIDENTIAL_FAST_PATH=0 to send every tool call to the input classifier.
+CONFIDENTIAL_FAST_PATH = os.getenv("CONFIDENTIAL_FAST_PATH", "1") != "0"
 
 
 @tool_input_guardrail
+@timed_guardrail
 async def reject_confidential_information(data: ToolInputGuardrailData) -> ToolGuardrailFunctionOutput:
     """Input guardrail that blocks tool calls containing confidential information.
 
     This demonstrates pre-execution validation: inspecting the tool arguments
-    before the tool runs.
+    before the tool runs. A local detector decides clear-cut arguments first;
+    only uncertain ones are sent to the input classifier.
 
     The guardrail uses reject_content() to block the call while allowing the
     agent to continue and potentially try a different approach.
@@ -154,14 +170,31 @@ async def reject_confidential_information(data: ToolInputGuardrailData) -> ToolG
     tool_name = data.context.tool_name
     tool_args = data.context.tool_arguments
     logger.debug("Validating tool input for '%s': %s", tool_name, tool_args)
-    result = await Runner.run(tool_input_guardrail_agent, tool_args, context=data.context)
-    if result.final_output.is_confidential:
+
+    text = argument_text(tool_args)
+    if CONFIDENTIAL_FAST_PATH:
+        screen = detect_confidential(text)
+        logger.debug("Confidential data screen for '%s': %s", tool_name, screen)
+        if screen.verdict == CONFIDENTIAL:
+            return ToolGuardrailFunctionOutput.reject_content(
+                message="Tool call blocked: contains confidential information.",
+                output_info={
+                    "confidential_details": ", ".join(screen.confidential),
+                    "tool": tool_name,
+                    "decided_by": "detector",
+                },
+            )
+        if screen.verdict == CLEAN:
+            return ToolGuardrailFunctionOutput.allow(output_info={"tool": tool_name, "decided_by": "detector"})
+
+    labels = await classify_input(text, data.context.context, tool=tool_name)
+    if labels.contains_confidential:
         logger.debug(
-            "Tool call to '%s' blocked due to confidential information: %s", tool_name, result.final_output.details
+            "Tool call to '%s' blocked due to confidential information: %s", tool_name, labels.confidential_details
         )
         return ToolGuardrailFunctionOutput.reject_content(
             message="Tool call blocked: contains confidential information.",
-            output_info={"confidential_details": result.final_output.details, "tool": tool_name},
+            output_info={"confidential_details": labels.confidential_details, "tool": tool_name},
         )
     logger.debug("Tool call to '%s' accepted", tool_name)
     return ToolGuardrailFunctionOutput(output_info="Input validated")
@@ -247,37 +280,38 @@ def validate_contains_email(data: ToolOutputGuardrailData) -> ToolGuardrailFunct
 # =============================================================================
 
 
-def push(text: str) -> None:
-    """Send a push notification via Pushover API.
+async def push(text: str, dedupe_key: Optional[str] = None) -> None:
+    """Queue a push notification for durable background delivery via Pushover API.
 
     This is a helper function (not a tool) that sends notifications.
     It demonstrates a common pattern: tools often call external services
-    to perform real-world actions.
+    to perform real-world actions. The message is written to a SQLite outbox
+    and delivered by background workers (see notification.py), so the tool
+    never waits for the third-party service and nothing is lost if it is down.
+
+    While the main agent runs speculatively (see speculation.py), the message
+    is only queued once the input guardrails have passed.
 
     Note: Requires PUSHOVER_TOKEN and PUSHOVER_USER environment variables.
 
     Args:
         text: The message text to send as a push notification.
+        dedupe_key: Optional key; pending messages with the same key are merged.
+
+    Raises:
+        SpeculationAborted: If an input guardrail of the run tripped; nothing is queued.
     """
-    try:
-        requests.post(
-            "https://api.pushover.net/1/messages.json",
-            data={
-                "token": os.getenv("PUSHOVER_TOKEN"),
-                "user": os.getenv("PUSHOVER_USER"),
-                "message": text,
-            },
-            timeout=5,
-        )
-    except Exception as e:
-        logger.error("Failed to send push notification: %s", e)
+    await input_guardrails_passed()
+    await push_dispatcher.submit(text, dedupe_key=dedupe_key)
 
 
 @function_tool(
     description_override="""Use this tool to record that a user is interested in being in touch
         and provided an email address"""
 )
-def record_user_details(email: str, name: str = "Name not provided", notes: str = "Not provided") -> Dict[str, str]:
+async def record_user_details(
+    email: str, name: str = "Name not provided", notes: str = "Not provided"
+) -> Dict[str, str]:
     """Record user details for follow-up contact.
 
     Args:
@@ -289,8 +323,13 @@ def record_user_details(email: str, name: str = "Name not provided", notes: str
         dict: Confirmation message containing the recorded details.
               Must contain a valid email for the output guardrail to pass.
     """
+    return await save_user_details(email, name, notes)
+
+
+async def save_user_details(email: str, name: str, notes: str) -> Dict[str, str]:
+    """Queue the contact notification and return the tool's confirmation (see record_user_details)."""
     tool_output = f"{name} with email {email} and notes {notes}"
-    push(f"Recording: {tool_output}")
+    await push(f"Recording: {tool_output}", dedupe_key=email.lower())
     return {"recorded": tool_output}
 
 
@@ -313,6 +352,8 @@ record_user_details.tool_input_guardrails = cast(list[ToolInputGuardrail], [reje
 #     my_tool = my_agent.as_tool(
 #         tool_name="tool_name",           # Must match: ^[a-zA-Z0-9_-]+$ (no spaces!)
 #         tool_description="...",          # Helps the LLM know when to use this tool
+#         run_config=nested_run_config,    # The tool's run does not inherit the caller's RunConfig
+#         hooks=UsageRunHook(tool="tool_name"),  # ...nor its hooks: count its tokens (see accounting.py)
 #     )
 #
 # HOW IT DIFFERS FROM HANDOFFS:
@@ -371,8 +412,8 @@ contact_info_agent = Agent(
     Parse the user's message to identify their name, email, and any notes.
     Return structured data matching the ContactRequest schema.""",
     output_type=ContactRequest,  # Forces structured output
-    model="gpt-5.2",
 )
+model_router.route(EXTRACTOR, contact_info_agent)
 
 # Convert agent to tool - note the cast() for type checking
 contact_info_tool = cast(
@@ -380,6 +421,8 @@ contact_info_tool = cast(
     contact_info_agent.as_tool(
         tool_name="contact_info_extractor",
         tool_description="Extracts contact information (name, email, notes) from user messages.",
+        run_config=nested_run_config,
+        hooks=UsageRunHook(tool="contact_info_extractor"),
     ),
 )
 
@@ -403,12 +446,121 @@ send_contact_request_agent = Agent(
     2. Using the record_user_details tool to save the extracted information
 
     Coordinate these tools to complete the contact request workflow.""",
-    model="gpt-5.2",
     tools=[contact_info_tool, record_user_details],  # Mix of agent-tool and function-tool
 )
+model_router.route(ASSISTANT, send_contact_request_agent)
 
 send_contact_request_tool = send_contact_request_agent.as_tool(
     tool_name="send_contact_request",
+    is_enabled=lambda context, agent: contact_capture_mode() == "chain",
     tool_description="""Complete workflow:
         extracts contact info and records it. Use for handling user contact requests.""",
+    run_config=nested_run_config,
+    hooks=UsageRunHook(tool="send_contact_request"),
+)
+
+
+# =============================================================================
+# CONTACT CAPTURE
+# =============================================================================
+#
+# The agent chain above needs up to five sequential model calls to store a name
+# and an email: the notification agent calls send_contact_request_agent, which
+# calls contact_info_agent, then record_user_details (whose confidential-data
+# guardrail may ask its own agent), then answers.
+#
+# capture_contact does the same work in one function tool:
+#
+#     message ──► email regex + name heuristic ──enough──► save_user_details()
+#                         │ not enough
+#                         ▼
+#                 contact_info_agent (one structured-output call) ──► save_user_details()
+#
+# Both are exposed under the name "send_contact_request" and only one of them is
+# enabled per run, so the calling agent does not change. The confidential-data
+# and email guardrails are attached to capture_contact as well.
+#
+# CONTACT_CAPTURE_MODE selects the implementation: "direct" (default) or "chain".
+# use_contact_capture() overrides it for the current context (e.g. to benchmark
+# one against the other).
+
+CONTACT_CAPTURE_MODE = os.getenv("CONTACT_CAPTURE_MODE", "direct")
+
+_contact_capture_override: ContextVar[Optional[str]] = ContextVar("contact_capture_override", default=None)
+
+
+def contact_capture_mode() -> str:
+    """Return the contact capture implementation in effect: "direct" or "chain"."""
+    return _contact_capture_override.get() or CONTACT_CAPTURE_MODE
+
+
+@contextmanager
+def use_contact_capture(mode: str) -> Iterator[None]:
+    """Use the given contact capture implementation ("direct" or "chain") within the block."""
+    if mode not in ("direct", "chain"):
+        raise ValueError(f"Unknown contact capture mode '{mode}'")
+    token = _contact_capture_override.set(mode)
+    try:
+        yield
+    finally:
+        _contact_capture_override.reset(token)
+
+
+# Introductions such as "I'm Jane Doe", "my name is Jane", "this is Jane Doe". The name must end
+# the clause or be followed by a connective ("I'm Jane at ..."), so "I'm Looking for..." is not a name
+NAME_REGEX = re.compile(
+    r"\b(?:I'?m|I am|[Mm]y name is|[Tt]his is|[Nn]ame:)\s+([A-Z][a-z]+(?: [A-Z][a-z]+){0,2})"
+    r"(?=\s*(?:[,.;:!?]|$)|\s+(?:and|at|from|here|with)\b)",
+    re.MULTILINE,
+)
+
+
+def extract_contact_locally(message: str) -> Optional[ContactRequest]:
+    """Extract the contact details without a model call when the message is unambiguous.
+
+    Args:
+        message: The user's message.
+
+    Returns:
+        The contact request if the message has exactly one email address and a
+        recognizable name, otherwise None.
+    """
+    emails = set(EMAIL_REGEX.findall(message))
+    names = {match.group(1) for match in NAME_REGEX.finditer(message)}
+    if len(emails) != 1 or len(names) != 1:
+        return None
+    return ContactRequest(email=emails.pop(), name=names.pop(), notes=message)
+
+
+@function_tool(
+    name_override="send_contact_request",
+    description_override="""Complete workflow:
+        extracts contact info and records it. Use for handling user contact requests.""",
+    is_enabled=lambda context, agent: contact_capture_mode() == "direct",
 )
+async def capture_contact(context: RunContextWrapper[Any], input: str) -> Dict[str, str]:
+    """Extract the user's contact details from their message and record them.
+
+    Args:
+        input: The user's message with their contact details.
+    """
+    contact = extract_contact_locally(input)
+    if contact is None:
+        result = await Runner.run(
+            contact_info_agent,
+            input,
+            context=context.context,
+            run_config=nested_run_config,
+            hooks=UsageRunHook(tool="send_contact_request"),
+        )
+        contact = cast(ContactRequest, result.final_output)
+    logger.debug("Captured contact details: %s", contact)
+    # Validate before recording: the output guardrail only runs after the notification is queued
+    if not EMAIL_REGEX.fullmatch(contact.email.strip()):
+        logger.debug("Contact not recorded: no valid email address in %r", contact.email)
+        return {"error": "No valid email address found; ask the user for their email address."}
+    return await save_user_details(contact.email.strip(), contact.name, contact.notes)
+
+
+capture_contact.tool_input_guardrails = cast(list[ToolInputGuardrail], [reject_confidential_information])
+capture_contact.tool_output_guardrails = cast(list[ToolOutputGuardrail], [validate_contains_email])
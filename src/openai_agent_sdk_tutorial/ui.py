@@ -0,0 +1,67 @@
+from typing import (
+    Any,
+    AsyncIterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import gradio as gr
+
+from .accounting import usage_ledger
+from .agent import run_agent_streamed
+from .metrics import metrics
+
+
+# Gradio is only imported when the UI is launched (see app.py): it takes seconds to import.
+
+
+# Gradio chat interface function requires 2 parameters: message and history
+# but history is managed by the OpenAI Agent SDK instead of Gradio.
+# Gradio injects the request because of the gr.Request annotation; its session hash
+# is unique per browser tab and selects the caller's own agent session. With
+# authentication enabled, the username identifies the user across their tabs.
+# As an async generator, chat streams the answer: each yield replaces the message
+# shown so far, so tokens appear as soon as the model produces them.
+async def chat(  # pylint: disable=unused-argument
+    message: str, history: Any, request: Optional[gr.Request] = None
+) -> AsyncIterator[str]:
+    session_id = request.session_hash if request is not None else None
+    user_id = request.username if request is not None else None
+    answer = ""
+    async for chunk in run_agent_streamed(message, session_id=session_id, user_id=user_id):
+        answer = chunk.text if chunk.replace else answer + chunk.text
+        yield answer
+
+
+# The Metrics tab shows p50/p95 per stage (see metrics.py) and the raw
+# Prometheus text, which a scraper can read from the same registry, and the
+# token usage and estimated cost per agent and tool (see accounting.py).
+METRICS_COLUMNS = ["metric", "labels", "count", "mean", "p50", "p95"]
+USAGE_COLUMNS = [
+    "agent",
+    "tool",
+    "requests",
+    "input_tokens",
+    "cached_tokens",
+    "cache_hit_rate",
+    "output_tokens",
+    "cost",
+]
+
+
+def metrics_view() -> Tuple[List[List[Any]], List[List[Any]], str]:
+    rows = [[row[column] for column in METRICS_COLUMNS] for row in metrics.summary()]
+    usage = [[row[column] for column in USAGE_COLUMNS] for row in usage_ledger.totals(group_by=("agent", "tool"))]
+    return rows, usage, metrics.render()
+
+
+def build_interface() -> gr.Blocks:
+    with gr.Blocks() as admin:
+        refresh = gr.Button("Refresh")
+        table = gr.Dataframe(headers=METRICS_COLUMNS, interactive=False)
+        usage = gr.Dataframe(headers=USAGE_COLUMNS, label="Token usage", interactive=False)
+        raw = gr.Code(label="Prometheus text", language=None)
+        refresh.click(metrics_view, outputs=[table, usage, raw])
+        admin.load(metrics_view, outputs=[table, usage, raw])
+    return gr.TabbedInterface([gr.ChatInterface(chat), admin], ["Chat", "Metrics"])
@@ -1,5 +1,185 @@
+import asyncio
+import atexit
+import contextlib
+import copy
+import json
 import logging
-from typing import Optional
+import os
+import queue
+import random
+import sys
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+)
+from typing import (
+    Any,
+    Coroutine,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    TypeVar,
+)
+
+
+# Route records through a queue to a background writer thread (set to 0 to write inline)
+LOG_ASYNC = os.getenv("LOG_ASYNC", "1") != "0"
+# "json" for one JSON object per line, anything else for plain text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+# Comma-separated logger=rate pairs, e.g. "openai_agent_sdk_tutorial.hook=0.1"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# Messages longer than this are truncated (0 disables truncation)
+LOG_MAX_CHARS = int(os.getenv("LOG_MAX_CHARS", "4000"))
+# Records waiting for the writer thread; further records are dropped and counted
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+DEFAULT_FORMAT = "%(asctime)s %(levelname)-8s %(name)s - %(message)s"
+DEFAULT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+T = TypeVar("T")
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "logger=rate,..." into a mapping of logger names to sampling rates."""
+    rates: Dict[str, float] = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = pair.partition("=")
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            logging.getLogger(__name__).warning("Ignoring invalid log sample rate '%s'", pair)
+    return rates
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cap text at max_chars characters, noting how much was cut."""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... [{len(text) - max_chars} chars truncated]"
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records below WARNING from the configured loggers.
+
+    The rate of the longest matching logger prefix applies, so
+    {"openai_agent_sdk_tutorial": 0.5, "openai_agent_sdk_tutorial.hook": 0.1}
+    keeps 10% of the hook records and 50% of the other records of the package.
+    Warnings and errors are always kept. The filter runs before the message is
+    formatted, so dropped records never pay for formatting their arguments.
+
+    Args:
+        rates: Sampling rate (0 to 1) per logger name.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved: Dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        if name not in self._resolved:
+            matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+            self._resolved[name] = self.rates[max(matches, key=len)] if matches else 1.0
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or random.random() < rate  # nosec B311 - sampling, not security
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Args:
+        datefmt: Optional date format of the "ts" field.
+        max_chars: Maximum message length, 0 for no limit.
+    """
+
+    def __init__(self, datefmt: Optional[str] = None, max_chars: int = 0) -> None:
+        super().__init__(datefmt=datefmt)
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage(), self.max_chars),
+        }
+        # Records from a BoundedQueueHandler carry the traceback already rendered, in exc_text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that truncates messages and drops records when the queue is full.
+
+    The message is formatted on the calling thread (its arguments may change
+    later), capped at max_chars, and handed to the writer thread. A traceback
+    is rendered into exc_text, apart from the message and never truncated, so
+    the writer's formatter adds it the same way as when logging inline. When
+    the writer falls behind, records are dropped instead of blocking the event loop.
+
+    Args:
+        log_queue: The queue read by the QueueListener.
+        max_chars: Maximum message length, 0 for no limit.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]", max_chars: int = LOG_MAX_CHARS) -> None:
+        super().__init__(log_queue)
+        self.log_queue = log_queue
+        self.max_chars = max_chars
+        self.dropped = 0
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare(), the traceback is not merged into the message
+        message = truncate(record.getMessage(), self.max_chars)
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = self._exception_formatter.formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = record.message = message
+        record.args = None
+        # The traceback objects stay on the calling thread
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.log_queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class TruncatingFormatter(logging.Formatter):
+    """Plain-text formatter that caps the message length (used when logging inline)."""
+
+    def __init__(self, fmt: Optional[str], datefmt: Optional[str], max_chars: int) -> None:
+        super().__init__(fmt, datefmt)
+        self.max_chars = max_chars
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = truncate(record.message, self.max_chars)
+        return super().formatMessage(record)
+
+
+_queue_listener: Optional[QueueListener] = None
+
+
+def stop_logging() -> None:
+    """Flush the queued records and stop the background writer, if one is running."""
+    global _queue_listener  # pylint: disable=global-statement
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
 
 
 def configure_logging(
@@ -7,6 +187,10 @@ def configure_logging(
     format: Optional[str] = None,
     datefmt: Optional[str] = None,
     log_file: Optional[str] = None,
+    async_logging: bool = LOG_ASYNC,
+    json_format: bool = LOG_FORMAT == "json",
+    sample_rates: Optional[Mapping[str, float]] = None,
+    max_chars: int = LOG_MAX_CHARS,
 ) -> None:
     """
     Configure logging for this application.
@@ -14,14 +198,25 @@ def configure_logging(
     This function configures the root logger to capture logs from all modules
     (app, hooks, tools) regardless of how they're imported.
 
+    With async_logging (the default), the root logger only puts records on a
+    bounded queue; a QueueListener thread formats and writes them, so console
+    or disk I/O never stalls the event loop. Records below WARNING can be
+    sampled per logger, and long messages (e.g. full agent outputs) are truncated.
+
     Args:
         level: Log level as a string (DEBUG, INFO, WARNING, ERROR, CRITICAL).
                Defaults to "INFO".
         format: Optional custom format string for log messages.
                 If not provided, uses a default format with timestamp and level.
+                Ignored for JSON output.
         datefmt: Optional custom date format string.
         log_file: Optional path to a log file. If provided, logs are written to the file
                   instead of the console.
+        async_logging: Write records from a background thread. Defaults to LOG_ASYNC.
+        json_format: Write one JSON object per record. Defaults to LOG_FORMAT == "json".
+        sample_rates: Fraction of records below WARNING kept per logger name.
+                      Defaults to LOG_SAMPLE_RATES.
+        max_chars: Maximum message length, 0 for no limit. Defaults to LOG_MAX_CHARS.
 
     Examples:
     ::
@@ -39,7 +234,15 @@ def configure_logging(
         ...     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
         ...     datefmt="%Y-%m-%d %H:%M:%S"
         ... )
+
+        JSON lines, keeping 10% of the hook debug records:
+        >>> configure_logging(
+        ...     level="DEBUG",
+        ...     json_format=True,
+        ...     sample_rates={"openai_agent_sdk_tutorial.hook": 0.1},
+        ... )
     """
+    global _queue_listener  # pylint: disable=global-statement
     log_level = getattr(logging, level.upper(), logging.INFO)
 
     # Suppress noisy third-party loggers
@@ -61,10 +264,71 @@ def configure_logging(
         else:
             handler = logging.StreamHandler()
         handler.setLevel(log_level)
-        handler.setFormatter(
-            logging.Formatter(
-                format or "%(asctime)s %(levelname)-8s %(name)s - %(message)s",
-                datefmt=datefmt or "%Y-%m-%d %H:%M:%S",
-            )
-        )
-        root_logger.addHandler(handler)
+        if json_format:
+            handler.setFormatter(JsonFormatter(datefmt=datefmt, max_chars=0 if async_logging else max_chars))
+        elif async_logging:
+            # Messages are already truncated by BoundedQueueHandler
+            handler.setFormatter(logging.Formatter(format or DEFAULT_FORMAT, datefmt=datefmt or DEFAULT_DATEFMT))
+        else:
+            handler.setFormatter(TruncatingFormatter(format or DEFAULT_FORMAT, datefmt or DEFAULT_DATEFMT, max_chars))
+
+        front: logging.Handler = handler
+        if async_logging:
+            log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(LOG_QUEUE_SIZE)
+            front = BoundedQueueHandler(log_queue, max_chars)
+            front.setLevel(log_level)
+            _queue_listener = QueueListener(log_queue, handler, respect_handler_level=True)
+            _queue_listener.start()
+            atexit.register(stop_logging)
+
+        rates = parse_sample_rates(LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+        if rates:
+            front.addFilter(SamplingFilter(rates))
+        root_logger.addHandler(front)
+
+
+def log_queue_stats() -> Dict[str, int]:
+    """Return the number of records waiting for the writer thread and the number dropped."""
+    handlers: List[logging.Handler] = logging.getLogger().handlers
+    stats = {"queued": 0, "dropped": 0}
+    for handler in handlers:
+        if isinstance(handler, BoundedQueueHandler):
+            stats["queued"] += handler.log_queue.qsize()
+            stats["dropped"] += handler.dropped
+    return stats
+
+
+def isolate_environment(db_path: Optional[str] = None) -> None:
+    """Keep a batch, benchmark or load test run offline and side-effect free.
+
+    Points sessions, usage and the push outbox at their own database, drops the
+    push credentials and disables trace export. The agent modules read these
+    settings when they are imported, so the commands import them late and call
+    this function first.
+
+    Args:
+        db_path: Database for sessions, usage and the push outbox. Defaults to an in-memory database.
+    """
+    os.environ["AGENT_DB_PATH"] = db_path or ":memory:"
+    os.environ["OPENAI_AGENTS_DISABLE_TRACING"] = "1"
+    for name in ("PUSHOVER_TOKEN", "PUSHOVER_USER"):
+        os.environ.pop(name, None)
+
+
+def run_quietly(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine with asyncio.run(), sending stdout to stderr.
+
+    Tools and callbacks print to stdout; the commands keep it for their report.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        return asyncio.run(main)
+
+
+def write_report(report: Mapping[str, Any], path: Optional[str] = None) -> None:
+    """Write a report as indented JSON to path, or print it to stdout."""
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
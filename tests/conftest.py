@@ -1,5 +1,6 @@
 """Pytest configuration"""
 
+import os
 import sys
 from pathlib import Path
 
@@ -14,3 +15,9 @@ sys.path.insert(0, str(TESTS_DIR_PARENT))
 src_dir = TESTS_DIR_PARENT / "src"
 if src_dir.exists():
     sys.path.insert(0, str(src_dir))
+
+# Tests run offline: never export traces to the OpenAI backend
+os.environ.setdefault("OPENAI_AGENTS_DISABLE_TRACING", "1")
+
+# Agent runs in tests keep their sessions and push outbox in memory
+os.environ.setdefault("AGENT_DB_PATH", ":memory:")
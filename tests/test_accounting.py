@@ -0,0 +1,68 @@
+"""Tests for token and cost accounting."""
+
+import asyncio
+
+import pytest
+
+from openai_agent_sdk_tutorial.accounting import (
+    RequestUsage,
+    UsageLedger,
+    UsageTotals,
+    estimate_cost,
+)
+from openai_agent_sdk_tutorial.agent import run_agent
+from openai_agent_sdk_tutorial.benchmark import (
+    ScriptedModelProvider,
+    scenarios,
+)
+from openai_agent_sdk_tutorial.provider import use_model_provider
+from openai_agent_sdk_tutorial.tool import use_contact_capture
+
+
+def test_estimate_cost_prices_cached_tokens_separately() -> None:
+    """Test that cached input tokens are billed at the cached price and unknown models cost nothing."""
+    assert estimate_cost("gpt-5.2", 1_000_000, 0, 0) == 1.75
+    assert estimate_cost("gpt-5.2", 1_000_000, 1_000_000, 1_000_000) == 0.175 + 14.0
+    assert estimate_cost("unknown-model", 1_000, 0, 1_000) == 0.0
+
+
+def test_run_agent_returns_usage_of_nested_runs() -> None:
+    """Test that run_agent() accounts for the main agent, agents-as-tools and guardrail agents."""
+    contact = scenarios()[1]
+
+    async def scenario() -> RequestUsage:
+        with use_model_provider(ScriptedModelProvider()), use_contact_capture("chain"):
+            result = await run_agent(contact.message, session_id="accounting-contact", user_id="jane")
+        assert contact.check(result.output)
+        return result.usage
+
+    usage = asyncio.run(scenario())
+    assert (usage.user_id, usage.session_id) == ("jane", "accounting-contact")
+    keys = {(agent, tool) for agent, tool, _ in usage.entries}
+    assert keys == {
+        ("Helpful Notification Agent", ""),
+        ("Send Contact Request Agent", "send_contact_request"),
+        ("Contact Info Extractor Agent", "contact_info_extractor"),
+        ("Input classifier", ""),
+        ("Professional response checker", ""),
+    }
+    assert usage.total.requests == 8
+    assert usage.total.cost > 0
+
+
+def test_ledger_aggregates_by_user_and_agent() -> None:
+    """Test that the ledger sums requests per group and rejects unknown group columns."""
+    ledger = UsageLedger(":memory:")
+    for user_id in ("alice", "alice", "bob"):
+        usage = RequestUsage(user_id=user_id, session_id=user_id)
+        totals = UsageTotals(requests=1, input_tokens=10, cached_tokens=4, output_tokens=5, cost=0.5)
+        usage.record("Agent", "", "gpt-5.2", totals)
+        ledger.record(usage)
+
+    totals = {row["user_id"]: row for row in ledger.totals(group_by=("user_id",))}
+    assert totals["alice"]["requests"] == 2
+    assert totals["alice"]["cost"] == 1.0
+    assert totals["bob"]["input_tokens"] == 10
+    assert totals["bob"]["cache_hit_rate"] == 0.4
+    with pytest.raises(ValueError):
+        ledger.totals(group_by=("cost",))
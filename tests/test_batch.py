@@ -0,0 +1,65 @@
+"""Tests for the batch evaluation of a JSONL file of prompts."""
+
+import asyncio
+import io
+import json
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+
+import pytest
+
+from openai_agent_sdk_tutorial import guardrail
+from openai_agent_sdk_tutorial.agent import ERROR_MESSAGE
+from openai_agent_sdk_tutorial.batch import (
+    SUMMARY_COLUMNS,
+    format_table,
+    run_batch,
+    summarize,
+)
+from openai_agent_sdk_tutorial.benchmark import ScriptedModelProvider
+from openai_agent_sdk_tutorial.cache import VerdictCache
+from openai_agent_sdk_tutorial.provider import use_model_provider
+from openai_agent_sdk_tutorial.session import session_manager
+
+
+def test_batch_streams_one_record_per_prompt(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that every prompt gets a result line with its outcome, model calls and tokens."""
+    monkeypatch.setattr(guardrail, "verdict_cache", VerdictCache(db_path=None))
+    lines = [
+        json.dumps({"id": "hours", "input": "What are your opening hours?"}),
+        "",
+        json.dumps("What the hell happened to my transfer?"),
+        json.dumps({"id": "empty"}),
+        json.dumps({"id": "hours", "input": "What are your opening hours?"}),
+    ]
+    output = io.StringIO()
+
+    async def scenario() -> Tuple[List[Dict[str, Any]], int]:
+        with use_model_provider(ScriptedModelProvider(latency=0.01)):
+            records = await run_batch(lines, output, concurrency=2, batch_id="test")
+        history = await session_manager.get("batch-test-4").get_items()
+        return records, sum(1 for item in history if item.get("role") == "user")
+
+    records, user_messages = asyncio.run(scenario())
+    written = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert written == records
+    by_index = {record["index"]: record for record in records}
+    assert {index: record["id"] for index, record in by_index.items()} == {0: "hours", 2: "2", 3: "empty", 4: "hours"}
+
+    assert by_index[0]["outcome"] == "answered"
+    assert "9am" in by_index[0]["output"]
+    assert by_index[0]["model_calls"] >= 2
+    assert by_index[0]["input_tokens"] > 0
+    # Isolated sessions: the prompt repeated under the same id does not see the first one
+    assert user_messages == 1
+    assert (by_index[2]["outcome"], by_index[2]["output"]) == ("input_guardrail", ERROR_MESSAGE)
+    assert by_index[3]["outcome"] == "invalid"
+
+    rows = summarize(records)
+    assert rows[-1]["outcome"] == "total" and rows[-1]["items"] == 4
+    assert {row["outcome"]: row["items"] for row in rows[:-1]} == {"answered": 2, "input_guardrail": 1, "invalid": 1}
+    assert format_table(rows, SUMMARY_COLUMNS).splitlines()[0].split() == SUMMARY_COLUMNS
@@ -0,0 +1,44 @@
+"""Tests for the end-to-end benchmark scenarios with the scripted model."""
+
+import asyncio
+from typing import List
+
+from openai_agent_sdk_tutorial.agent import run_agent_streamed
+from openai_agent_sdk_tutorial.benchmark import (
+    ScriptedModelProvider,
+    run_scenario,
+    scenarios,
+)
+from openai_agent_sdk_tutorial.provider import use_model_provider
+
+
+def test_scenarios_exercise_the_whole_agent_graph() -> None:
+    """Test that every scenario produces its expected answer with the expected number of model calls."""
+
+    async def scenario() -> List[float]:
+        calls = []
+        for case in scenarios():
+            result = await run_scenario(case, iterations=1, latency=0.0)
+            assert result["failed_checks"] == 0, case.name
+            calls.append(result["model_calls_per_turn"])
+        return calls
+
+    assert asyncio.run(scenario()) == [3, 4, 8, 3, 2]
+
+
+def test_streamed_answer_matches_final_output() -> None:
+    """Test that streamed chunks add up to the final answer, including after tool calls."""
+    plain, contact = scenarios()[:2]
+
+    async def collect(message: str, session_id: str) -> str:
+        answer = ""
+        async for chunk in run_agent_streamed(message, session_id=session_id):
+            answer = chunk.text if chunk.replace else answer + chunk.text
+        return answer
+
+    async def scenario() -> None:
+        with use_model_provider(ScriptedModelProvider()):
+            assert plain.check(await collect(plain.message, "stream-plain"))
+            assert contact.check(await collect(contact.message, "stream-contact"))
+
+    asyncio.run(scenario())
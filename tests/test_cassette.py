@@ -0,0 +1,87 @@
+"""Tests for the record/replay model provider."""
+
+import asyncio
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    List,
+    Optional,
+)
+
+import pytest
+
+from agents import (
+    Agent,
+    Model,
+    ModelProvider,
+    ModelResponse,
+    RunConfig,
+    Runner,
+    Usage,
+)
+from openai.types.responses import (
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from openai_agent_sdk_tutorial.cassette import (
+    AUTO,
+    REPLAY,
+    CassetteMissError,
+    CassetteModelProvider,
+)
+
+
+class EchoModel(Model):
+    """Answers with the number of calls so far, so recordings are distinguishable."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.calls += 1
+        message = ResponseOutputMessage(
+            id=f"msg_{self.calls}",
+            content=[ResponseOutputText(annotations=[], text=f"answer {self.calls}", type="output_text")],
+            role="assistant",
+            status="completed",
+            type="message",
+        )
+        return ModelResponse(output=[message], usage=Usage(requests=1, input_tokens=3), response_id=None)
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        raise NotImplementedError
+
+
+class EchoProvider(ModelProvider):
+    def __init__(self) -> None:
+        self.model = EchoModel()
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return self.model
+
+
+def test_cassette_records_once_and_replays_offline(tmp_path: Path) -> None:
+    """Test that replays (plain and streamed) serve the recorded answer without the real model."""
+    agent = Agent(name="Echo", instructions="Answer.", model="gpt-5.2")
+    inner = EchoProvider()
+    recorder = CassetteModelProvider(AUTO, tmp_path, inner=inner)
+    player = CassetteModelProvider(REPLAY, tmp_path)
+
+    async def scenario() -> List[str]:
+        outputs = []
+        for provider in (recorder, recorder, player):
+            result = await Runner.run(agent, "hi", run_config=RunConfig(model_provider=provider))
+            outputs.append(result.final_output)
+        streamed = Runner.run_streamed(agent, "hi", run_config=RunConfig(model_provider=player))
+        async for _ in streamed.stream_events():
+            pass
+        outputs.append(streamed.final_output)
+        assert streamed.context_wrapper.usage.input_tokens == 3
+        with pytest.raises(CassetteMissError):
+            await Runner.run(agent, "bye", run_config=RunConfig(model_provider=player))
+        return outputs
+
+    assert asyncio.run(scenario()) == ["answer 1"] * 4
+    assert inner.model.calls == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
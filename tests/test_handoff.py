@@ -0,0 +1,52 @@
+"""Tests for the supervisor escalation handoff."""
+
+from typing import List
+
+from agents import (
+    Agent,
+    HandoffCallItem,
+    HandoffInputData,
+    TResponseInputItem,
+)
+from openai.types.responses import ResponseFunctionToolCall
+from openai_agent_sdk_tutorial.handoff import (
+    HandoffHistoryFilter,
+    estimate_tokens,
+)
+
+
+def test_filter_drops_tool_items_and_keeps_recent_turns_within_budget() -> None:
+    """Test that the target agent gets the last turns without tool noise, and a note with the reason."""
+    agent = Agent(name="Caller", instructions="Answer.", model="gpt-5.2")
+    history: List[TResponseInputItem] = []
+    for turn in range(6):
+        history += [
+            {"role": "user", "content": f"Question {turn}: " + "details " * 20},
+            {"type": "function_call", "call_id": f"c{turn}", "name": "lookup", "arguments": "{}"},
+            {"type": "function_call_output", "call_id": f"c{turn}", "output": "x" * 400},
+            {"role": "assistant", "content": f"Answer {turn}"},
+        ]
+    history.append({"role": "user", "content": "I want to talk to a supervisor"})
+    handoff_call = HandoffCallItem(
+        agent=agent,
+        raw_item=ResponseFunctionToolCall(
+            type="function_call",
+            call_id="h1",
+            name="supervisor_handoff_tool",
+            arguments='{"reason": "The user asked for a supervisor"}',
+        ),
+    )
+    data = HandoffInputData(input_history=tuple(history), pre_handoff_items=(), new_items=(handoff_call,))
+
+    filtered = HandoffHistoryFilter(keep_turns=3, token_budget=100)(data)
+
+    items = list(filtered.input_history)
+    note = str(items[0]["content"])
+    assert "Reason for the handoff: The user asked for a supervisor" in note
+    assert "5 earlier turns and 13 tool calls and outputs" in note
+    assert "Earlier user: Question 4" in note
+    assert items[1:] == history[-5:-4] + history[-2:]
+    assert filtered.pre_handoff_items == () and filtered.input_items == ()
+    # The session still receives every generated item
+    assert filtered.new_items == (handoff_call,)
+    assert estimate_tokens(items) < estimate_tokens(history) // 5
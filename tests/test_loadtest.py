@@ -0,0 +1,32 @@
+"""Tests for the load test harness driving the chat UI."""
+
+import asyncio
+
+import pytest
+
+from openai_agent_sdk_tutorial import agent
+from openai_agent_sdk_tutorial.loadtest import run_load_test
+from openai_agent_sdk_tutorial.scheduler import RequestScheduler
+
+
+def test_closed_loop_reports_throughput_latency_and_loop_lag() -> None:
+    """Test that simulated users complete turns and every section of the report is filled."""
+    report = asyncio.run(run_load_test("closed", users=4, duration=0.3, model_latency=0.01))
+
+    assert report["answered"] > 0
+    assert report["failed"] == 0 and report["busy"] == 0
+    assert report["throughput_per_s"] > 0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert report["first_chunk_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert report["queue_wait_ms"]["p50"] is not None
+    assert report["event_loop_lag_ms"]["max"] >= 0
+
+
+def test_open_loop_beyond_capacity_turns_users_away(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that arrivals faster than the scheduler admits them come back busy instead of failing."""
+    monkeypatch.setattr(agent, "request_scheduler", RequestScheduler(max_concurrency=1, max_queue=1))
+    report = asyncio.run(run_load_test("open", users=10, duration=0.3, model_latency=0.05, rate=100))
+
+    assert report["busy"] > 0
+    assert report["answered"] > 0
+    assert report["failed"] == 0
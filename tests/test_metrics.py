@@ -0,0 +1,64 @@
+"""Tests for the latency histograms and the metrics hook."""
+
+import asyncio
+
+from openai_agent_sdk_tutorial.benchmark import (
+    run_scenario,
+    scenarios,
+)
+from openai_agent_sdk_tutorial.metrics import (
+    Histogram,
+    guardrail_seconds,
+    handoffs_total,
+    llm_call_seconds,
+    metrics,
+    tool_call_seconds,
+    turn_seconds,
+)
+
+
+def test_histogram_buckets_quantiles_and_exposition() -> None:
+    """Test that observations land in cumulative buckets and quantiles stay within bucket bounds."""
+    histogram = Histogram("stage_seconds", "Stage duration.", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "llm")
+
+    assert histogram.count("llm") == 4
+    p50 = histogram.quantile(0.5, "llm")
+    assert p50 is not None and 0.1 <= p50 <= 1.0
+    assert histogram.quantile(0.5, "tool") is None
+    lines = histogram.render()
+    assert 'stage_seconds_bucket{stage="llm",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="llm",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="llm",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="llm"} 6.05' in lines
+
+
+def test_agent_run_records_every_stage() -> None:
+    """Test that a run records its turn, model calls, tool calls, guardrails and handoffs."""
+    plain, contact, _, supervisor, trip = scenarios()
+    agent_name = "Helpful Notification Agent"
+    before = {
+        "answered": turn_seconds.count("answered"),
+        "tripped": turn_seconds.count("input_guardrail"),
+        "llm": llm_call_seconds.count(agent_name),
+        "tool": tool_call_seconds.count(agent_name, "send_contact_request"),
+        "classified": guardrail_seconds.count("input_guardrail_foul_language", "agent"),
+        "handoff": handoffs_total.value(agent_name, "Rude Escalation Agent"),
+    }
+
+    async def scenario() -> None:
+        for case in (plain, contact, supervisor, trip):
+            await run_scenario(case, iterations=1, latency=0.0)
+
+    asyncio.run(scenario())
+
+    assert turn_seconds.count("answered") == before["answered"] + 3
+    assert turn_seconds.count("input_guardrail") == before["tripped"] + 1
+    assert llm_call_seconds.count(agent_name) > before["llm"]
+    assert tool_call_seconds.count(agent_name, "send_contact_request") == before["tool"] + 1
+    assert guardrail_seconds.count("input_guardrail_foul_language", "agent") == before["classified"] + 4
+    assert handoffs_total.value(agent_name, "Rude Escalation Agent") == before["handoff"] + 1
+    text = metrics.render()
+    assert "# TYPE agent_llm_call_seconds histogram" in text
+    assert "agent_scheduler_admitted" in text
@@ -0,0 +1,144 @@
+"""Tests for the durable push-notification outbox."""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from openai_agent_sdk_tutorial.notification import (
+    PushClient,
+    PushDispatcher,
+    PushOutbox,
+)
+
+
+def status_of(outbox: PushOutbox, row_id: int) -> str:
+    row = outbox._get_connection().execute("SELECT status FROM push_outbox WHERE id = ?", (row_id,)).fetchone()
+    return str(row[0])
+
+
+def make_due(outbox: PushOutbox) -> None:
+    conn = outbox._get_connection()
+    conn.execute("UPDATE push_outbox SET next_attempt_at = 0 WHERE status = 'pending'")
+    conn.commit()
+
+
+def test_outbox_coalesces_pending_messages_with_the_same_key() -> None:
+    """Test that a same-key message replaces the pending one, while other keys add rows."""
+    outbox = PushOutbox(":memory:", linger=0)
+    assert outbox.enqueue("Recording: Jane", dedupe_key="jane@example.com") is False
+    assert outbox.enqueue("Recording: Jane Doe", dedupe_key="jane@example.com") is True
+    assert outbox.enqueue("Recording: John", dedupe_key="john@example.com") is False
+    assert outbox.enqueue("No key") is False
+    assert outbox.pending_count() == 3
+    assert [message for _, message in outbox.claim_batch(10)] == ["Recording: Jane Doe", "Recording: John", "No key"]
+
+    # Once claimed, a message is no longer merged into
+    assert outbox.enqueue("Recording: Jane again", dedupe_key="jane@example.com") is False
+
+
+def test_outbox_claims_batches_within_item_and_length_limits() -> None:
+    """Test that a batch stops at max_items or before its joined text exceeds max_chars."""
+    outbox = PushOutbox(":memory:", linger=0)
+    for char in "abcd":
+        outbox.enqueue(char * 400)
+
+    first = outbox.claim_batch(10, max_chars=1024)
+    assert [len(message) for _, message in first] == [400, 400]
+    assert len(outbox.claim_batch(1)) == 1
+    assert len(outbox.claim_batch(10)) == 1
+    assert outbox.claim_batch(10) == []
+
+    # A single message longer than the limit is still sent (and truncated by the client)
+    outbox.enqueue("x" * 2000)
+    assert len(outbox.claim_batch(10, max_chars=1024)) == 1
+
+
+def test_outbox_backs_off_failed_messages_and_marks_them_dead() -> None:
+    """Test that failures are retried with growing delays until max_attempts is reached."""
+    outbox = PushOutbox(":memory:", linger=0, max_attempts=3, backoff_base=10, backoff_max=15)
+    outbox.enqueue("hello")
+    ids = [row_id for row_id, _ in outbox.claim_batch(10)]
+
+    delays = []
+    for _ in range(2):
+        assert outbox.mark_failed(ids, "503 Service Unavailable") == 0
+        assert status_of(outbox, ids[0]) == "pending"
+        assert outbox.claim_batch(10) == []
+        delays.append(outbox.next_due_in())
+        make_due(outbox)
+        assert [row_id for row_id, _ in outbox.claim_batch(10)] == ids
+
+    # 10 s then 20 s capped at 15 s, each with +/-20% jitter
+    assert delays[0] is not None and 7.5 <= delays[0] <= 12
+    assert delays[1] is not None and 11.5 <= delays[1] <= 18
+    assert outbox.mark_failed(ids, "503 Service Unavailable") == 1
+    assert status_of(outbox, ids[0]) == "dead"
+    assert outbox.pending_count() == 0 and outbox.claim_batch(10) == []
+
+
+def test_outbox_only_reclaims_expired_leases(tmp_path: Path) -> None:
+    """Test that a process starting on a shared outbox leaves other claims alone until their lease expires."""
+    db_path = str(tmp_path / "outbox.db")
+    sender = PushOutbox(db_path, linger=0)
+    sender.enqueue("hello")
+    claimed = sender.claim_batch(10)
+    assert len(claimed) == 1
+
+    # A second process opening the database does not re-queue the batch in flight
+    restarted = PushOutbox(db_path, linger=0, lease=60)
+    assert restarted.claim_batch(10) == []
+    assert status_of(restarted, claimed[0][0]) == "inflight"
+    due_in = restarted.next_due_in()
+    assert due_in is not None and 55 < due_in <= 60
+
+    # Once the lease has expired, the claim is considered abandoned and handed out again
+    expired = PushOutbox(db_path, linger=0, lease=0)
+    assert expired.claim_batch(10) == claimed
+    sender.mark_sent([row_id for row_id, _ in claimed])
+    assert expired.claim_batch(10) == [] and expired.next_due_in() is None
+
+
+def test_dispatcher_worker_survives_outbox_errors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a failure to record a delivery is retried after the lease instead of ending the worker."""
+    monkeypatch.setenv("PUSHOVER_TOKEN", "token")
+    monkeypatch.setenv("PUSHOVER_USER", "user")
+    sent: List[str] = []
+
+    class RecordingClient(PushClient):
+        async def send(self, text: str) -> None:
+            sent.append(text)
+
+    outbox = PushOutbox(str(tmp_path / "outbox.db"), linger=0, lease=0)
+    mark_sent = outbox.mark_sent
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky_mark_sent(ids: List[int]) -> None:
+        if failures:
+            raise failures.pop()
+        mark_sent(ids)
+
+    monkeypatch.setattr(outbox, "mark_sent", flaky_mark_sent)
+    dispatcher = PushDispatcher(RecordingClient(), outbox, max_concurrency=1, poll_interval=0.01)
+
+    async def wait_for(text: str) -> None:
+        for _ in range(200):
+            if text in sent:
+                return
+            await asyncio.sleep(0.01)
+
+    async def scenario() -> None:
+        await dispatcher.submit("first")
+        await wait_for("first")
+        await dispatcher.submit("second")
+        await wait_for("second")
+        assert not any(worker.done() for worker in dispatcher._workers)
+        await dispatcher.aclose()
+
+    asyncio.run(scenario())
+    assert failures == []
+    # The unrecorded batch is delivered again once its lease expires
+    assert sent[:2] == ["first", "first"] and "second" in sent
+    assert outbox.pending_count() == 0
@@ -0,0 +1,46 @@
+"""Tests for prompt-cache-aware instructions."""
+
+from agents import (
+    Agent,
+    Usage,
+)
+from openai.types.responses.response_usage import (
+    InputTokensDetails,
+    OutputTokensDetails,
+)
+from openai_agent_sdk_tutorial.accounting import record_usage
+from openai_agent_sdk_tutorial.metrics import prompt_cache_hit_ratio
+from openai_agent_sdk_tutorial.prompt import InstructionRenderer
+
+
+def test_renderer_keeps_a_stable_prefix_and_memoizes_by_context_value() -> None:
+    """Test that contexts equal in value render the same bytes, behind the unchanged static prefix."""
+    renderer = InstructionRenderer("Static instructions.")
+    first = renderer.render({"user_id": "alice", "preferred_language": "en"})
+    second = renderer.render({"preferred_language": "en", "user_id": "alice"})
+    other = renderer.render({"user_id": "bob", "preferred_language": "en"})
+
+    assert first == second
+    assert first == 'Static instructions.\n\nCurrent context: {"preferred_language":"en","user_id":"alice"}'
+    assert other.startswith("Static instructions.\n\nCurrent context: ")
+    assert renderer.render(None) == "Static instructions."
+    assert renderer.snapshot() == {"hits": 1, "misses": 2, "size": 2}
+
+
+def test_record_usage_observes_the_prompt_cache_hit_ratio() -> None:
+    """Test that each model call reports the share of its input tokens read from the prompt cache."""
+    agent = Agent(name="Cache ratio agent", instructions="Answer.", model="gpt-5.2")
+    for cached in (0, 900):
+        usage = Usage(
+            requests=1,
+            input_tokens=1000,
+            input_tokens_details=InputTokensDetails(cached_tokens=cached),
+            output_tokens=10,
+            output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+            total_tokens=1010,
+        )
+        record_usage(agent, usage)
+
+    assert prompt_cache_hit_ratio.count(agent.name) == 2
+    assert prompt_cache_hit_ratio.quantile(0.5, agent.name) == 0.0
+    assert prompt_cache_hit_ratio.quantile(1.0, agent.name) == 0.9
@@ -0,0 +1,55 @@
+"""Tests for the per-role model routing."""
+
+import asyncio
+
+import pytest
+
+from agents import Agent
+from openai_agent_sdk_tutorial import guardrail
+from openai_agent_sdk_tutorial.agent import run_agent
+from openai_agent_sdk_tutorial.benchmark import ScriptedModelProvider
+from openai_agent_sdk_tutorial.cache import VerdictCache
+from openai_agent_sdk_tutorial.metrics import route_llm_call_seconds
+from openai_agent_sdk_tutorial.provider import use_model_provider
+from openai_agent_sdk_tutorial.routing import (
+    CLASSIFIER,
+    DEFAULT_ROUTES,
+    SUMMARIZER,
+    ModelRouter,
+    model_router,
+)
+
+
+def test_overrides_replace_the_model_and_merge_the_settings() -> None:
+    """Test that a role override keeps the default settings it does not mention."""
+    router = ModelRouter(
+        overrides={CLASSIFIER: {"model": "gpt-5-mini", "model_settings": {"temperature": 0.0}}},
+        environ={"AGENT_MODEL_SUMMARIZER": "gpt-5-nano"},
+    )
+    agent = router.route(CLASSIFIER, Agent(name="Classifier under test"))
+
+    assert agent.model == "gpt-5-mini"
+    assert agent.model_settings.temperature == 0.0
+    assert agent.model_settings.max_tokens == DEFAULT_ROUTES[CLASSIFIER].settings.max_tokens
+    assert router.role_of(agent) == CLASSIFIER
+    assert router.routes[SUMMARIZER].model == "gpt-5-nano"
+
+
+def test_invalid_settings_are_ignored() -> None:
+    """Test that an unknown setting falls back to the default settings of the role."""
+    router = ModelRouter(overrides={CLASSIFIER: {"model_settings": {"no_such_setting": 1}}}, environ={})
+    assert router.routes[CLASSIFIER] == DEFAULT_ROUTES[CLASSIFIER]
+
+
+def test_model_calls_are_timed_per_route(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the guardrail agents' calls are recorded under the classifier route."""
+    monkeypatch.setattr(guardrail, "verdict_cache", VerdictCache(db_path=None))
+    model = model_router.routes[CLASSIFIER].model
+    before = route_llm_call_seconds.count(CLASSIFIER, model)
+
+    async def scenario() -> None:
+        with use_model_provider(ScriptedModelProvider()):
+            await run_agent("What can you tell me about your services?", session_id="routing")
+
+    asyncio.run(scenario())
+    assert route_llm_call_seconds.count(CLASSIFIER, model) > before
@@ -0,0 +1,68 @@
+"""Tests for admission control of agent runs."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from openai_agent_sdk_tutorial.scheduler import (
+    RequestScheduler,
+    SchedulerBusy,
+)
+
+
+def test_scheduler_caps_concurrency_and_serves_users_round_robin() -> None:
+    """Test that waiting requests are admitted alternately per user, never above the cap."""
+    scheduler = RequestScheduler(max_concurrency=1, max_queue=10, queue_timeout=5)
+    order: List[str] = []
+
+    async def request(user_id: str) -> None:
+        async with scheduler.slot(user_id):
+            assert scheduler.active == 1
+            order.append(user_id)
+            await asyncio.sleep(0.01)
+
+    async def scenario() -> None:
+        tasks = [asyncio.create_task(request("alice"))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(request("alice")) for _ in range(3)]
+        tasks += [asyncio.create_task(request("bob")) for _ in range(2)]
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == ["alice", "alice", "bob", "alice", "bob", "alice"]
+    assert scheduler.snapshot()["admitted"] == 6 and scheduler.active == 0
+
+
+def test_scheduler_turns_requests_away_when_full_or_too_slow() -> None:
+    """Test that a full queue rejects immediately and a waiter gives up after its timeout."""
+    scheduler = RequestScheduler(max_concurrency=1, max_queue=1, queue_timeout=0.05)
+
+    async def hold() -> None:
+        async with scheduler.slot("alice"):
+            await asyncio.sleep(0.2)
+
+    async def wait_for_slot() -> None:
+        async with scheduler.slot("bob"):
+            pass
+
+    async def scenario() -> None:
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerBusy):
+            await wait_for_slot()
+        with pytest.raises(SchedulerBusy):
+            await waiter
+        await holder
+
+    asyncio.run(scenario())
+    assert scheduler.snapshot() == {
+        "admitted": 1,
+        "queued": 1,
+        "rejected": 1,
+        "timed_out": 1,
+        "active": 0,
+        "waiting": 0,
+    }
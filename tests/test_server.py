@@ -0,0 +1,174 @@
+"""Tests for the headless ASGI server."""
+
+import asyncio
+import json
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+
+import pytest
+
+import httpx
+from openai_agent_sdk_tutorial import (
+    agent,
+    guardrail,
+)
+from openai_agent_sdk_tutorial.benchmark import ScriptedModelProvider
+from openai_agent_sdk_tutorial.cache import VerdictCache
+from openai_agent_sdk_tutorial.guardrail import (
+    InputClassification,
+    UnprofessionalResponse,
+)
+from openai_agent_sdk_tutorial.provider import use_model_provider
+from openai_agent_sdk_tutorial.scheduler import RequestScheduler
+from openai_agent_sdk_tutorial.server import ChatServer
+from openai_agent_sdk_tutorial.session import session_manager
+
+
+def chat_request(text: str, stream: bool = False) -> Dict[str, Any]:
+    return {"model": "agent", "stream": stream, "messages": [{"role": "user", "content": text}]}
+
+
+def sse_chunks(body: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """Return the chat.completion.chunk events of an SSE body and whether it ended with [DONE]."""
+    data = [line[len("data: ") :] for line in body.splitlines() if line.startswith("data: ")]
+    return [json.loads(item) for item in data if item != "[DONE]"], data[-1:] == ["[DONE]"]
+
+
+def client(app: ChatServer) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://agent")
+
+
+def test_chat_completions_map_onto_agent_sessions(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that requests with the same session id continue one conversation, with or without streaming."""
+    monkeypatch.setattr(guardrail, "verdict_cache", VerdictCache(db_path=None))
+
+    async def scenario() -> Tuple[httpx.Response, httpx.Response, httpx.Response, int]:
+        async with client(ChatServer()) as http:
+            with use_model_provider(ScriptedModelProvider()):
+                headers = {"X-Session-Id": "server-session"}
+                answer = await http.post("/v1/chat/completions", json=chat_request("Opening hours?"), headers=headers)
+                streamed = await http.post(
+                    "/v1/chat/completions", json=chat_request("And on Saturday?", stream=True), headers=headers
+                )
+                anonymous = await http.post("/v1/chat/completions", json=chat_request("Opening hours?"))
+        history = await session_manager.get("server-session").get_items()
+        return answer, streamed, anonymous, sum(1 for item in history if item.get("role") == "user")
+
+    answer, streamed, anonymous, user_messages = asyncio.run(scenario())
+
+    assert answer.status_code == 200
+    completion = answer.json()
+    assert completion["object"] == "chat.completion"
+    assert "9am" in completion["choices"][0]["message"]["content"]
+    assert completion["choices"][0]["finish_reason"] == "stop"
+    assert completion["usage"]["total_tokens"] > 0
+
+    assert streamed.headers["content-type"] == "text/event-stream"
+    chunks, done = sse_chunks(streamed.text)
+    assert done
+    assert "9am" in "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks)
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+    assert user_messages == 2
+    assert anonymous.headers["X-Session-Id"].startswith("api-")
+
+
+def test_guardrail_trips_and_busy_scheduler(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a tripped guardrail is a content filter and a full scheduler a retryable 503."""
+    monkeypatch.setattr(guardrail, "verdict_cache", VerdictCache(db_path=None))
+
+    async def scenario() -> Tuple[httpx.Response, httpx.Response, httpx.Response, httpx.Response]:
+        async with client(ChatServer()) as http:
+            with use_model_provider(ScriptedModelProvider()):
+                tripped = await http.post("/v1/chat/completions", json=chat_request("What the hell?"))
+                retracted = await http.post("/v1/chat/completions", json=chat_request("What the hell?", stream=True))
+                invalid = await http.post("/v1/chat/completions", json={"messages": []})
+                monkeypatch.setattr(agent, "request_scheduler", RequestScheduler(max_concurrency=0, max_queue=0))
+                busy = await http.post("/v1/chat/completions", json=chat_request("Opening hours?", stream=True))
+        return tripped, retracted, invalid, busy
+
+    tripped, retracted, invalid, busy = asyncio.run(scenario())
+
+    assert tripped.json()["choices"][0]["finish_reason"] == "content_filter"
+    chunks, _ = sse_chunks(retracted.text)
+    assert chunks[0]["choices"][0]["replace"] is True
+    assert chunks[0]["choices"][0]["delta"]["content"] == agent.ERROR_MESSAGE
+    assert chunks[-1]["choices"][0]["finish_reason"] == "content_filter"
+    assert invalid.status_code == 400
+    assert (busy.status_code, busy.headers["Retry-After"]) == (503, "1")
+
+
+def test_drain_turns_new_chats_away_and_waits_for_runs_in_flight(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a draining server reports not ready, rejects new chats and lets running ones finish."""
+    monkeypatch.setattr(guardrail, "verdict_cache", VerdictCache(db_path=None))
+    app = ChatServer()
+
+    async def scenario() -> Tuple[httpx.Response, bool, httpx.Response, httpx.Response, httpx.Response]:
+        async with client(app) as http:
+            with use_model_provider(ScriptedModelProvider(latency=0.05)):
+                running = asyncio.create_task(http.post("/v1/chat/completions", json=chat_request("Opening hours?")))
+                await asyncio.sleep(0.01)
+                assert app.in_flight == 1
+                drained = asyncio.create_task(app.drain(timeout=5))
+                await asyncio.sleep(0)
+                ready = await http.get("/readyz")
+                rejected = await http.post("/v1/chat/completions", json=chat_request("Opening hours?"))
+                return await running, await drained, ready, rejected, await http.get("/healthz")
+
+    running, drained, ready, rejected, health = asyncio.run(scenario())
+
+    assert running.status_code == 200 and drained
+    assert ready.status_code == 503
+    assert (rejected.status_code, rejected.headers["Connection"]) == (503, "close")
+    assert health.status_code == 200
+    assert app.in_flight == 0
+
+
+def test_client_disconnect_cancels_the_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a client that stops reading mid-stream cancels the agent run, not only the response."""
+    checked: List[str] = []
+
+    async def slow_classifier(agent: Any, text: str, context: Any, output_type: Any, tool: str = "") -> Any:
+        if output_type is InputClassification:
+            return InputClassification(
+                is_foul_language=False,
+                offense="",
+                contains_confidential=False,
+                confidential_details="",
+                is_prompt_injection=False,
+                is_off_topic=False,
+            )
+        # The output guardrail is still running when the client goes away
+        await asyncio.sleep(0.5)
+        checked.append(text)
+        return UnprofessionalResponse(is_not_professional=False, reasoning="")
+
+    monkeypatch.setattr(guardrail, "run_guardrail_agent", slow_classifier)
+    body = json.dumps(chat_request("Opening hours?", stream=True)).encode()
+    disconnected = asyncio.Event()
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive() -> Dict[str, Any]:
+        if requests:
+            return requests.pop()
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.body":
+            # The client went away: the first event is never written
+            disconnected.set()
+            await asyncio.Event().wait()
+
+    async def scenario() -> None:
+        scope = {"type": "http", "method": "POST", "path": "/v1/chat/completions", "headers": []}
+        with use_model_provider(ScriptedModelProvider(latency=0.05)):
+            await ChatServer()(scope, receive, send)
+            await asyncio.sleep(1)
+
+    asyncio.run(scenario())
+    assert checked == []
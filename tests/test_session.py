@@ -0,0 +1,72 @@
+"""Tests for per-caller session storage."""
+
+import asyncio
+from pathlib import Path
+
+from openai_agent_sdk_tutorial.compaction import (
+    SessionCompactor,
+    is_summary,
+    summary_item,
+)
+from openai_agent_sdk_tutorial.session import SessionManager
+
+
+def test_sessions_are_isolated_per_caller(tmp_path: Path) -> None:
+    """Test that each caller reads back only its own history."""
+    manager = SessionManager(str(tmp_path / "memory.db"), pool_size=2)
+
+    async def scenario() -> None:
+        alice, bob = manager.get("alice"), manager.get("bob")
+        await alice.add_items([{"role": "user", "content": "hi from alice"}])
+        await bob.add_items([{"role": "user", "content": "hi from bob"}])
+        assert [item["content"] for item in await alice.get_items()] == ["hi from alice"]
+        assert [item["content"] for item in await bob.get_items()] == ["hi from bob"]
+        assert manager.get("alice") is alice
+
+    asyncio.run(scenario())
+    manager.close()
+
+
+def test_sessions_share_a_bounded_pool(tmp_path: Path) -> None:
+    """Test that concurrent sessions reuse at most pool_size connections."""
+    manager = SessionManager(str(tmp_path / "memory.db"), pool_size=2)
+
+    async def scenario() -> None:
+        sessions = [manager.get(f"user-{i}") for i in range(10)]
+        await asyncio.gather(*(s.add_items([{"role": "user", "content": s.session_id}]) for s in sessions))
+        for s in sessions:
+            assert await s.get_items(limit=1) == [{"role": "user", "content": s.session_id}]
+
+    asyncio.run(scenario())
+    assert len(manager.pool._all) <= 2
+    manager.close()
+
+
+def test_compaction_keeps_recent_turns_and_referenced_tool_items(tmp_path: Path) -> None:
+    """Test that folding spares the last turns and tool calls they still reference."""
+    manager = SessionManager(str(tmp_path / "memory.db"))
+    compactor = SessionCompactor(token_budget=0, keep_turns=1)
+    session = manager.get("alice")
+
+    async def scenario() -> None:
+        await session.add_items(
+            [
+                {"role": "user", "content": "first question"},
+                {"type": "function_call", "call_id": "c1", "name": "lookup", "arguments": "{}"},
+                {"role": "assistant", "content": "first answer"},
+                {"role": "user", "content": "second question"},
+                {"type": "function_call_output", "call_id": "c1", "output": "late result"},
+                {"role": "assistant", "content": "second answer"},
+            ]
+        )
+        folded = compactor.select_rows_to_fold(await session.get_rows())
+        assert [item["content"] for _, item in folded] == ["first question", "first answer"]
+
+        await session.replace_rows([row_id for row_id, _ in folded], summary_item("alice asked twice"))
+        items = await session.get_items()
+        assert is_summary(items[0])
+        assert [item.get("call_id") for item in items[1:3]] == ["c1", None]
+        assert len(items) == 5
+
+    asyncio.run(scenario())
+    manager.close()
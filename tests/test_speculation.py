@@ -0,0 +1,77 @@
+"""Tests for speculative execution of the main agent."""
+
+import asyncio
+from typing import (
+    Any,
+    List,
+    Tuple,
+)
+
+import pytest
+
+from openai_agent_sdk_tutorial import guardrail
+from openai_agent_sdk_tutorial.agent import (
+    ERROR_MESSAGE,
+    run_agent,
+)
+from openai_agent_sdk_tutorial.benchmark import ScriptedModelProvider
+from openai_agent_sdk_tutorial.cache import VerdictCache
+from openai_agent_sdk_tutorial.notification import push_dispatcher
+from openai_agent_sdk_tutorial.provider import use_model_provider
+from openai_agent_sdk_tutorial.speculation import SpeculationGate
+from openai_agent_sdk_tutorial.tool import use_contact_capture
+
+
+def test_gate_releases_waiters_and_cancels_speculative_tasks() -> None:
+    """Test that the gate opens after every guardrail passed and cancels tracked work when one trips."""
+
+    async def scenario() -> Tuple[bool, bool, bool]:
+        passing = SpeculationGate(expected=2)
+        waiter = asyncio.create_task(passing.wait())
+        passing.report(False)
+        await asyncio.sleep(0)
+        still_waiting = not waiter.done()
+        passing.report(False)
+
+        tripping = SpeculationGate(expected=2)
+        speculative = asyncio.create_task(asyncio.sleep(10))
+        tripping.track(speculative)
+        tripping.report(True)
+        tripping.abort()
+        await asyncio.gather(speculative, return_exceptions=True)
+        return still_waiting and await waiter, tripping.passed, speculative.cancelled()
+
+    assert asyncio.run(scenario()) == (True, False, True)
+
+
+@pytest.mark.parametrize(
+    "message, expected_pushes",
+    [
+        ("Please get in touch, I'm Jane Doe and my email is jane.doe@example.com", 1),
+        ("What the hell, I'm Jane Doe and my email is jane.doe@example.com", 0),
+    ],
+)
+def test_side_effects_wait_for_the_input_guardrail(
+    monkeypatch: pytest.MonkeyPatch, message: str, expected_pushes: int
+) -> None:
+    """Test that the speculative turn only notifies anyone once the input guardrail passed."""
+    pushes: List[str] = []
+
+    async def submit(text: str, **kwargs: Any) -> None:
+        pushes.append(text)
+
+    monkeypatch.setattr(push_dispatcher, "submit", submit)
+    # Every guardrail verdict comes from the scripted model, and none leaks into other tests
+    monkeypatch.setattr(guardrail, "verdict_cache", VerdictCache(db_path=None))
+
+    async def scenario() -> str:
+        # The guardrail agent and the main agent's first model call take the same time
+        with use_model_provider(ScriptedModelProvider(latency=0.05)), use_contact_capture("direct"):
+            result = await run_agent(message, session_id=f"speculation-{expected_pushes}")
+            # Give a speculative turn that was not cancelled the chance to push
+            await asyncio.sleep(0.1)
+        return result.output
+
+    output = asyncio.run(scenario())
+    assert len(pushes) == expected_pushes
+    assert (output == ERROR_MESSAGE) == (expected_pushes == 0)
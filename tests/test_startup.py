@@ -0,0 +1,34 @@
+"""Tests for what importing the entry points costs."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+
+def imported_after(module: str, cwd: Path) -> List[str]:
+    """Import a module in a fresh interpreter and return the modules loaded by then."""
+    # The default database path, so a database created on import would show up in cwd
+    env = {name: value for name, value in os.environ.items() if name != "AGENT_DB_PATH"}
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+def test_cli_does_not_import_gradio_or_the_agents_sdk(tmp_path: Path) -> None:
+    """Test that the CLI module leaves the heavy imports to the command that needs them."""
+    modules = imported_after("openai_agent_sdk_tutorial.app", tmp_path)
+    assert "gradio" not in modules
+    assert "agents" not in modules
+
+
+def test_agent_module_builds_the_agent_graph_on_first_use(tmp_path: Path) -> None:
+    """Test that importing the agent module neither builds the agents-as-tools nor touches the database."""
+    modules = imported_after("openai_agent_sdk_tutorial.agent", tmp_path)
+    assert "openai_agent_sdk_tutorial.tool" not in modules
+    assert "openai_agent_sdk_tutorial.handoff" not in modules
+    assert "gradio" not in modules
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,74 @@
+"""Tests for the direct contact capture tool."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+import pytest
+
+from agents.tool_context import ToolContext
+from openai_agent_sdk_tutorial import tool
+from openai_agent_sdk_tutorial.agent import run_agent
+from openai_agent_sdk_tutorial.benchmark import ScriptedModelProvider
+from openai_agent_sdk_tutorial.provider import use_model_provider
+from openai_agent_sdk_tutorial.tool import (
+    ContactRequest,
+    capture_contact,
+    extract_contact_locally,
+    use_contact_capture,
+)
+
+
+def test_extract_contact_locally_only_for_unambiguous_messages() -> None:
+    """Test that the local extraction needs exactly one email address and one name."""
+    contact = extract_contact_locally("Hi, my name is Jane Doe, reach me at jane@example.com")
+    assert contact is not None
+    assert (contact.name, contact.email) == ("Jane Doe", "jane@example.com")
+
+    assert extract_contact_locally("Please reach me at jane@example.com") is None
+    assert extract_contact_locally("I'm Jane, write to jane@example.com or j.doe@example.org") is None
+    assert extract_contact_locally("I'm Jane Doe, call me back") is None
+    assert extract_contact_locally("I'm Looking for a job, write to jane@example.com") is None
+
+
+def test_direct_capture_falls_back_to_one_extraction_call() -> None:
+    """Test that a message without a recognizable name costs a single extra model call."""
+    provider = ScriptedModelProvider()
+
+    async def scenario() -> str:
+        with use_model_provider(provider), use_contact_capture("direct"):
+            result = await run_agent("Please get in touch at jane.doe@example.com", session_id="tool-direct")
+        return result.output
+
+    assert "get in touch" in asyncio.run(scenario())
+    # Notification agent twice, the input classifier, the contact extractor and the output guardrail once
+    assert provider.calls.count == 5
+
+
+def test_direct_capture_does_not_record_an_invalid_email(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an extracted contact without a valid email address is never pushed."""
+    pushed: List[str] = []
+
+    async def fake_push(text: str, dedupe_key: Any = None) -> None:
+        pushed.append(text)
+
+    async def fake_extraction(*args: Any, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(final_output=ContactRequest(email="not given", name="Jane", notes="call me"))
+
+    monkeypatch.setattr(tool, "push", fake_push)
+    monkeypatch.setattr(tool.Runner, "run", fake_extraction)
+
+    async def scenario() -> Any:
+        arguments = json.dumps({"input": "Jane here, please call me"})
+        context: ToolContext[Dict[str, Any]] = ToolContext(
+            context={}, tool_name="send_contact_request", tool_call_id="1", tool_arguments=arguments
+        )
+        return await capture_contact.on_invoke_tool(context, arguments)
+
+    assert "No valid email" in str(asyncio.run(scenario()))
+    assert pushed == []
@@ -0,0 +1,90 @@
+"""Tests for the logging pipeline."""
+
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from openai_agent_sdk_tutorial.util import (
+    BoundedQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    parse_sample_rates,
+)
+
+
+def test_sampling_filter_uses_longest_prefix_and_keeps_warnings() -> None:
+    """Test that the most specific rate applies and warnings are never sampled out."""
+    sampler = SamplingFilter(parse_sample_rates("app=1,app.hook=0, bad"))
+
+    def record(name: str, level: int) -> logging.LogRecord:
+        return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+    assert sampler.filter(record("app.tool", logging.DEBUG))
+    assert not sampler.filter(record("app.hook", logging.DEBUG))
+    assert not sampler.filter(record("app.hook.inner", logging.INFO))
+    assert sampler.filter(record("app.hook", logging.WARNING))
+    assert sampler.filter(record("other", logging.DEBUG))
+
+
+def test_queue_handler_writes_truncated_json_from_a_background_thread() -> None:
+    """Test that records reach the writer thread as JSON with capped messages, and overflow is dropped."""
+    stream = io.StringIO()
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(JsonFormatter())
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, max_chars=10)
+    logger = logging.getLogger("tests.util.pipeline")
+    logger.propagate = False
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    logger.info("output: %s", "x" * 100)
+    logger.info("dropped: the queue is full")
+    assert handler.dropped == 1
+
+    listener = QueueListener(log_queue, writer)
+    listener.start()
+    listener.stop()
+    logger.removeHandler(handler)
+
+    entry = json.loads(stream.getvalue().splitlines()[0])
+    assert entry["logger"] == "tests.util.pipeline"
+    assert entry["message"] == "output: xx... [98 chars truncated]"
+
+
+def test_queue_handler_keeps_the_traceback_apart_from_the_truncated_message() -> None:
+    """Test that a long traceback keeps its last line, in text and as the JSON exc_info field."""
+    text_stream, json_stream = io.StringIO(), io.StringIO()
+    text_writer = logging.StreamHandler(text_stream)
+    text_writer.setFormatter(logging.Formatter("%(message)s"))
+    json_writer = logging.StreamHandler(json_stream)
+    json_writer.setFormatter(JsonFormatter())
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    handler = BoundedQueueHandler(log_queue, max_chars=30)
+    logger = logging.getLogger("tests.util.exceptions")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    def fail(depth: int) -> None:
+        if depth == 0:
+            raise ValueError("the final line")
+        fail(depth - 1)
+
+    try:
+        fail(10)
+    except ValueError:
+        logger.exception("Run failed for input %s", "x" * 100)
+    logger.removeHandler(handler)
+
+    listener = QueueListener(log_queue, text_writer, json_writer)
+    listener.start()
+    listener.stop()
+
+    text = text_stream.getvalue().rstrip("\n")
+    assert text.startswith("Run failed for input xxxxxxxxx... [91 chars truncated]\nTraceback")
+    assert text.endswith("ValueError: the final line")
+    entry = json.loads(json_stream.getvalue())
+    assert entry["message"] == "Run failed for input xxxxxxxxx... [91 chars truncated]"
+    assert len(entry["exc_info"]) > 300 and entry["exc_info"].endswith("ValueError: the final line")